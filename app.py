@@ -9,8 +9,14 @@ Includes Mermaid flowcharts for the deliberation loop and designed workflow.
 import streamlit as st
 import time
 import os
-import glob
-from orchestrator import run_deliberation, save_results, CHALLENGE, load_transcripts
+from orchestrator import CHALLENGE, load_transcripts, CHECKPOINT_DIR
+from checkpoint import CheckpointStore
+from jobs import get_manager, QUEUED, RUNNING, DONE, CANCELLED
+from file_store import FileStore, signature
+from telemetry import RUN_LOG_NAME, parse_run_log, last_run, format_summary_table
+from run_store import get_store
+
+POLL_INTERVAL = float(os.getenv("UI_POLL_INTERVAL", "0.5"))
 
 st.set_page_config(
     page_title="Workflow Architect",
@@ -111,26 +117,45 @@ st.divider()
 # ---------------------------------------------------------------------------
 # Transcript Viewer
 # ---------------------------------------------------------------------------
-transcript_files = sorted(glob.glob("transcripts/*.txt"))
+@st.cache_resource
+def get_file_store():
+    """One process-wide cache of listings/contents, invalidated by file mtime."""
+    return FileStore()
+
+
+store = get_file_store()
+
+
+def transcript_label(filepath):
+    return os.path.basename(filepath).replace(".txt", "").replace("_", " ").title()
+
+
+transcript_files = store.list("transcripts", "*.txt")
 if transcript_files:
     st.markdown("#### 📞 Input Transcripts")
     st.caption("The agents read these transcripts and design a workflow plan tailored to this specific client.")
-    tabs = st.tabs([os.path.basename(f).replace(".txt", "").replace("_", " ").title() for f in transcript_files])
-    for tab, filepath in zip(tabs, transcript_files):
-        with tab:
-            with open(filepath) as fh:
-                st.text(fh.read())
+    # Only the selected transcript is read and rendered on each rerun.
+    selected = st.selectbox("Transcript", transcript_files, format_func=transcript_label,
+                            label_visibility="collapsed")
+    st.text(store.read(selected) or "")
     st.divider()
 
 # ---------------------------------------------------------------------------
 # State management
 # ---------------------------------------------------------------------------
+# Deliberations run as background jobs that outlive this script run; the job
+# ID lives in the session and the URL, so a refresh reattaches to it.
+manager = get_manager()
+
 if "results" not in st.session_state:
     st.session_state.results = None
-if "running" not in st.session_state:
-    st.session_state.running = False
 if "agent_outputs" not in st.session_state:
     st.session_state.agent_outputs = {}
+if "job_id" not in st.session_state:
+    st.session_state.job_id = st.query_params.get("job")
+
+job = manager.get(st.session_state.job_id)
+running = job is not None and job.active
 
 # Agent metadata
 AGENTS = [
@@ -142,109 +167,158 @@ AGENTS = [
     ("Critical Eye (Final)", "critical-final", "Final validation of human checkpoints"),
 ]
 
+
+def start_job(resume: bool):
+    job_id = manager.submit(use_cache=not st.session_state.get("bypass_cache"), resume=resume)
+    st.session_state.job_id = job_id
+    st.session_state.results = None
+    st.query_params["job"] = job_id
+    st.rerun()
+
+
 # ---------------------------------------------------------------------------
 # Run button
 # ---------------------------------------------------------------------------
 col1, col2, col3 = st.columns([1, 2, 1])
 with col2:
-    if st.button("▶  Run Multi-Agent Deliberation", use_container_width=True, type="primary", disabled=st.session_state.running):
-        st.session_state.running = True
-        st.session_state.agent_outputs = {}
-        st.session_state.results = None
-        st.rerun()
+    if st.button("▶  Run Multi-Agent Deliberation", use_container_width=True, type="primary", disabled=running):
+        start_job(resume=False)
+    if not running and CheckpointStore(CHECKPOINT_DIR).has_checkpoints():
+        if st.button("⟳  Resume last run", use_container_width=True,
+                     help="Pick up an interrupted deliberation; finished stages are not re-run."):
+            start_job(resume=True)
+    st.checkbox("Bypass response cache", key="bypass_cache",
+                help="Always call the API, even for prompts answered in an earlier run.")
 
 # ---------------------------------------------------------------------------
 # Display previously loaded results (from output/ directory)
 # ---------------------------------------------------------------------------
-def load_existing_results():
-    """Load pre-generated results from output/ directory."""
-    output_dir = "output"
+AGENT_FILES = [
+    ("Researcher", "1_researcher.md"),
+    ("Architect", "2_architect.md"),
+    ("Critical Eye", "3_critical_eye.md"),
+    ("Toolsmith", "4_toolsmith.md"),
+    ("Architect (Revised)", "5_architect_revised.md"),
+    ("Critical Eye (Final)", "6_critical_eye_final.md"),
+]
+
+
+def load_existing_results(output_dir="output"):
+    """Load pre-generated results from output/ directory, re-parsing only when a file changed."""
     if not os.path.exists(output_dir):
         return None
-    
-    agent_files = [
-        ("Researcher", "1_researcher.md"),
-        ("Architect", "2_architect.md"),
-        ("Critical Eye", "3_critical_eye.md"),
-        ("Toolsmith", "4_toolsmith.md"),
-        ("Architect (Revised)", "5_architect_revised.md"),
-        ("Critical Eye (Final)", "6_critical_eye_final.md"),
-    ]
-    
+    signatures = tuple(signature(os.path.join(output_dir, filename)) for _, filename in AGENT_FILES)
+    return _parse_results(output_dir, signatures)
+
+
+@st.cache_data(max_entries=16, show_spinner=False)
+def _parse_results(output_dir, signatures):
+    """Keyed on the files' (mtime, size) signatures, so unchanged output is never re-split."""
     outputs = {}
-    for name, filename in agent_files:
-        filepath = os.path.join(output_dir, filename)
-        if os.path.exists(filepath):
-            with open(filepath, "r") as f:
-                content = f.read()
-                # Remove the markdown header line
-                lines = content.split("\n")
-                if lines and lines[0].startswith("# "):
-                    content = "\n".join(lines[2:])  # skip header + blank line
-                outputs[name] = content
+    for name, filename in AGENT_FILES:
+        content = store.read(os.path.join(output_dir, filename))
+        if content is not None:
+            # Remove the markdown header line
+            lines = content.split("\n")
+            if lines and lines[0].startswith("# "):
+                content = "\n".join(lines[2:])  # skip header + blank line
+            outputs[name] = content
     
     return outputs if outputs else None
 
 
+# ---------------------------------------------------------------------------
+# Run history (past runs from the run store, independent of output/)
+# ---------------------------------------------------------------------------
+HISTORY_LIMIT = 200
+HISTORY_WINDOWS = {"Any time": None, "Last 24 hours": 86400, "Last 7 days": 7 * 86400, "Last 30 days": 30 * 86400}
+
+
+@st.cache_resource
+def get_run_store():
+    """The shared RunStore (None when RUN_STORE=off)."""
+    return get_store()
+
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def load_stored_run(run_id):
+    """A stored run never changes, so its outputs are decompressed once per process."""
+    return get_run_store().get_run(run_id)
+
+
+def choose_stored_run():
+    """History picker; returns the selected StoredRun, or None for the files in output/."""
+    run_store = get_run_store()
+    if run_store is None or not run_store.count():
+        return None
+    with st.expander("🗂️ Run history"):
+        col1, col2 = st.columns(2)
+        with col1:
+            client = st.selectbox("Client", ["All clients", *run_store.clients()])
+        with col2:
+            window = st.selectbox("When", list(HISTORY_WINDOWS))
+        since = time.time() - HISTORY_WINDOWS[window] if HISTORY_WINDOWS[window] else None
+        runs = run_store.list_runs(client=None if client == "All clients" else client, since=since,
+                                   limit=HISTORY_LIMIT)
+        labels = {r.run_id: r.label() for r in runs}
+        run_id = st.selectbox(f"Run ({len(runs)} shown)", [None, *labels],
+                              format_func=lambda key: "Latest results in output/" if key is None else labels[key])
+    return load_stored_run(run_id) if run_id else None
+
+
 # ---------------------------------------------------------------------------
 # Run or display
 # ---------------------------------------------------------------------------
-if st.session_state.running:
-    # Create placeholders for each agent
-    placeholders = {}
-    status_placeholders = {}
-    
+STATUS_LABELS = {None: "⏳ *Waiting...*", RUNNING: "🔄 *Thinking...*", DONE: "✅ *Complete*"}
+
+
+@st.fragment(run_every=POLL_INTERVAL)
+def job_progress(job_id):
+    """Re-rendered on a timer from the job's latest snapshot; the job itself runs elsewhere."""
+    current = manager.get(job_id)
+    if current is None:
+        st.rerun()
+    snap = current.snapshot()
+    if snap["status"] == QUEUED:
+        st.info("Queued — waiting for a free deliberation worker...")
+    if st.button("■  Cancel deliberation", key=f"cancel-{job_id}"):
+        manager.cancel(job_id)
+
     for agent_name, css_class, description in AGENTS:
         st.markdown(f'<div class="agent-header {css_class}">{agent_name}</div>', unsafe_allow_html=True)
         st.caption(description)
-        status_placeholders[agent_name] = st.empty()
-        placeholders[agent_name] = st.empty()
+        st.markdown(STATUS_LABELS.get(snap["stage_status"].get(agent_name), ""))
+        if snap["texts"].get(agent_name):
+            st.markdown(snap["texts"][agent_name])
         st.divider()
-    
-    # Set all to waiting
-    for agent_name, _, _ in AGENTS:
-        status_placeholders[agent_name].markdown("⏳ *Waiting...*")
-    
-    # Stream callback
-    current_agent = {"name": None}
-    current_text = {"buffer": ""}
-    
-    def on_stream(agent_name, text_chunk):
-        if agent_name != current_agent["name"]:
-            # New agent starting
-            if current_agent["name"]:
-                # Mark previous as done
-                status_placeholders[current_agent["name"]].markdown("✅ *Complete*")
-            current_agent["name"] = agent_name
-            current_text["buffer"] = ""
-            status_placeholders[agent_name].markdown("🔄 *Thinking...*")
-        
-        current_text["buffer"] += text_chunk
-        placeholders[agent_name].markdown(current_text["buffer"])
-    
-    # Run deliberation
-    try:
-        results = run_deliberation(on_stream=on_stream)
-        
-        # Mark final agent done
-        if current_agent["name"]:
-            status_placeholders[current_agent["name"]].markdown("✅ *Complete*")
-        
-        # Save results
-        save_results(results)
-        st.session_state.results = {r.agent_name: r.output for r in results}
-        st.session_state.running = False
-        
+
+    if not current.active:
+        st.rerun()
+
+
+if job is not None and not job.active:
+    # A job this session was following has finished since the last rerun.
+    if job.status == DONE:
+        st.session_state.results = {r.agent_name: r.output for r in job.results}
         st.success("Deliberation complete! Results saved to output/ directory.")
         st.balloons()
-        
-    except Exception as e:
-        st.error(f"Error during deliberation: {str(e)}")
-        st.session_state.running = False
+    elif job.status == CANCELLED:
+        st.warning("Deliberation cancelled.")
+        st.caption("Finished stages were checkpointed — use **Resume last run** to continue from here.")
+    else:
+        st.error(f"Error during deliberation: {job.error}")
+        st.caption("Finished stages were checkpointed — use **Resume last run** to continue from here.")
+    st.session_state.job_id = None
+    if "job" in st.query_params:
+        del st.query_params["job"]
+
+if running:
+    job_progress(job.id)
 
 else:
-    # Show existing results if available
-    existing = st.session_state.results or load_existing_results()
+    # Show a run picked from history, else existing results if available
+    stored = choose_stored_run()
+    existing = stored.outputs if stored else st.session_state.results or load_existing_results()
     
     if existing:
         # ── Designed Workflow Flowchart ──
@@ -281,25 +355,40 @@ graph TD
         
         # ── Agent Reasoning Panels ──
         st.markdown("### 📋 Agent Reasoning")
-        st.caption("Each agent's full output from the deliberation session. Click to expand.")
+        st.caption("Each agent's full output from the deliberation session. Toggle a panel to show it.")
         st.markdown("")
         
+        # Collapsed panels are not rendered at all; only toggled-on ones are.
         for agent_name, css_class, description in AGENTS:
             if agent_name in existing:
-                with st.expander(f"**{agent_name}** — {description}", expanded=(agent_name == "Architect (Revised)")):
-                    st.markdown(existing[agent_name])
+                shown = st.toggle(f"**{agent_name}** — {description}", key=f"panel-{css_class}",
+                                  value=(agent_name == "Architect (Revised)"))
+                if shown:
+                    with st.container(border=True):
+                        st.markdown(existing[agent_name])
         
         st.divider()
         st.markdown("### 📊 Deliberation Summary")
         
-        col1, col2, col3 = st.columns(3)
+        if stored:
+            stage_records, run_record = stored.records, {"wall_time": stored.summary.wall_time}
+        else:
+            stage_records, run_record = last_run(parse_run_log(store.read(os.path.join("output", RUN_LOG_NAME)) or ""))
+        col1, col2, col3, col4 = st.columns(4)
         with col1:
             st.metric("Agents", "4 specialized")
         with col2:
             st.metric("Deliberation Rounds", "6 stages")
         with col3:
-            total_chars = sum(len(v) for v in existing.values())
-            st.metric("Total Reasoning", f"{total_chars:,} chars")
+            wall = run_record["wall_time"] if run_record else sum(r["duration"] for r in stage_records)
+            st.metric("Wall Time", f"{wall:.1f}s" if stage_records else "—")
+        with col4:
+            total_tokens = sum(r["input_tokens"] + r["output_tokens"] for r in stage_records)
+            st.metric("Tokens", f"{total_tokens:,}" if stage_records else "—")
+
+        if stage_records:
+            with st.expander(f"Stage telemetry ({stored.summary.run_id if stored else 'last run'})"):
+                st.code(format_summary_table(stage_records, run_record and run_record["wall_time"]), language=None)
     
     else:
         st.info("Click **Run Multi-Agent Deliberation** to start. The agents will read the transcripts and collaboratively design a workflow plan tailored to this specific client.")
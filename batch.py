@@ -0,0 +1,146 @@
+"""
+Batch Deliberation
+==================
+Run the multi-agent deliberation over many clients' transcript folders at
+once, with a bounded number of runs in flight.
+
+Each transcript directory is one client. Results go to
+<output-root>/<client>/ in the same layout as a single run's output/.
+
+Usage:
+    python batch.py transcripts/lakeview transcripts/riverside -j 4
+    python batch.py clients/* --output-root output/batch --stub   # no API calls
+    python batch.py clients/* --pdf            # also render <client>/workflow.pdf in a process pool
+"""
+
+import os
+import time
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+
+from orchestrator import run_deliberation, save_results
+from run_store import get_store
+
+
+@dataclass
+class ClientRun:
+    client: str
+    transcript_dir: str
+    output_dir: str
+    wall_time: float = 0.0
+    stages: int = 0
+    output_chars: int = 0
+    error: str = ""
+
+    @property
+    def chars_per_sec(self) -> float:
+        return self.output_chars / self.wall_time if self.wall_time else 0.0
+
+
+def client_names(transcript_dirs: list[str]) -> list[str]:
+    """One unique, filesystem-safe name per directory (basename, suffixed on collision)."""
+    names, seen = [], {}
+    for d in transcript_dirs:
+        base = os.path.basename(os.path.normpath(d)) or "client"
+        seen[base] = seen.get(base, 0) + 1
+        names.append(base if seen[base] == 1 else f"{base}_{seen[base]}")
+    return names
+
+
+def _run_one(run: ClientRun, use_cache: bool, api_client) -> ClientRun:
+    started = time.perf_counter()
+    try:
+        results = run_deliberation(
+            run.transcript_dir, use_cache=use_cache, api_client=api_client, run_store=get_store(), client=run.client,
+        )
+        save_results(results, run.output_dir)
+        run.stages = len(results)
+        run.output_chars = sum(len(r.output) for r in results)
+    except Exception as e:
+        run.error = f"{type(e).__name__}: {e}"
+    run.wall_time = time.perf_counter() - started
+    return run
+
+
+def run_batch(
+    transcript_dirs: list[str],
+    output_root: str = os.path.join("output", "batch"),
+    concurrency: int = 4,
+    use_cache: bool = True,
+    api_client=None,
+) -> list[ClientRun]:
+    """
+    Deliberate over every transcript directory, at most `concurrency` at a time.
+    A failing client is recorded in its ClientRun.error and does not stop the batch.
+    Returns one ClientRun per directory, in input order.
+    """
+    runs = [
+        ClientRun(name, d, os.path.join(output_root, name))
+        for name, d in zip(client_names(transcript_dirs), transcript_dirs)
+    ]
+    with ThreadPoolExecutor(max_workers=max(1, concurrency), thread_name_prefix="deliberation") as pool:
+        return list(pool.map(lambda r: _run_one(r, use_cache, api_client), runs))
+
+
+def format_summary(runs: list[ClientRun], wall_time: float) -> str:
+    """Per-client wall time and throughput, plus batch totals."""
+    lines = [f"{'CLIENT':<28} {'STATUS':<8} {'WALL (s)':>9} {'STAGES':>7} {'CHARS/S':>9}"]
+    for r in runs:
+        status = "FAILED" if r.error else "ok"
+        lines.append(f"{r.client:<28} {status:<8} {r.wall_time:>9.1f} {r.stages:>7} {r.chars_per_sec:>9.0f}")
+    for r in runs:
+        if r.error:
+            lines.append(f"  {r.client}: {r.error}")
+    ok = sum(1 for r in runs if not r.error)
+    per_hour = ok / wall_time * 3600 if wall_time else 0.0
+    serial = sum(r.wall_time for r in runs)
+    lines.append(
+        f"\n{ok}/{len(runs)} clients in {wall_time:.1f}s wall "
+        f"({per_hour:.0f} clients/hour, {serial / wall_time if wall_time else 0:.1f}x vs serial)"
+    )
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the deliberation over many transcript folders.")
+    parser.add_argument("transcript_dirs", nargs="+", help="one directory of *.txt transcripts per client")
+    parser.add_argument("-j", "--concurrency", type=int, default=4, help="deliberations in flight at once")
+    parser.add_argument("--output-root", default=os.path.join("output", "batch"))
+    parser.add_argument("--no-cache", action="store_true", help="bypass the on-disk response cache")
+    parser.add_argument("--stub", action="store_true", help="use the local mock Messages API (implies --no-cache)")
+    parser.add_argument("--pdf", action="store_true", help="render each client's workflow PDF afterwards")
+    args = parser.parse_args()
+
+    api_client = None
+    if args.stub:
+        from mock_api import StubClient
+        api_client = StubClient(chunk_delay=0.005)
+
+    print("=" * 60)
+    print(f"WORKFLOW ARCHITECT - Batch of {len(args.transcript_dirs)} clients (concurrency {args.concurrency})")
+    print("=" * 60)
+
+    started = time.perf_counter()
+    runs = run_batch(
+        args.transcript_dirs,
+        args.output_root,
+        args.concurrency,
+        use_cache=not (args.no_cache or args.stub),
+        api_client=api_client,
+    )
+    print("\n" + "=" * 60)
+    print("BATCH SUMMARY")
+    print("=" * 60)
+    print(format_summary(runs, time.perf_counter() - started))
+
+    if args.pdf:
+        from generate_pdf import render_batch
+
+        started = time.perf_counter()
+        jobs = render_batch([r.output_dir for r in runs if not r.error])
+        ok = [j for j in jobs if not j.error]
+        print(f"\nRendered {len(ok)}/{len(jobs)} PDFs in {time.perf_counter() - started:.1f}s")
+        for job in jobs:
+            if job.error:
+                print(f"  {job.output_dir}: {job.error}")
@@ -0,0 +1,259 @@
+"""
+Pipeline Benchmark
+==================
+Measures orchestration overhead and concurrency scaling without API spend or
+network time. Every request goes to mock_api.StubClient, which replays the
+stage outputs saved in output/ at a fixed time-to-first-token and token rate
+(or the medians recorded in a real run's telemetry log, via --timings).
+
+Benchmarks:
+  deliberation   run_deliberation end to end, --repeats times
+  save_results   writing the stage files, combined document and manifest
+  generate_pdf   generate_pdf.generate (skipped if fpdf2 is not installed)
+  concurrent     --concurrency deliberations at once on one shared client
+
+Each reports wall time (p50/p95 over repeats), per-stage p50/p95 duration
+and peak traced memory. Results can be saved as a baseline and later runs
+compared against it; there is no checked-in baseline, so record one on the
+machine you compare on.
+
+Usage:
+    python -m benchmarks.pipeline [--repeats 5] [--concurrency 4]
+    python -m benchmarks.pipeline --timings output/run_log.jsonl --time-scale 0.1
+    python -m benchmarks.pipeline --save-baseline benchmarks/baseline.json
+    python -m benchmarks.pipeline --baseline benchmarks/baseline.json
+"""
+
+import io
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import tracemalloc
+import contextlib
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mock_api import StubClient, recorded_responder, timings_from_run_log  # noqa: E402
+from orchestrator import run_deliberation, save_results  # noqa: E402
+
+# Change vs baseline (as a fraction) beyond which a metric is flagged.
+REGRESSION_THRESHOLD = 0.10
+
+
+def percentile(values: list[float], q: float) -> float:
+    """Linear-interpolated percentile, q in [0, 100]."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    pos = (len(ordered) - 1) * q / 100
+    lo = int(pos)
+    hi = min(lo + 1, len(ordered) - 1)
+    return ordered[lo] + (ordered[hi] - ordered[lo]) * (pos - lo)
+
+
+def summarize(walls: list[float], stage_times: dict[str, list[float]], peak: int) -> dict:
+    return {
+        "runs": len(walls),
+        "wall_p50": percentile(walls, 50),
+        "wall_p95": percentile(walls, 95),
+        "peak_kb": peak / 1024,
+        "stages": {
+            name: {"p50": percentile(times, 50), "p95": percentile(times, 95)}
+            for name, times in stage_times.items()
+        },
+    }
+
+
+@contextlib.contextmanager
+def traced():
+    """Yield a one-item list that holds the peak traced bytes once the block exits."""
+    peak = [0]
+    tracemalloc.start()
+    try:
+        yield peak
+    finally:
+        peak[0] = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+
+def quiet():
+    """The orchestrator prints progress per stage; keep it out of the report."""
+    return contextlib.redirect_stdout(io.StringIO())
+
+
+def deliberate(client: StubClient, transcript_dir: str):
+    return run_deliberation(transcript_dir, api_client=client, use_cache=False)
+
+
+def record_stages(stage_times: dict[str, list[float]], results) -> None:
+    for r in results:
+        stage_times.setdefault(r.agent_name, []).append(r.duration)
+
+
+# ---------------------------------------------------------------------------
+# Benchmarks
+# ---------------------------------------------------------------------------
+def bench_deliberation(make_client, transcript_dir: str, repeats: int) -> tuple[dict, list]:
+    walls, stage_times, results = [], {}, []
+    with traced() as peak:
+        for _ in range(repeats):
+            started = time.perf_counter()
+            with quiet():
+                results = deliberate(make_client(), transcript_dir)
+            walls.append(time.perf_counter() - started)
+            record_stages(stage_times, results)
+    return summarize(walls, stage_times, peak[0]), results
+
+
+def bench_save_results(results, repeats: int) -> dict:
+    walls = []
+    with traced() as peak, tempfile.TemporaryDirectory() as tmp:
+        for i in range(repeats):
+            started = time.perf_counter()
+            with quiet():
+                save_results(results, os.path.join(tmp, str(i)))
+            walls.append(time.perf_counter() - started)
+    return summarize(walls, {}, peak[0])
+
+
+def bench_generate_pdf(output_dir: str, repeats: int) -> dict | None:
+    try:
+        import generate_pdf
+    except ImportError as e:
+        print(f"  generate_pdf skipped: {e}")
+        return None
+    walls = []
+    with traced() as peak, tempfile.TemporaryDirectory() as tmp:
+        for i in range(repeats):
+            started = time.perf_counter()
+            with quiet():
+                generate_pdf.generate(output_dir=output_dir, output_path=os.path.join(tmp, f"{i}.pdf"))
+            walls.append(time.perf_counter() - started)
+    return summarize(walls, {}, peak[0])
+
+
+def bench_concurrent(make_client, transcript_dir: str, concurrency: int, repeats: int) -> dict:
+    walls, stage_times = [], {}
+    with traced() as peak:
+        for _ in range(repeats):
+            client = make_client()
+            started = time.perf_counter()
+            with quiet(), ThreadPoolExecutor(max_workers=concurrency) as pool:
+                runs = list(pool.map(lambda _: deliberate(client, transcript_dir), range(concurrency)))
+            walls.append(time.perf_counter() - started)
+            for results in runs:
+                record_stages(stage_times, results)
+    summary = summarize(walls, stage_times, peak[0])
+    summary["concurrency"] = concurrency
+    return summary
+
+
+# ---------------------------------------------------------------------------
+# Reporting
+# ---------------------------------------------------------------------------
+def format_report(report: dict) -> str:
+    lines = [f"{'BENCHMARK':<16} {'RUNS':>5} {'WALL p50':>10} {'WALL p95':>10} {'PEAK KB':>10}"]
+    for name, r in report["benchmarks"].items():
+        lines.append(f"{name:<16} {r['runs']:>5} {r['wall_p50']:>9.3f}s {r['wall_p95']:>9.3f}s {r['peak_kb']:>10,.0f}")
+    for name, r in report["benchmarks"].items():
+        if not r["stages"]:
+            continue
+        lines.append(f"\n{name} per stage:")
+        lines.append(f"  {'STAGE':<24} {'p50':>9} {'p95':>9}")
+        for stage, t in r["stages"].items():
+            lines.append(f"  {stage:<24} {t['p50']:>8.3f}s {t['p95']:>8.3f}s")
+    single = report["benchmarks"].get("deliberation")
+    multi = report["benchmarks"].get("concurrent")
+    if single and multi and multi["wall_p50"]:
+        n = multi["concurrency"]
+        speedup = n * single["wall_p50"] / multi["wall_p50"]
+        lines.append(f"\n{n} concurrent runs: {speedup:.2f}x the throughput of back-to-back runs (ideal {n}x)")
+    return "\n".join(lines)
+
+
+def compare(report: dict, baseline: dict) -> str:
+    """Wall p50/p95 and peak memory against a saved baseline, flagging regressions."""
+    lines = [f"{'BENCHMARK':<16} {'METRIC':<9} {'BASELINE':>10} {'NOW':>10} {'CHANGE':>8}"]
+    for name, now in report["benchmarks"].items():
+        before = baseline.get("benchmarks", {}).get(name)
+        if not before:
+            lines.append(f"{name:<16} (not in baseline)")
+            continue
+        for metric in ("wall_p50", "wall_p95", "peak_kb"):
+            old, new = before[metric], now[metric]
+            change = (new - old) / old if old else 0.0
+            flag = "  REGRESSION" if change > REGRESSION_THRESHOLD else ""
+            lines.append(f"{name:<16} {metric:<9} {old:>10.3f} {new:>10.3f} {change:>+7.0%}{flag}")
+    speed = ("ttft", "tokens_per_sec")
+    old_settings = baseline.get("settings", {})
+    if any(round(old_settings.get(k, 0), 6) != round(report["settings"][k], 6) for k in speed):
+        lines.append(f"\nNote: baseline was recorded at different mock API speeds: {old_settings}")
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--transcripts", default="transcripts")
+    parser.add_argument("--output-dir", default="output", help="recorded stage outputs to replay")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--ttft", type=float, default=0.8, help="seconds to first token")
+    parser.add_argument("--tokens-per-sec", type=float, default=80.0)
+    parser.add_argument("--timings", help="telemetry run log to take TTFT and token rate from")
+    parser.add_argument("--time-scale", type=float, default=0.05,
+                        help="multiply simulated API time by this (1 = real time)")
+    parser.add_argument("--only", nargs="+", choices=["deliberation", "save_results", "generate_pdf", "concurrent"])
+    parser.add_argument("--baseline", help="compare against this saved report")
+    parser.add_argument("--save-baseline", metavar="PATH", help="write this run's report as a baseline")
+    args = parser.parse_args()
+
+    ttft, rate = args.ttft, args.tokens_per_sec
+    if args.timings:
+        ttft, rate = timings_from_run_log(args.timings)
+    ttft *= args.time_scale
+    rate = rate / args.time_scale if rate else 0.0
+
+    def make_client() -> StubClient:
+        return StubClient(recorded_responder(args.output_dir), ttft=ttft, tokens_per_sec=rate)
+
+    selected = set(args.only or ["deliberation", "save_results", "generate_pdf", "concurrent"])
+    print(f"Mock API: TTFT {ttft * 1000:.0f}ms, {rate:,.0f} tok/s, replaying {args.output_dir}/\n")
+
+    benchmarks = {}
+    results = None
+    if selected & {"deliberation", "save_results"}:
+        benchmarks["deliberation"], results = bench_deliberation(make_client, args.transcripts, args.repeats)
+    if "save_results" in selected:
+        benchmarks["save_results"] = bench_save_results(results, args.repeats)
+    if "generate_pdf" in selected:
+        pdf = bench_generate_pdf(args.output_dir, args.repeats)
+        if pdf:
+            benchmarks["generate_pdf"] = pdf
+    if "concurrent" in selected:
+        benchmarks["concurrent"] = bench_concurrent(make_client, args.transcripts, args.concurrency, args.repeats)
+    if "deliberation" not in selected:
+        benchmarks.pop("deliberation", None)
+
+    report = {
+        "settings": {"ttft": ttft, "tokens_per_sec": rate, "repeats": args.repeats, "concurrency": args.concurrency},
+        "python": sys.version.split()[0],
+        "created": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "benchmarks": benchmarks,
+    }
+    print(format_report(report))
+
+    if args.baseline:
+        with open(args.baseline) as fh:
+            print("\n" + compare(report, json.load(fh)))
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as fh:
+            json.dump(report, fh, indent=2)
+        print(f"\nBaseline saved to {args.save_baseline}")
+
+
+if __name__ == "__main__":
+    main()
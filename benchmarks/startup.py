@@ -0,0 +1,97 @@
+"""
+Startup Benchmark
+=================
+Cold import and first-use times of the entry points, each measured in a
+fresh interpreter so nothing is already imported.
+
+Paths:
+  view          what app.py imports before rendering saved results
+  pdf           generate_pdf (offline PDF rendering)
+  orchestrator  importing orchestrator
+  cache_hit     run_agent answered from the response cache (no client needed)
+  first_client  importing orchestrator and building the background loop's
+                AsyncAnthropic client, the one every blocking run reuses
+
+Each path also reports whether `anthropic` got imported along the way.
+cache_hit reads an entry written beforehand into a scratch RESPONSE_CACHE_DIR.
+
+Usage:
+    python -m benchmarks.startup [--repeats 7]
+"""
+
+import os
+import sys
+import json
+import argparse
+import tempfile
+import statistics
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PATHS = {
+    "view": "import orchestrator, jobs, checkpoint, file_store, telemetry, run_store",
+    "pdf": "import generate_pdf",
+    "orchestrator": "import orchestrator",
+    "cache_hit": "import orchestrator; orchestrator.run_agent('Probe', 'system', 'hello')",
+    "first_client": "import orchestrator, clients; clients.run_blocking(FIRST_CLIENT())",
+}
+
+# Untimed code a path needs run first: in a separate process (SETUP), or
+# in the probe before the timer starts (WARMUP).
+SETUP = {
+    "cache_hit": (
+        "from response_cache import ResponseCache, cache_key; from model_config import CONFIGS; c = CONFIGS.default; "
+        "ResponseCache().put(cache_key(c.model, c.max_tokens, 'system', 'hello', c.temperature), "
+        "{'model': c.model, 'output': 'cached'})"
+    ),
+}
+WARMUP = {
+    "first_client": "async def FIRST_CLIENT():\n    import clients\n    return clients.get_async_client()\n",
+}
+
+PROBE = """
+import sys, time, json
+exec(compile({warmup!r}, "<warmup>", "exec"))
+started = time.perf_counter()
+exec(compile({code!r}, "<startup>", "exec"))
+print(json.dumps({{"seconds": time.perf_counter() - started, "anthropic": "anthropic" in sys.modules}}))
+"""
+
+
+def probe(source: str, env: dict) -> tuple[float, bool]:
+    """(seconds, anthropic imported) from one fresh interpreter running PROBE source."""
+    out = subprocess.run([sys.executable, "-c", source], cwd=ROOT, capture_output=True, text=True, env=env)
+    if out.returncode != 0:
+        raise RuntimeError(out.stderr.strip().splitlines()[-1] if out.stderr.strip() else "probe failed")
+    result = json.loads(out.stdout.strip().splitlines()[-1])
+    return result["seconds"], result["anthropic"]
+
+
+def measure(name: str, repeats: int) -> tuple[list[float], bool]:
+    times, loaded = [], False
+    with tempfile.TemporaryDirectory() as cache_dir:
+        env = {**os.environ, "ANTHROPIC_API_KEY": "startup-benchmark", "RESPONSE_CACHE_DIR": cache_dir}
+        if name in SETUP:
+            subprocess.run([sys.executable, "-c", SETUP[name]], cwd=ROOT, env=env, check=True)
+        source = PROBE.format(warmup=WARMUP.get(name, ""), code=PATHS[name])
+        for _ in range(repeats):
+            seconds, loaded = probe(source, env)
+            times.append(seconds)
+    return times, loaded
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure cold import / first-client times.")
+    parser.add_argument("--repeats", type=int, default=7)
+    parser.add_argument("--only", nargs="+", choices=list(PATHS), default=list(PATHS))
+    args = parser.parse_args()
+
+    print(f"{'PATH':<14} {'p50':>8} {'min':>8}  ANTHROPIC IMPORTED")
+    for name in args.only:
+        try:
+            times, loaded = measure(name, args.repeats)
+        except RuntimeError as e:
+            print(f"{name:<14} failed: {e}")
+            continue
+        print(f"{name:<14} {statistics.median(times) * 1000:>6.0f}ms {min(times) * 1000:>6.0f}ms  {'yes' if loaded else 'no'}")
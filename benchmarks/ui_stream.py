@@ -0,0 +1,116 @@
+"""
+UI Streaming Benchmark
+======================
+Compares per-token placeholder updates (the old app.py behaviour) with
+StreamCoalescer, replaying each saved stage output in output/ as a token
+stream at a realistic rate.
+
+The placeholder is simulated: each render does work proportional to the text
+it is given (encode + markdown tokenization), standing in for Streamlit
+serializing and diffing the element. Stream time is simulated too, so the
+benchmark measures only render work and runs in a fraction of a second.
+
+Usage:
+    python -m benchmarks.ui_stream [--interval 0.15] [--tokens-per-sec 60] [--output-dir output]
+"""
+
+import os
+import re
+import sys
+import glob
+import time
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from stream_coalescer import StreamCoalescer, FLUSH_INTERVAL, FLUSH_CHARS  # noqa: E402
+
+MARKDOWN_TOKENS = re.compile(r"\*\*|__|`|#+ |^- |\n")
+
+
+class FakePlaceholder:
+    """Counts renders and total characters rendered, doing proportional work per call."""
+
+    def __init__(self):
+        self.renders = 0
+        self.chars = 0
+
+    def markdown(self, text: str) -> None:
+        self.renders += 1
+        self.chars += len(text)
+        text.encode("utf-8")
+        MARKDOWN_TOKENS.findall(text)
+
+
+class SimClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def tokens_of(text: str) -> list[str]:
+    """Split text into ~4-character pieces, the size of a typical streamed delta."""
+    return [text[i:i + 4] for i in range(0, len(text), 4)]
+
+
+def run_direct(tokens: list[str]) -> tuple[FakePlaceholder, float]:
+    placeholder = FakePlaceholder()
+    started = time.process_time()
+    buffer = ""
+    for tok in tokens:
+        buffer += tok
+        placeholder.markdown(buffer)
+    return placeholder, time.process_time() - started
+
+
+def run_coalesced(tokens: list[str], interval: float, max_chars: int, tokens_per_sec: float) -> tuple[FakePlaceholder, float]:
+    placeholder = FakePlaceholder()
+    clock = SimClock()
+    coalescer = StreamCoalescer(placeholder.markdown, interval=interval, max_chars=max_chars, clock=clock)
+    started = time.process_time()
+    for tok in tokens:
+        clock.now += 1.0 / tokens_per_sec
+        coalescer.write(tok)
+    coalescer.flush()
+    return placeholder, time.process_time() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--output-dir", default="output")
+    parser.add_argument("--interval", type=float, default=FLUSH_INTERVAL)
+    parser.add_argument("--max-chars", type=int, default=FLUSH_CHARS)
+    parser.add_argument("--tokens-per-sec", type=float, default=60.0)
+    args = parser.parse_args()
+
+    files = sorted(glob.glob(os.path.join(args.output_dir, "[0-9]_*.md")))
+    if not files:
+        sys.exit(f"No stage outputs found in {args.output_dir}/")
+
+    print(f"Flush interval {args.interval}s / {args.max_chars} chars, stream at {args.tokens_per_sec:.0f} tok/s\n")
+    print(f"{'STAGE':<28} {'TOKENS':>7} | {'RENDERS':>8} {'CHARS':>11} {'CPU ms':>8} | "
+          f"{'RENDERS':>8} {'CHARS':>9} {'CPU ms':>7}")
+    print(f"{'':<28} {'':>7} | {'-- per token (before) --':^29} | {'-- coalesced (after) --':^26}")
+
+    totals = [0, 0, 0.0, 0, 0, 0.0]
+    for path in files:
+        with open(path) as fh:
+            tokens = tokens_of(fh.read())
+        before, before_cpu = run_direct(tokens)
+        after, after_cpu = run_coalesced(tokens, args.interval, args.max_chars, args.tokens_per_sec)
+        name = os.path.basename(path)[:-3]
+        print(f"{name:<28} {len(tokens):>7} | {before.renders:>8} {before.chars:>11,} {before_cpu * 1000:>8.1f} | "
+              f"{after.renders:>8} {after.chars:>9,} {after_cpu * 1000:>7.1f}")
+        for i, v in enumerate((before.renders, before.chars, before_cpu, after.renders, after.chars, after_cpu)):
+            totals[i] += v
+
+    print(f"{'TOTAL':<28} {'':>7} | {totals[0]:>8} {totals[1]:>11,} {totals[2] * 1000:>8.1f} | "
+          f"{totals[3]:>8} {totals[4]:>9,} {totals[5] * 1000:>7.1f}")
+    if totals[3] and totals[5]:
+        print(f"\n{totals[0] / totals[3]:.0f}x fewer renders, {totals[2] / totals[5]:.0f}x less render CPU")
+
+
+if __name__ == "__main__":
+    main()
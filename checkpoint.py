@@ -0,0 +1,70 @@
+"""
+Checkpoints
+===========
+Crash-safe persistence for a deliberation in progress.
+
+Every stage's result is written to its own JSON file the moment the stage
+finishes, via write-to-temp + os.replace, so a file on disk is always either
+absent or complete. If a later stage fails, a resumed run loads these and
+only pays for the stages that never finished.
+
+Layout: <directory>/<stage_key>.json
+"""
+
+import os
+import json
+import tempfile
+
+
+def write_atomic(path: str, text: str) -> None:
+    """Replace `path` with `text` in one step; readers never see a partial file."""
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=directory, prefix=".tmp-", suffix=os.path.basename(path))
+    try:
+        with os.fdopen(fd, "w") as fh:
+            fh.write(text)
+            fh.flush()
+            os.fsync(fh.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.remove(tmp)
+        except FileNotFoundError:
+            pass
+        raise
+
+
+class CheckpointStore:
+    def __init__(self, directory: str):
+        self.directory = directory
+
+    def save(self, stage_key: str, data: dict) -> None:
+        write_atomic(os.path.join(self.directory, f"{stage_key}.json"), json.dumps(data))
+
+    def load(self) -> dict[str, dict]:
+        """All completed stages, keyed by stage. Unreadable files are skipped."""
+        if not os.path.isdir(self.directory):
+            return {}
+        loaded = {}
+        for name in sorted(os.listdir(self.directory)):
+            if not name.endswith(".json") or name.startswith(".tmp-"):
+                continue
+            try:
+                with open(os.path.join(self.directory, name), "r") as fh:
+                    loaded[name[:-len(".json")]] = json.load(fh)
+            except (OSError, json.JSONDecodeError):
+                continue
+        return loaded
+
+    def has_checkpoints(self) -> bool:
+        return bool(self.load())
+
+    def clear(self) -> None:
+        if not os.path.isdir(self.directory):
+            return
+        for name in os.listdir(self.directory):
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except FileNotFoundError:
+                pass
@@ -0,0 +1,117 @@
+"""
+API Clients
+===========
+Anthropic clients built on first use and shared, so importing a module that
+might call the API costs nothing until it actually does. `anthropic` (about
+1.5s to import) and `dotenv` are only imported here, inside the functions.
+
+  get_async_client()    rate-limited AsyncAnthropic client, one per event
+                        loop (an async pool belongs to the loop using it)
+  close_async_client()  close and forget the running loop's client
+  background_loop()     one event loop per process, on a daemon thread
+  run_blocking(coro)    run a coroutine on that loop and wait for it
+  load_env()            load .env once, if there is one
+
+The blocking entry points (run_agent, run_deliberation, and through them the
+CLI, jobs and batch) all run on background_loop(), so they share its client
+and its HTTP keep-alive pool for the life of the process: the first call
+pays for the import and the connection, later calls and runs reuse both.
+Async callers on their own loop get that loop's client and close it with
+close_async_client(). Retries are left to rate_limit (max_retries=0).
+"""
+
+import os
+import queue
+import asyncio
+import weakref
+import threading
+from typing import Awaitable, Callable, TypeVar
+
+T = TypeVar("T")
+
+PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+_lock = threading.Lock()
+_env_loaded = False
+_loop: asyncio.AbstractEventLoop | None = None
+_loop_thread: threading.Thread | None = None
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, object]" = weakref.WeakKeyDictionary()
+
+
+def load_env() -> None:
+    """Load .env from the working directory (else the project folder) into os.environ, once."""
+    global _env_loaded
+    if _env_loaded:
+        return
+    _env_loaded = True
+    for path in (os.path.join(os.getcwd(), ".env"), os.path.join(PROJECT_DIR, ".env")):
+        if os.path.exists(path):
+            from dotenv import load_dotenv
+
+            load_dotenv(path)
+            return
+
+
+def get_async_client():
+    """The rate-limited AsyncAnthropic client for the running event loop, created on first use."""
+    loop = asyncio.get_running_loop()
+    with _lock:
+        if loop not in _async_clients:
+            from anthropic import AsyncAnthropic
+            from rate_limit import limited_async
+
+            load_env()
+            _async_clients[loop] = limited_async(AsyncAnthropic(api_key=os.getenv("ANTHROPIC_API_KEY"), max_retries=0))
+        return _async_clients[loop]
+
+
+async def close_async_client() -> None:
+    """Close and forget the running loop's client, if it has one."""
+    with _lock:
+        api = _async_clients.pop(asyncio.get_running_loop(), None)
+    if api is not None:
+        await api.close()
+
+
+# ---------------------------------------------------------------------------
+# Background event loop
+# ---------------------------------------------------------------------------
+def background_loop() -> asyncio.AbstractEventLoop:
+    """The process-wide event loop, running on a daemon thread, started on first use."""
+    global _loop, _loop_thread
+    with _lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            _loop_thread = threading.Thread(target=_loop.run_forever, name="api-loop", daemon=True)
+            _loop_thread.start()
+        return _loop
+
+
+def deferred(callback: Callable | None, calls: queue.SimpleQueue) -> Callable | None:
+    """callback, queued instead of called, for run_blocking to call on the waiting thread."""
+    if callback is None:
+        return None
+    return lambda *args: calls.put((callback, args))
+
+
+def run_blocking(coro: Awaitable[T], calls: queue.SimpleQueue | None = None) -> T:
+    """
+    Run coro on background_loop() and block until it finishes. Callbacks
+    queued on `calls` (see deferred) run on this thread while it waits, so
+    callers see them on their own thread. Interrupting the wait (Ctrl-C)
+    cancels the coroutine. Must not be called from the background loop.
+    """
+    loop = background_loop()
+    if threading.current_thread() is _loop_thread:
+        raise RuntimeError("run_blocking() called on the background loop; await the coroutine instead")
+    calls = calls if calls is not None else queue.SimpleQueue()
+    future = asyncio.run_coroutine_threadsafe(coro, loop)
+    future.add_done_callback(lambda _: calls.put(None))
+    try:
+        while (call := calls.get()) is not None:
+            callback, args = call
+            callback(*args)
+    except BaseException:
+        future.cancel()
+        raise
+    return future.result()
@@ -0,0 +1,109 @@
+"""
+Context Budget
+==============
+Keeps a stage's prompt under a token ceiling by shrinking its least
+important sections first, so long engagements get predictable latency
+instead of context-overflow errors.
+
+Sections are visited in ascending priority (lowest is cut first). Each is
+first compacted (headings, numbered and bold lines kept, bullets shortened,
+prose paragraphs reduced to their first sentence) unless it is marked as
+not compactable;
+if the prompt is still over the ceiling it is trimmed, keeping its head and
+tail, down to no less than its floor.
+Every change is returned as a Cut so callers can log it.
+
+Token counts are local estimates (see tokens.py), not billing numbers.
+"""
+
+import re
+from dataclasses import dataclass
+
+from tokens import CHARS_PER_TOKEN, estimate_tokens
+
+OUTLINE_LINE = re.compile(r"^\s*(#{1,6} |\d+[.)] |\*\*|\|)")
+BULLET_LINE = re.compile(r"^\s*[-*+] ")
+FIRST_SENTENCE = re.compile(r"^(.+?[.!?])(\s|$)", re.S)
+MAX_LINE_CHARS = 240
+MAX_BULLET_CHARS = 80
+HEAD_SHARE = 2 / 3
+
+
+@dataclass
+class Section:
+    name: str
+    text: str
+    priority: int
+    floor: int = 0
+    compactable: bool = True
+
+
+@dataclass
+class Cut:
+    section: str
+    action: str
+    before: int
+    after: int
+
+    def describe(self) -> str:
+        return f"{self.section} {self.action} {self.before:,} -> {self.after:,} tokens"
+
+
+def _shorten(line: str, limit: int) -> str:
+    return line if len(line) <= limit else line[:limit].rstrip() + "..."
+
+
+def compact(text: str) -> str:
+    """Keep the outline of a markdown answer: headings and steps whole, bullets short, prose as one sentence."""
+    kept = []
+    for paragraph in re.split(r"\n\s*\n", text.strip()):
+        lines = paragraph.splitlines()
+        if any(OUTLINE_LINE.match(line) or BULLET_LINE.match(line) for line in lines):
+            kept.append("\n".join(
+                _shorten(line, MAX_LINE_CHARS) if OUTLINE_LINE.match(line) else _shorten(line, MAX_BULLET_CHARS)
+                for line in lines if OUTLINE_LINE.match(line) or BULLET_LINE.match(line)
+            ))
+        else:
+            match = FIRST_SENTENCE.match(paragraph.strip())
+            kept.append(_shorten(match.group(1) if match else paragraph.strip(), MAX_LINE_CHARS))
+    return "\n\n".join(kept)
+
+
+def trim(text: str, max_tokens: int) -> str:
+    """Cut `text` to ~max_tokens, keeping the head and tail at line boundaries."""
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    budget = max(0, max_tokens * CHARS_PER_TOKEN - 80)
+    head = text[:int(budget * HEAD_SHARE)]
+    tail = text[len(text) - (budget - len(head)):] if budget > len(head) else ""
+    head = head[:head.rfind("\n")] if "\n" in head else head
+    tail = tail[tail.find("\n") + 1:] if "\n" in tail else tail
+    dropped = estimate_tokens(text) - estimate_tokens(head) - estimate_tokens(tail)
+    return f"{head}\n\n[... {dropped:,} tokens cut to fit the context budget ...]\n\n{tail}".strip()
+
+
+def fit(sections: list[Section], ceiling: int, fixed_tokens: int = 0) -> tuple[dict[str, str], list[Cut], int]:
+    """
+    Shrink sections until fixed_tokens plus their estimates fit `ceiling`.
+    Returns ({name: text}, cuts made in order, resulting token estimate),
+    which can still exceed the ceiling if every section is at its floor.
+    """
+    texts = {s.name: s.text for s in sections}
+    total = fixed_tokens + sum(estimate_tokens(t) for t in texts.values())
+    cuts: list[Cut] = []
+    for section in sorted(sections, key=lambda s: s.priority):
+        for action in ("compacted", "trimmed"):
+            if total <= ceiling:
+                return texts, cuts, total
+            current = estimate_tokens(texts[section.name])
+            if action == "compacted":
+                shrunk = compact(texts[section.name]) if section.compactable else texts[section.name]
+            else:
+                target = max(section.floor, current - (total - ceiling))
+                shrunk = trim(texts[section.name], target) if target < current else texts[section.name]
+            after = estimate_tokens(shrunk)
+            if after < current:
+                texts[section.name] = shrunk
+                total -= current - after
+                cuts.append(Cut(section.name, action, current, after))
+    return texts, cuts, total
@@ -0,0 +1,191 @@
+"""
+Event Bus
+=========
+Fans a deliberation's stream events out to any number of subscribers
+(UI, live file writers, metrics) without letting a slow one stall the model.
+
+Each subscriber gets its own bounded queue and worker thread. publish()
+never blocks: when a subscriber's queue is full, a new token event is merged
+into that stage's token event still waiting in the queue (its pieces are
+joined once, on delivery), so the subscriber still sees every character,
+just in bigger pieces. Lifecycle events are always delivered, in order, and
+close a stage's pending token event, so nothing merges across them. A full
+queue therefore grows by at most one token event and the lifecycle events
+per stage, however slow the subscriber.
+
+Event kinds:
+  stage_start   a stage began                  (text empty)
+  token         streamed text                  (text = chunk)
+  usage         token usage for the stage      (data = usage counts)
+  stage_end     a stage finished               (data = chars, duration, cached, reused)
+
+    with EventBus() as bus:
+        bus.subscribe(lambda e: print(e.kind, e.agent_name), name="log")
+        run_deliberation(bus=bus)
+
+AsyncEvents takes the bus's place for asyncio callers: the same publish(),
+consumed with `async for` on the event loop it was created on (see
+orchestrator.stream_deliberation).
+"""
+
+import time
+import asyncio
+import threading
+from collections import deque
+from dataclasses import dataclass, field, replace
+from typing import Callable
+
+STAGE_START = "stage_start"
+TOKEN = "token"
+USAGE = "usage"
+STAGE_END = "stage_end"
+
+
+@dataclass(frozen=True)
+class StreamEvent:
+    kind: str
+    stage: str
+    agent_name: str
+    text: str = ""
+    index: int = 0
+    data: dict = field(default_factory=dict)
+    timestamp: float = field(default_factory=time.time)
+
+
+class _Pending:
+    """A queued event; a token event's text arrives in pieces, joined on delivery."""
+
+    __slots__ = ("event", "parts")
+
+    def __init__(self, event: StreamEvent):
+        self.event = event
+        self.parts = [event.text]
+
+    def deliver(self) -> StreamEvent:
+        if len(self.parts) == 1:
+            return self.event
+        return replace(self.event, text="".join(self.parts))
+
+
+class Subscription:
+    """One subscriber: a bounded queue drained by a dedicated thread."""
+
+    def __init__(self, handler: Callable[[StreamEvent], None], maxsize: int = 256, name: str = ""):
+        self.handler = handler
+        self.maxsize = maxsize
+        self.name = name or getattr(handler, "__name__", "subscriber")
+        self.merged = 0
+        self.errors = 0
+        self._queue: deque[_Pending] = deque()
+        # stage -> its queued, not yet delivered token event (merge target when full)
+        self._open_tokens: dict[str, _Pending] = {}
+        self._cond = threading.Condition()
+        self._closed = False
+        self._thread = threading.Thread(target=self._drain, name=f"bus-{self.name}", daemon=True)
+        self._thread.start()
+
+    def offer(self, event: StreamEvent) -> None:
+        with self._cond:
+            if self._closed:
+                return
+            if event.kind == TOKEN:
+                pending = self._open_tokens.get(event.stage)
+                if pending and len(self._queue) >= self.maxsize:
+                    pending.parts.append(event.text)
+                    self.merged += 1
+                    return
+                pending = _Pending(event)
+                self._open_tokens[event.stage] = pending
+            else:
+                pending = _Pending(event)
+                self._open_tokens.pop(event.stage, None)
+            self._queue.append(pending)
+            self._cond.notify()
+
+    def _drain(self) -> None:
+        while True:
+            with self._cond:
+                while not self._queue and not self._closed:
+                    self._cond.wait()
+                if not self._queue:
+                    return
+                pending = self._queue.popleft()
+                if self._open_tokens.get(pending.event.stage) is pending:
+                    del self._open_tokens[pending.event.stage]
+                event = pending.deliver()
+            try:
+                self.handler(event)
+            except Exception as e:
+                self.errors += 1
+                if self.errors == 1:
+                    print(f"  !! subscriber {self.name} failed: {type(e).__name__}: {e}")
+
+    def close(self, timeout: float | None = None) -> None:
+        """Deliver everything already queued, then stop the worker thread."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        self._thread.join(timeout)
+
+
+class EventBus:
+    def __init__(self):
+        self._subscribers: list[Subscription] = []
+        self._lock = threading.Lock()
+
+    def subscribe(self, handler: Callable[[StreamEvent], None], maxsize: int = 256, name: str = "") -> Subscription:
+        sub = Subscription(handler, maxsize, name)
+        with self._lock:
+            self._subscribers.append(sub)
+        return sub
+
+    def publish(self, event: StreamEvent) -> None:
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for sub in subscribers:
+            sub.offer(event)
+
+    def close(self, timeout: float | None = None) -> None:
+        with self._lock:
+            subscribers, self._subscribers = self._subscribers, []
+        for sub in subscribers:
+            sub.close(timeout)
+
+    def __enter__(self) -> "EventBus":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class AsyncEvents:
+    """
+    Publish target that is also an async iterator. publish() is thread-safe
+    and never blocks; iteration ends once close() has been called and every
+    published event has been consumed. Create it on the loop that iterates.
+    """
+
+    _END = object()
+
+    def __init__(self):
+        self._loop = asyncio.get_running_loop()
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._closed = False
+
+    def publish(self, event: StreamEvent) -> None:
+        if not self._closed:
+            self._loop.call_soon_threadsafe(self._queue.put_nowait, event)
+
+    def close(self) -> None:
+        if not self._closed:
+            self._closed = True
+            self._loop.call_soon_threadsafe(self._queue.put_nowait, self._END)
+
+    def __aiter__(self) -> "AsyncEvents":
+        return self
+
+    async def __anext__(self) -> StreamEvent:
+        event = await self._queue.get()
+        if event is self._END:
+            raise StopAsyncIteration
+        return event
@@ -0,0 +1,75 @@
+"""
+File Store
+==========
+In-process cache of file listings and contents for the Streamlit app, so a
+rerun only touches files that actually changed.
+
+  - Directory listings are re-globbed only when the directory's mtime changes
+    (creating, deleting or renaming a file updates it).
+  - File contents are re-read only when the file's (mtime_ns, size)
+    signature changes; a content hash is kept alongside for callers that
+    want a stable identity for the text.
+
+One FileStore is meant to be shared for the life of the process.
+"""
+
+import os
+import glob
+import hashlib
+import threading
+
+
+def signature(path: str) -> tuple[int, int] | None:
+    """(mtime_ns, size) of a file, or None if it does not exist."""
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+class FileStore:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._listings: dict[tuple[str, str], tuple[int, list[str]]] = {}
+        self._files: dict[str, tuple[tuple[int, int], str, str]] = {}
+        self.reads = 0
+
+    def list(self, directory: str, pattern: str = "*") -> list[str]:
+        """Sorted paths matching `pattern` in `directory`, re-globbed only when the directory changes."""
+        try:
+            mtime = os.stat(directory).st_mtime_ns
+        except FileNotFoundError:
+            return []
+        key = (directory, pattern)
+        with self._lock:
+            cached = self._listings.get(key)
+            if cached and cached[0] == mtime:
+                return list(cached[1])
+        paths = sorted(glob.glob(os.path.join(directory, pattern)))
+        with self._lock:
+            self._listings[key] = (mtime, paths)
+        return list(paths)
+
+    def read(self, path: str) -> str | None:
+        """File text, from cache unless its signature changed. None if missing."""
+        sig = signature(path)
+        if sig is None:
+            return None
+        with self._lock:
+            cached = self._files.get(path)
+            if cached and cached[0] == sig:
+                return cached[2]
+        with open(path, "r") as fh:
+            text = fh.read()
+        with self._lock:
+            self._files[path] = (sig, hashlib.sha256(text.encode("utf-8")).hexdigest(), text)
+            self.reads += 1
+        return text
+
+    def content_hash(self, path: str) -> str | None:
+        """SHA-256 of the file's current text."""
+        if self.read(path) is None:
+            return None
+        with self._lock:
+            return self._files[path][1]
@@ -1,17 +1,21 @@
 """
 Generate the Challenge 2 workflow PDF.
-Reads the architect's output dynamically and uses Claude to extract
-structured steps, then renders a compact left-to-right flowchart.
+Reads the step list parsed from the revised Architect plan (output/steps.json,
+see plan_parser) and renders a compact left-to-right flowchart, continued
+over extra pages when the plan is too long for one. Runs offline.
+
+Usage:
+    python generate_pdf.py                               # output/ -> challenge_2_response.pdf
+    python generate_pdf.py output/batch/* -j 8           # <dir>/workflow.pdf for each run directory
 """
 
 import os
-import json
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
 from fpdf import FPDF
-from anthropic import Anthropic
-from dotenv import load_dotenv
-
-load_dotenv()
-client = Anthropic(api_key=os.getenv("ANTHROPIC_API_KEY"))
+from plan_parser import load_steps
 
 
 # ── Colors ──
@@ -25,11 +29,42 @@ C_ARROW  = (160, 170, 180)
 C_TEXT   = (35, 35, 35)
 C_MUTED  = (110, 115, 125)
 
+TYPE_STYLES = {
+    "auto":   (C_BG_AUTO,   C_AUTO),
+    "human":  (C_BG_HUMAN,  C_HUMAN),
+    "hybrid": (C_BG_HYBRID, C_HYBRID),
+}
+
+# ── Flowchart geometry (mm, A4 portrait) ──
+PAGE_H = 297
+PAGE_TOP = 14
+PAGE_BOTTOM = 14    # nothing is drawn below PAGE_H - PAGE_BOTTOM
+FLOW_COLS = 4
+H_GAP = 3.5
+V_GAP = 5.5
+BOX_H_MAX = 36
+BOX_H_MIN = 28      # below this, boxes stop shrinking and the chart continues on a new page
+FOOTER_GAP = V_GAP + 1  # last row of boxes -> legend
+CONTINUED_H = 10    # "continued on next page" note under a page's last row
+
+TOOLS_TEXT = (
+    "Claude (Anthropic API) powers all four agents -- each gets a specialized system prompt and sees "
+    "all prior reasoning. I used GitHub Copilot to write the prototype code, Streamlit for a real-time "
+    "UI where you can watch agents deliberate, and fpdf2 to dynamically generate this flowchart from "
+    "agent outputs (nothing here is hardcoded). Full codebase, transcripts, and outputs are in the repo."
+)
+CLOSING_TEXT = "If this proposal process were a taco, the AI handles the shell and the human brings the salsa."
+# Footer layout (mm): legend line, then the tools title, its body, the closing line.
+LEGEND_TO_TITLE = 8
+TITLE_H = 5
+TOOLS_LINE_H = 4
+CLOSING_H = 4
+
 
 class ResponsePDF(FPDF):
     def __init__(self):
         super().__init__()
-        self.set_auto_page_break(auto=False)
+        self.set_auto_page_break(auto=False, margin=PAGE_BOTTOM)
 
     # ── Drawing helpers ──
 
@@ -78,6 +113,96 @@ class ResponsePDF(FPDF):
             style="F",
         )
 
+    def step_box(self, x, y, w, h, number, step):
+        """One flowchart step: number, type/time badge, name, description, tools."""
+        s_type = step.get("type", "auto")
+        if s_type not in TYPE_STYLES:
+            s_type = "auto"
+        bg, border = TYPE_STYLES[s_type]
+
+        # Draw box
+        self.rounded_box(x, y, w, h, 2.5, bg, border)
+
+        # Step number (top-left)
+        self.set_font("Helvetica", "B", 7.5)
+        self.set_text_color(*border)
+        self.set_xy(x + 2, y + 1.5)
+        self.cell(6, 3, str(number))
+
+        # Type + time badge (top-right)
+        badge = f"{s_type.upper()} | {step.get('time', '')}"
+        self.set_font("Helvetica", "B", 5.5)
+        self.set_text_color(*border)
+        self.set_xy(x + w - 23, y + 1.5)
+        self.cell(21, 3, badge, align="R")
+
+        # Step name
+        self.set_font("Helvetica", "B", 8)
+        self.set_text_color(25, 25, 25)
+        self.set_xy(x + 2, y + 6)
+        self.multi_cell(w - 4, 3.5, step["name"], align="L")
+
+        # Description
+        self.set_font("Helvetica", "", 6.5)
+        self.set_text_color(70, 70, 70)
+        self.set_xy(x + 2, y + 14)
+        self.multi_cell(w - 4, 3, step.get("desc", ""), align="L")
+
+        # Tools (bottom)
+        self.set_font("Helvetica", "I", 5.5)
+        self.set_text_color(*border)
+        self.set_xy(x + 2, y + h - 6)
+        self.multi_cell(w - 4, 2.8, step.get("tools", ""), align="L")
+
+    def legend(self, y, steps):
+        """Type legend plus the total workflow time, on one line at y."""
+        items = [
+            ("AI-AUTOMATED", C_AUTO, C_BG_AUTO),
+            ("HUMAN JUDGMENT", C_HUMAN, C_BG_HUMAN),
+            ("HYBRID", C_HYBRID, C_BG_HYBRID),
+        ]
+        for i, (label, border_c, bg_c) in enumerate(items):
+            lx = self.l_margin + i * 32
+            self.set_fill_color(*bg_c)
+            self.set_draw_color(*border_c)
+            self.set_line_width(0.4)
+            self.rect(lx, y, 4, 3, style="DF", round_corners=True, corner_radius=1)
+            self.set_font("Helvetica", "", 5.5)
+            self.set_text_color(*C_MUTED)
+            self.set_xy(lx + 5, y)
+            self.cell(26, 3, label)
+
+        # Total workflow time
+        total_min = sum(int(''.join(c for c in step.get('time', '0') if c.isdigit()) or '0') for step in steps)
+        self.set_font("Helvetica", "B", 6)
+        self.set_text_color(*C_MUTED)
+        self.set_xy(self.l_margin + 96, y)
+        target = "WITHIN" if total_min <= 60 else "OVER"
+        self.cell(0, 3, f"TOTAL: ~{total_min} MIN ({target} 60-MIN TARGET)")
+
+    def footer_height(self, steps) -> float:
+        """Height of footer_block() from the legend's top, with the body wrapped at the current width."""
+        self.set_font("Helvetica", "", 8.5)
+        lines = len(self.multi_cell(0, TOOLS_LINE_H, TOOLS_TEXT, dry_run=True, output="LINES"))
+        return LEGEND_TO_TITLE + TITLE_H + 1 + lines * TOOLS_LINE_H + 3 + CLOSING_H
+
+    def footer_block(self, y, steps):
+        """Legend at y, then "AI Tools Used" and the closing line; leaves y below the closing line."""
+        self.legend(y, steps)
+        self.set_y(y + LEGEND_TO_TITLE)
+        self.set_font("Helvetica", "B", 9.5)
+        self.set_text_color(20, 20, 20)
+        self.cell(0, TITLE_H, "AI Tools Used", new_x="LMARGIN", new_y="NEXT")
+        self.ln(1)
+
+        self.set_font("Helvetica", "", 8.5)
+        self.set_text_color(*C_TEXT)
+        self.multi_cell(0, TOOLS_LINE_H, TOOLS_TEXT)
+        self.ln(3)
+        self.set_font("Helvetica", "I", 8)
+        self.set_text_color(*C_MUTED)
+        self.cell(0, CLOSING_H, CLOSING_TEXT, align="C", new_x="LMARGIN", new_y="NEXT")
+
     def agent_pill(self, x, y, w, h, label, fill_rgb, text_rgb):
         """Draw a small pill/chip for agent names."""
         self.set_fill_color(*fill_rgb)
@@ -90,61 +215,77 @@ class ResponsePDF(FPDF):
         self.cell(w, h, label, align="C")
 
 
-def extract_steps_from_output(output_dir="output"):
-    """Read the revised architect output and ask Claude to extract structured steps."""
-    architect_path = os.path.join(output_dir, "5_architect_revised.md")
-    toolsmith_path = os.path.join(output_dir, "4_toolsmith.md")
-
-    architect_text = open(architect_path).read()
-    toolsmith_text = open(toolsmith_path).read()
-
-    response = client.messages.create(
-        model="claude-sonnet-4-20250514",
-        max_tokens=2000,
-        messages=[{
-            "role": "user",
-            "content": f"""Extract the workflow steps from this architect plan and toolsmith analysis into structured JSON.
-
-ARCHITECT PLAN:
-{architect_text}
-
-TOOLSMITH ANALYSIS:
-{toolsmith_text}
-
-Return ONLY valid JSON (no markdown fencing) with this exact structure:
-{{
-  "steps": [
-    {{
-      "name": "short name (max 16 chars)",
-      "desc": "what happens (max 50 chars)",
-      "tools": "tool(s) used (max 30 chars)",
-      "type": "auto" or "human" or "hybrid",
-      "time": "X min"
-    }}
-  ]
-}}
-
-Rules:
-- Extract 8-12 steps maximum, combining small steps if needed
-- Use plain ASCII only (no em dashes, smart quotes, or special characters)
-- Keep names very short - they go in small boxes
-- "type" must be exactly "auto", "human", or "hybrid"
-- Order steps chronologically as in the plan"""
-        }]
-    )
+def pdf_text(text: str, limit: int) -> str:
+    """Latin-1-safe text for the core fonts, cut at a word boundary to fit a box."""
+    for fancy, plain in (("\u2014", "--"), ("\u2013", "-"), ("\u2018", "'"), ("\u2019", "'"),
+                         ("\u201c", '"'), ("\u201d", '"'), ("\u2026", "...")):
+        text = text.replace(fancy, plain)
+    text = text.encode("latin-1", "replace").decode("latin-1")
+    if len(text) <= limit:
+        return text
+    cut = text[:limit - 3].rsplit(" ", 1)[0].rstrip(",;:-")
+    return cut + "..."
+
+
+def box_steps(steps: list[dict]) -> list[dict]:
+    """Validated plan steps (plan_parser.load_steps) in the short form the flowchart boxes hold."""
+    return [
+        {
+            "name": pdf_text(step["name"], 34),
+            "desc": pdf_text(step["desc"], 60),
+            "tools": pdf_text(step["tools"], 40),
+            "type": step["type"],
+            "time": f"{step['minutes']} min",
+        }
+        for step in steps
+    ]
+
 
-    raw = response.content[0].text.strip()
-    if raw.startswith("```"):
-        raw = raw.split("\n", 1)[1].rsplit("```", 1)[0].strip()
-    return json.loads(raw)["steps"]
+def paginate_rows(rows: int, first_top: float, footer_h: float) -> tuple[list[int], bool]:
+    """
+    Split `rows` flowchart rows over pages. The first page starts at
+    first_top (below the intro text), later ones at PAGE_TOP; the footer
+    (legend + "AI Tools Used" + closing line) takes footer_h below the
+    last row. Everything stays on one page while boxes can shrink to
+    BOX_H_MIN; past that, pages hold full-height rows. Returns (rows per
+    page, whether the footer needs a page of its own).
+    """
+    bottom = PAGE_H - PAGE_BOTTOM
+
+    def fitting(top: float, reserve: float, box_h: float) -> int:
+        return int((bottom - top - reserve) // (box_h + V_GAP))
+
+    footer = FOOTER_GAP - V_GAP + footer_h
+    if rows <= fitting(first_top, footer, BOX_H_MIN):
+        return [rows], False
+    pages, top = [], first_top
+    while rows:
+        if rows <= fitting(top, footer, BOX_H_MAX):
+            return pages + [rows], False
+        page_rows = min(rows, max(1, fitting(top, CONTINUED_H - V_GAP, BOX_H_MAX)))
+        pages.append(page_rows)
+        rows -= page_rows
+        top = PAGE_TOP + 8
+    return pages, True
+
+
+def generate(github_url="https://github.com/elliotnou/kts", output_dir="output", output_path=None, verbose=True):
+    # ── Steps parsed from the revised plan (output/steps.json) ──
+    steps = box_steps(load_steps(output_dir))
+    if verbose:
+        print(f"Loaded {len(steps)} steps from {output_dir}/")
+    pdf = build_pdf(steps, github_url)
 
+    # ── Output ──
+    output_path = output_path or os.path.join(os.path.dirname(__file__), "challenge_2_response.pdf")
+    pdf.output(output_path)
+    if verbose:
+        print(f"PDF generated: {output_path}")
+    return output_path
 
-def generate(github_url="https://github.com/elliotnou/kts"):
-    # ── Extract steps dynamically from agent outputs ──
-    print("Extracting steps from agent outputs via Claude...")
-    steps = extract_steps_from_output()
-    print(f"  Got {len(steps)} steps")
 
+def build_pdf(steps: list[dict], github_url: str) -> ResponsePDF:
+    """Lay out the response document for box_steps() output; the caller writes it."""
     pdf = ResponsePDF()
     pdf.add_page()
     pdf.set_margins(18, 14, 18)
@@ -205,138 +346,144 @@ def generate(github_url="https://github.com/elliotnou/kts"):
     pdf.ln(10)
 
     # ════════════════════════════════════════════════════════
-    # FLOWCHART (left-to-right grid)
+    # FLOWCHART (left-to-right grid, continued over pages if needed)
     # ════════════════════════════════════════════════════════
-    type_styles = {
-        "auto":   (C_BG_AUTO,   C_AUTO),
-        "human":  (C_BG_HUMAN,  C_HUMAN),
-        "hybrid": (C_BG_HYBRID, C_HYBRID),
-    }
-
-    cols = 4
+    cols = FLOW_COLS
     rows = (len(steps) + cols - 1) // cols
-    h_gap = 3.5
-    v_gap = 5.5
-    box_w = (W - (cols - 1) * h_gap) / cols
-    # Size boxes to fill available space, leave ~30mm for legend + tools + pun
-    remaining_h = 297 - pdf.get_y() - 30
-    box_h = min(36, (remaining_h - (rows - 1) * v_gap) / rows)
-
+    box_w = (W - (cols - 1) * H_GAP) / cols
     start_y = pdf.get_y()
-    box_positions = []
-
-    for idx, step in enumerate(steps):
-        row = idx // cols
-        col = idx % cols
-
-        s_type = step.get("type", "auto")
-        if s_type not in type_styles:
-            s_type = "auto"
-        bg, border = type_styles[s_type]
+    footer_h = pdf.footer_height(steps)
+    pages, footer_on_new_page = paginate_rows(rows, start_y, footer_h)
+    if len(pages) == 1 and not footer_on_new_page:
+        # Size boxes to fill available space, leave room for legend + tools + pun
+        room = PAGE_H - PAGE_BOTTOM - start_y - FOOTER_GAP - footer_h
+        box_h = min(BOX_H_MAX, (room - (rows - 1) * V_GAP) / rows)
+    else:
+        box_h = BOX_H_MAX
 
-        x = pdf.l_margin + col * (box_w + h_gap)
-        y = start_y + row * (box_h + v_gap)
-        box_positions.append((x, y, box_w, box_h))
-
-        # Draw box
-        pdf.rounded_box(x, y, box_w, box_h, 2.5, bg, border)
-
-        # Step number (top-left)
-        pdf.set_font("Helvetica", "B", 7.5)
-        pdf.set_text_color(*border)
-        pdf.set_xy(x + 2, y + 1.5)
-        pdf.cell(6, 3, str(idx + 1))
-
-        # Type + time badge (top-right)
-        badge = f"{s_type.upper()} | {step.get('time', '')}"
-        pdf.set_font("Helvetica", "B", 5.5)
-        pdf.set_text_color(*border)
-        pdf.set_xy(x + box_w - 23, y + 1.5)
-        pdf.cell(21, 3, badge, align="R")
-
-        # Step name
-        pdf.set_font("Helvetica", "B", 8)
-        pdf.set_text_color(25, 25, 25)
-        pdf.set_xy(x + 2, y + 6)
-        pdf.multi_cell(box_w - 4, 3.5, step["name"], align="L")
-
-        # Description
-        pdf.set_font("Helvetica", "", 6.5)
-        pdf.set_text_color(70, 70, 70)
-        pdf.set_xy(x + 2, y + 14)
-        pdf.multi_cell(box_w - 4, 3, step.get("desc", ""), align="L")
-
-        # Tools (bottom)
-        pdf.set_font("Helvetica", "I", 5.5)
-        pdf.set_text_color(*border)
-        pdf.set_xy(x + 2, y + box_h - 6)
-        pdf.multi_cell(box_w - 4, 2.8, step.get("tools", ""), align="L")
+    box_positions = []
+    first_row = 0
+    for page_index, page_rows in enumerate(pages):
+        if page_index:
+            pdf.add_page()
+            pdf.set_y(PAGE_TOP)
+            pdf.set_font("Helvetica", "B", 9.5)
+            pdf.set_text_color(20, 20, 20)
+            pdf.cell(0, 5, "Workflow plan (continued)", new_x="LMARGIN", new_y="NEXT")
+            pdf.ln(3)
+            start_y = pdf.get_y()
+        for idx in range(first_row * cols, min(len(steps), (first_row + page_rows) * cols)):
+            x = pdf.l_margin + (idx % cols) * (box_w + H_GAP)
+            y = start_y + (idx // cols - first_row) * (box_h + V_GAP)
+            box_positions.append((pdf.page, x, y, box_w, box_h))
+            pdf.step_box(x, y, box_w, box_h, idx + 1, steps[idx])
+        first_row += page_rows
 
     # ── Arrows between boxes ──
     for i in range(len(steps) - 1):
-        x1, y1, w1, h1 = box_positions[i]
-        x2, y2, w2, h2 = box_positions[i + 1]
-        i_col = i % cols
-        if i_col < cols - 1:
+        page1, x1, y1, w1, h1 = box_positions[i]
+        page2, x2, y2, w2, h2 = box_positions[i + 1]
+        pdf.page = page1
+        if page1 != page2:
+            pdf.set_font("Helvetica", "I", 6)
+            pdf.set_text_color(*C_MUTED)
+            pdf.set_xy(x1, y1 + h1 + 0.5)
+            pdf.cell(w1, 3, "continued on next page", align="R")
+        elif i % cols < cols - 1:
             pdf.arrow_right(x1 + w1 + 0.5, x2 - 0.5, y1 + h1 / 2)
         else:
             pdf.arrow_bend(x1 + w1 / 2, y1 + h1, x2 + w2 / 2, y2)
-
-    # ── Legend ──
-    last_row = (len(steps) - 1) // cols
-    legend_y = start_y + (last_row + 1) * (box_h + v_gap) + 1
-    items = [
-        ("AI-AUTOMATED", C_AUTO, C_BG_AUTO),
-        ("HUMAN JUDGMENT", C_HUMAN, C_BG_HUMAN),
-        ("HYBRID", C_HYBRID, C_BG_HYBRID),
-    ]
-    for i, (label, border_c, bg_c) in enumerate(items):
-        lx = pdf.l_margin + i * 32
-        pdf.set_fill_color(*bg_c)
-        pdf.set_draw_color(*border_c)
-        pdf.set_line_width(0.4)
-        pdf.rect(lx, legend_y, 4, 3, style="DF", round_corners=True, corner_radius=1)
-        pdf.set_font("Helvetica", "", 5.5)
-        pdf.set_text_color(*C_MUTED)
-        pdf.set_xy(lx + 5, legend_y)
-        pdf.cell(26, 3, label)
-
-    # Total workflow time
-    total_min = sum(int(''.join(c for c in step.get('time', '0') if c.isdigit()) or '0') for step in steps)
-    pdf.set_font("Helvetica", "B", 6)
-    pdf.set_text_color(*C_MUTED)
-    pdf.set_xy(pdf.l_margin + 96, legend_y)
-    pdf.cell(0, 3, f"TOTAL: ~{total_min} MIN (WITHIN 60-MIN TARGET)")
+    pdf.page = box_positions[-1][0]
 
     # ════════════════════════════════════════════════════════
-    # AI TOOLS USED
+    # LEGEND + AI TOOLS USED (on a page of their own if they don't fit)
     # ════════════════════════════════════════════════════════
-    pdf.set_y(legend_y + 8)
-    pdf.set_font("Helvetica", "B", 9.5)
-    pdf.set_text_color(20, 20, 20)
-    pdf.cell(0, 5, "AI Tools Used", new_x="LMARGIN", new_y="NEXT")
-    pdf.ln(1)
+    legend_y = box_positions[-1][2] + box_h + FOOTER_GAP
+    if footer_on_new_page or legend_y + footer_h > pdf.h - pdf.b_margin:
+        pdf.add_page()
+        legend_y = PAGE_TOP
+    pdf.footer_block(legend_y, steps)
 
-    pdf.set_font("Helvetica", "", 8.5)
-    pdf.set_text_color(*C_TEXT)
-    pdf.multi_cell(0, 4,
-        "Claude (Anthropic API) powers all four agents -- each gets a specialized system prompt and sees "
-        "all prior reasoning. I used GitHub Copilot to write the prototype code, Streamlit for a real-time "
-        "UI where you can watch agents deliberate, and fpdf2 to dynamically generate this flowchart from "
-        "agent outputs (nothing here is hardcoded). Full codebase, transcripts, and outputs are in the repo."
-    )
-    pdf.ln(3)
-    pdf.set_font("Helvetica", "I", 8)
-    pdf.set_text_color(*C_MUTED)
-    pdf.cell(0, 4, "If this proposal process were a taco, the AI handles the shell and the human brings the salsa.",
-             align="C")
+    return pdf
 
-    # ── Output ──
-    output_path = os.path.join(os.path.dirname(__file__), "challenge_2_response.pdf")
-    pdf.output(output_path)
-    print(f"PDF generated: {output_path}")
-    return output_path
+
+# ---------------------------------------------------------------------------
+# Batch rendering
+# ---------------------------------------------------------------------------
+BATCH_PDF_NAME = "workflow.pdf"
+
+
+@dataclass
+class PdfJob:
+    output_dir: str
+    pdf_path: str
+    pages: int = 0
+    seconds: float = 0.0
+    error: str = ""
+
+
+def _init_worker():
+    """
+    Runs once per worker process: render a throwaway page so fpdf2's core
+    font metrics and module state are loaded before the first real job,
+    instead of being paid inside every job's timing.
+    """
+    pdf = ResponsePDF()
+    pdf.add_page()
+    for style in ("", "B", "I", "U"):
+        pdf.set_font("Helvetica", style, 8)
+        pdf.cell(0, 4, "warm-up")
+    pdf.output()
+
+
+def _render_one(job: PdfJob, github_url: str) -> PdfJob:
+    started = time.perf_counter()
+    try:
+        pdf = build_pdf(box_steps(load_steps(job.output_dir)), github_url)
+        pdf.output(job.pdf_path)
+        job.pages = pdf.pages_count
+    except Exception as e:
+        job.error = f"{type(e).__name__}: {e}"
+    job.seconds = time.perf_counter() - started
+    return job
+
+
+def render_batch(
+    output_dirs: list[str],
+    workers: int | None = None,
+    pdf_name: str = BATCH_PDF_NAME,
+    github_url: str = "https://github.com/elliotnou/kts",
+) -> list[PdfJob]:
+    """
+    Render <dir>/<pdf_name> for every run directory in a process pool.
+    A directory that fails (no steps.json or plan) is recorded in its
+    PdfJob.error and does not stop the batch. Returns jobs in input order.
+    """
+    jobs = [PdfJob(d, os.path.join(d, pdf_name)) for d in output_dirs]
+    workers = max(1, min(workers or os.cpu_count() or 1, len(jobs)))
+    chunksize = max(1, len(jobs) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        return list(pool.map(_render_one, jobs, [github_url] * len(jobs), chunksize=chunksize))
 
 
 if __name__ == "__main__":
-    generate()
+    parser = argparse.ArgumentParser(description="Render workflow PDFs from deliberation output directories.")
+    parser.add_argument("output_dirs", nargs="*", help="run directories (default: output/ -> challenge_2_response.pdf)")
+    parser.add_argument("-j", "--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--name", default=BATCH_PDF_NAME, help="PDF filename written inside each directory")
+    args = parser.parse_args()
+
+    if not args.output_dirs:
+        generate()
+    else:
+        started = time.perf_counter()
+        jobs = render_batch(args.output_dirs, args.workers, args.name)
+        wall = time.perf_counter() - started
+        for job in jobs:
+            if job.error:
+                print(f"  FAILED {job.output_dir}: {job.error}")
+        ok = [j for j in jobs if not j.error]
+        print(
+            f"{len(ok)}/{len(jobs)} PDFs ({sum(j.pages for j in ok)} pages) in {wall:.2f}s wall, "
+            f"{sum(j.seconds for j in ok) / max(1, len(ok)) * 1000:.0f} ms avg per PDF"
+        )
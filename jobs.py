@@ -0,0 +1,190 @@
+"""
+Background Deliberation Jobs
+============================
+Runs deliberations on worker threads that live for the whole process, so a
+Streamlit script run never blocks on one and a page refresh can reattach.
+
+  manager = get_manager()
+  job_id = manager.submit(transcript_dir="transcripts", output_dir="output")
+  job = manager.get(job_id)       # poll job.snapshot() for progress
+
+At most MAX_CONCURRENT_DELIBERATIONS jobs run at once (env, default 2); the
+rest wait as "queued". Submitting work for an output directory that already
+has a queued or running job returns that job instead of starting a duplicate.
+manager.cancel(job_id) stops a queued or running job; its finished stages
+stay checkpointed for a resume.
+"""
+
+import os
+import time
+import uuid
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+
+from event_bus import EventBus, StreamEvent, STAGE_START, TOKEN, STAGE_END
+from stream_coalescer import StreamCoalescer
+from checkpoint import CheckpointStore
+from telemetry import RUN_LOG_NAME
+from run_store import get_store
+
+MAX_CONCURRENT = int(os.getenv("MAX_CONCURRENT_DELIBERATIONS", "2"))
+MAX_FINISHED_KEPT = 50
+
+QUEUED, RUNNING, DONE, FAILED, CANCELLED = "queued", "running", "done", "failed", "cancelled"
+
+
+@dataclass
+class Job:
+    id: str
+    transcript_dir: str
+    output_dir: str
+    status: str = QUEUED
+    created: float = field(default_factory=time.time)
+    started: float = 0.0
+    finished: float = 0.0
+    error: str = ""
+    results: list | None = None
+    texts: dict[str, str] = field(default_factory=dict)
+    stage_status: dict[str, str] = field(default_factory=dict)
+
+    def __post_init__(self):
+        self._lock = threading.Lock()
+        self._coalescers: dict[str, StreamCoalescer] = {}
+        self._cancel = threading.Event()
+
+    @property
+    def active(self) -> bool:
+        return self.status in (QUEUED, RUNNING)
+
+    def snapshot(self) -> dict:
+        """A consistent copy of the job's progress, safe to render from another thread."""
+        with self._lock:
+            return {
+                "id": self.id,
+                "status": self.status,
+                "created": self.created,
+                "started": self.started,
+                "finished": self.finished,
+                "error": self.error,
+                "texts": dict(self.texts),
+                "stage_status": dict(self.stage_status),
+            }
+
+    def on_event(self, event: StreamEvent) -> None:
+        """Event bus subscriber: keep per-agent text current, a few updates per second."""
+        name = event.agent_name
+        if event.kind == STAGE_START:
+            with self._lock:
+                self.stage_status[name] = RUNNING
+                self.texts[name] = ""
+            self._coalescers[name] = StreamCoalescer(lambda text, n=name: self._set_text(n, text))
+        elif event.kind == TOKEN and name in self._coalescers:
+            self._coalescers[name].write(event.text)
+        elif event.kind == STAGE_END:
+            if name in self._coalescers:
+                self._coalescers.pop(name).flush()
+            with self._lock:
+                self.stage_status[name] = DONE
+
+    def _set_text(self, name: str, text: str) -> None:
+        with self._lock:
+            self.texts[name] = text
+
+
+class JobManager:
+    def __init__(self, max_concurrent: int = MAX_CONCURRENT):
+        self._pool = ThreadPoolExecutor(max_workers=max_concurrent, thread_name_prefix="deliberation-job")
+        self._jobs: dict[str, Job] = {}
+        self._lock = threading.Lock()
+
+    def submit(self, transcript_dir: str = "transcripts", output_dir: str = "output", **run_kwargs) -> str:
+        """
+        Queue a deliberation and return its job ID. run_kwargs go to
+        run_deliberation (use_cache, resume, ...). Results are saved to
+        output_dir when the run succeeds.
+        """
+        with self._lock:
+            for job in self._jobs.values():
+                if job.active and os.path.abspath(job.output_dir) == os.path.abspath(output_dir):
+                    return job.id
+            job = Job(uuid.uuid4().hex[:12], transcript_dir, output_dir)
+            self._jobs[job.id] = job
+            self._prune()
+        self._pool.submit(self._run, job, run_kwargs)
+        return job.id
+
+    def get(self, job_id: str | None) -> Job | None:
+        with self._lock:
+            return self._jobs.get(job_id or "")
+
+    def cancel(self, job_id: str | None) -> bool:
+        """Ask a queued or running job to stop; False if there is no such active job."""
+        job = self.get(job_id)
+        if job is None or not job.active:
+            return False
+        job._cancel.set()
+        return True
+
+    def jobs(self) -> list[Job]:
+        with self._lock:
+            return sorted(self._jobs.values(), key=lambda j: j.created, reverse=True)
+
+    def _prune(self) -> None:
+        finished = sorted((j for j in self._jobs.values() if not j.active), key=lambda j: j.created)
+        for job in finished[:max(0, len(finished) - MAX_FINISHED_KEPT)]:
+            del self._jobs[job.id]
+
+    def _run(self, job: Job, run_kwargs: dict) -> None:
+        # Imported here so merely viewing results never needs the API client.
+        from orchestrator import run_deliberation, save_results, live_writer, DeliberationCancelled
+
+        checkpoint_dir = os.path.join(job.output_dir, ".checkpoint")
+        with job._lock:
+            if job._cancel.is_set():
+                job.status = CANCELLED
+                job.finished = time.time()
+                return
+            job.status = RUNNING
+            job.started = time.time()
+        bus = EventBus()
+        bus.subscribe(job.on_event, name=f"job-{job.id}")
+        writer = live_writer(job.output_dir)
+        bus.subscribe(writer.on_event, name=f"live-output-{job.id}")
+        try:
+            results = run_deliberation(
+                job.transcript_dir,
+                bus=bus,
+                checkpoint_dir=checkpoint_dir,
+                run_log=os.path.join(job.output_dir, RUN_LOG_NAME),
+                run_store=get_store(),
+                cancel=job._cancel,
+                **run_kwargs,
+            )
+            bus.close()
+            save_results(results, job.output_dir, outputs_written=writer.finalize() is not None)
+            CheckpointStore(checkpoint_dir).clear()
+            with job._lock:
+                job.results = results
+                job.status = DONE
+        except Exception as e:
+            bus.close()
+            writer.finalize()
+            with job._lock:
+                job.error = f"{type(e).__name__}: {e}"
+                job.status = CANCELLED if isinstance(e, DeliberationCancelled) else FAILED
+        finally:
+            job.finished = time.time()
+
+
+_manager: JobManager | None = None
+_manager_lock = threading.Lock()
+
+
+def get_manager() -> JobManager:
+    """The process-wide JobManager, created on first use."""
+    global _manager
+    with _manager_lock:
+        if _manager is None:
+            _manager = JobManager()
+        return _manager
@@ -0,0 +1,119 @@
+"""
+Live Output
+===========
+Write-through persistence of a deliberation's output files while it runs.
+
+LiveWriter is an event bus subscriber. As a stage streams, its text is
+appended to "<file>.part" next to the final file (tail -f it to watch), and
+when the stage ends the part file is fsynced and renamed over
+"N_<agent>.md" in one step. full_deliberation.md is assembled the same way:
+each finished stage's section is appended to its part file as soon as every
+earlier stage is done, and finalize() renames it once the run succeeds.
+
+A final-named file is therefore always complete. A crash leaves at most a
+".part" file, which nothing reads.
+
+    writer = LiveWriter("output", [("researcher", "Researcher", "1_researcher.md"), ...])
+    bus.subscribe(writer.on_event, name="live-output")
+    ...run...
+    bus.close()
+    writer.finalize()
+"""
+
+import os
+
+from event_bus import StreamEvent, STAGE_START, TOKEN, STAGE_END
+
+PART_SUFFIX = ".part"
+COMBINED_NAME = "full_deliberation.md"
+COMBINED_HEADER = "# Workflow Architect: Full Multi-Agent Deliberation\n\n---\n\n"
+
+
+def stage_document(agent_name: str, output: str) -> str:
+    """Contents of one N_<agent>.md file."""
+    return f"# {agent_name}\n\n{output}"
+
+
+def combined_section(index: int, agent_name: str, output: str) -> str:
+    """One stage's section of full_deliberation.md (index is 0-based)."""
+    return f"## Stage {index + 1}: {agent_name}\n\n{output}\n\n---\n\n"
+
+
+def _finish(fh, part: str, final: str) -> None:
+    fh.flush()
+    os.fsync(fh.fileno())
+    fh.close()
+    os.replace(part, final)
+
+
+class LiveWriter:
+    def __init__(self, output_dir: str, stages: list[tuple[str, str, str]]):
+        """`stages` is (stage key, agent name, file name) in document order; other stages are ignored."""
+        self.output_dir = output_dir
+        self.order = {key: i for i, (key, _, _) in enumerate(stages)}
+        self.stages = stages
+        self.finished: dict[int, str] = {}
+        self._files: dict[str, object] = {}
+        self._texts: dict[str, list[str]] = {}
+        self._next = 0
+        self._combined = None
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.output_dir, name)
+
+    def on_event(self, event: StreamEvent) -> None:
+        if event.stage not in self.order:
+            return
+        if event.kind == STAGE_START:
+            self._start(event.stage)
+        elif event.kind == TOKEN and event.stage in self._files:
+            self._files[event.stage].write(event.text)
+            self._files[event.stage].flush()
+            self._texts[event.stage].append(event.text)
+        elif event.kind == STAGE_END and event.stage in self._files:
+            self._end(event.stage)
+
+    def _start(self, key: str) -> None:
+        _, agent_name, filename = self.stages[self.order[key]]
+        os.makedirs(self.output_dir, exist_ok=True)
+        fh = open(self._path(filename + PART_SUFFIX), "w")
+        fh.write(stage_document(agent_name, ""))
+        fh.flush()
+        self._files[key] = fh
+        self._texts[key] = []
+
+    def _end(self, key: str) -> None:
+        index = self.order[key]
+        _, _, filename = self.stages[index]
+        _finish(self._files.pop(key), self._path(filename + PART_SUFFIX), self._path(filename))
+        self.finished[index] = "".join(self._texts.pop(key))
+        self._append_ready()
+
+    def _append_ready(self) -> None:
+        """Append finished stages to the combined part file, in document order."""
+        while self._next in self.finished:
+            if self._combined is None:
+                self._combined = open(self._path(COMBINED_NAME + PART_SUFFIX), "w")
+                self._combined.write(COMBINED_HEADER)
+            _, agent_name, _ = self.stages[self._next]
+            self._combined.write(combined_section(self._next, agent_name, self.finished[self._next]))
+            self._combined.flush()
+            self._next += 1
+
+    @property
+    def complete(self) -> bool:
+        return self._next == len(self.stages)
+
+    def finalize(self) -> str | None:
+        """Publish full_deliberation.md if every stage finished; returns its path, else None."""
+        for fh in self._files.values():
+            fh.close()
+        self._files.clear()
+        if not self.complete or self._combined is None:
+            if self._combined is not None:
+                self._combined.close()
+            return None
+        path = self._path(COMBINED_NAME)
+        _finish(self._combined, path + PART_SUFFIX, path)
+        self._combined = None
+        return path
@@ -0,0 +1,209 @@
+"""
+Mock Messages API
+=================
+A drop-in stand-in for the `anthropic.Anthropic` client, for exercising the
+orchestrator without network access or API spend.
+
+Supports the two calls this project makes:
+  client.messages.stream(...)   (context manager with .text_stream / .get_final_message())
+  client.messages.create(...)   (returns an object with .content[0].text)
+
+Usage:
+    from mock_api import StubClient
+    results = run_deliberation(api_client=StubClient(), use_cache=False)
+
+Recorded replay (what benchmarks/ use): stage outputs saved in output/ are
+streamed back at a given time-to-first-token and token rate, optionally
+taken from a real run's telemetry log:
+
+    ttft, rate = timings_from_run_log("output/run_log.jsonl")
+    client = StubClient(recorded_responder("output"), ttft=ttft, tokens_per_sec=rate)
+"""
+
+import os
+import re
+import glob
+import json
+import time
+import threading
+import statistics
+from dataclasses import dataclass, field
+from typing import Callable
+
+from rate_limit import RateLimiter
+
+
+@dataclass
+class StubUsage:
+    input_tokens: int = 0
+    output_tokens: int = 0
+    cache_read_input_tokens: int = 0
+    cache_creation_input_tokens: int = 0
+
+
+@dataclass
+class StubTextBlock:
+    text: str
+    type: str = "text"
+
+
+@dataclass
+class StubMessage:
+    content: list[StubTextBlock]
+    usage: StubUsage
+    model: str = ""
+    stop_reason: str = "end_turn"
+
+
+def _system_text(system) -> str:
+    if isinstance(system, str):
+        return system
+    return "\n".join(block.get("text", "") for block in system or [])
+
+
+def default_responder(model: str, system, messages: list[dict]) -> str:
+    """Deterministic canned reply naming the agent the system prompt describes."""
+    role = next((line for line in _system_text(system).splitlines() if line.startswith("You are the ")), "")
+    return (
+        f"[stub {model}] {role[:80]}\n\n"
+        "1. **Transcript Extraction** (5 minutes, automated)\n"
+        "2. **Strategic Framing** (5 minutes, human)\n"
+        "3. **Draft Sections** (20 minutes, hybrid)\n"
+    )
+
+
+def recorded_responder(output_dir: str = "output", fallback=default_responder):
+    """
+    Responder that replays saved stage outputs. Each "N_<agent>.md" file is
+    matched to requests by the agent its system prompt names ("You are the
+    Architect agent"); an agent with several recordings (Architect, Critical
+    Eye) gets them in order, wrapping around. Unrecorded agents use `fallback`.
+    """
+    recordings: dict[str, list[str]] = {}
+    for path in sorted(glob.glob(os.path.join(output_dir, "[0-9]_*.md"))):
+        with open(path) as fh:
+            heading, _, body = fh.read().partition("\n")
+        agent = re.sub(r"\s*\(.*\)$", "", heading.lstrip("# ").strip())
+        recordings.setdefault(agent, []).append(body.strip())
+    served: dict[str, int] = {}
+    lock = threading.Lock()
+
+    def respond(model: str, system, messages: list[dict]) -> str:
+        match = re.search(r"You are the (.+?) agent", _system_text(system))
+        texts = recordings.get(match.group(1) if match else "")
+        if not texts:
+            return fallback(model, system, messages)
+        with lock:
+            n = served.get(match.group(1), 0)
+            served[match.group(1)] = n + 1
+        return texts[n % len(texts)]
+
+    return respond
+
+
+def timings_from_run_log(path: str) -> tuple[float, float]:
+    """
+    Median time-to-first-token (s) and tokens/sec of the API-served stages in
+    a telemetry run log (see telemetry.py), for replaying at realistic speed.
+    """
+    ttfts, rates = [], []
+    with open(path) as fh:
+        for line in fh:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if record.get("kind") == "stage" and not (record.get("cached") or record.get("reused")):
+                ttfts.append(record["ttft"])
+                if record["tokens_per_sec"] > 0:
+                    rates.append(record["tokens_per_sec"])
+    if not ttfts:
+        raise ValueError(f"no API-served stages in {path}")
+    return statistics.median(ttfts), statistics.median(rates) if rates else 0.0
+
+
+class _StubStream:
+    def __init__(self, client: "StubClient", kwargs: dict):
+        self._client = client
+        self._kwargs = kwargs
+        self._text = client.responder(kwargs.get("model", ""), kwargs.get("system"), kwargs.get("messages", []))
+        self._message: StubMessage | None = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    @property
+    def text_stream(self):
+        client = self._client
+        if client.ttft:
+            time.sleep(client.ttft)
+        size = client.chunk_size
+        delay = client.chunk_delay
+        if client.tokens_per_sec:
+            delay = size / 4 / client.tokens_per_sec
+        for i in range(0, len(self._text), size):
+            if delay and i:
+                time.sleep(delay)
+            yield self._text[i:i + size]
+        self._message = self._client._message(self._kwargs, self._text)
+
+    def get_final_message(self) -> StubMessage:
+        if self._message is None:
+            for _ in self.text_stream:
+                pass
+        return self._message
+
+
+class _StubMessages:
+    def __init__(self, client: "StubClient"):
+        self._client = client
+
+    def stream(self, **kwargs) -> _StubStream:
+        self._client._record(kwargs)
+        return _StubStream(self._client, kwargs)
+
+    def create(self, **kwargs) -> StubMessage:
+        self._client._record(kwargs)
+        text = self._client.responder(kwargs.get("model", ""), kwargs.get("system"), kwargs.get("messages", []))
+        if self._client.ttft:
+            time.sleep(self._client.ttft)
+        return self._client._message(kwargs, text)
+
+
+@dataclass
+class StubClient:
+    """
+    Fake client. `responder(model, system, messages)` decides the reply text;
+    `ttft` delays the first chunk and `chunk_delay` each chunk after it
+    (`tokens_per_sec`, at ~4 chars per token, overrides chunk_delay).
+    Every request's kwargs are kept in `calls`. `limiter` is the RateLimiter
+    the orchestrator puts in front of the stub; None (the default) skips it.
+    """
+    responder: Callable[[str, object, list[dict]], str] = default_responder
+    ttft: float = 0.0
+    chunk_delay: float = 0.0
+    tokens_per_sec: float = 0.0
+    chunk_size: int = 16
+    calls: list[dict] = field(default_factory=list)
+    limiter: RateLimiter | None = None
+
+    def __post_init__(self):
+        self.messages = _StubMessages(self)
+        self._lock = threading.Lock()
+
+    def _record(self, kwargs: dict) -> None:
+        with self._lock:
+            self.calls.append(kwargs)
+
+    def _message(self, kwargs: dict, text: str) -> StubMessage:
+        prompt = _system_text(kwargs.get("system")) + "".join(
+            m["content"] if isinstance(m["content"], str) else "" for m in kwargs.get("messages", [])
+        )
+        return StubMessage(
+            content=[StubTextBlock(text)],
+            usage=StubUsage(input_tokens=len(prompt) // 4, output_tokens=len(text) // 4),
+            model=kwargs.get("model", ""),
+        )
@@ -0,0 +1,163 @@
+"""
+Model Configuration
+===================
+Which model, output budget and temperature each stage runs with, and what a
+call on each model costs.
+
+Built-in defaults put every stage on Sonnet except Toolsmith's tool
+mapping, which is mechanical enough to run on Haiku.
+A JSON file, then environment variables, override them:
+
+  stage_config.json (or the path in STAGE_CONFIG):
+    {"default": {"model": "claude-sonnet-4-20250514", "max_tokens": 1500},
+     "stages": {"toolsmith": {"model": "claude-sonnet-4-20250514"},
+                "critical_final": {"max_tokens": 1000, "temperature": 0.2}}}
+
+  STAGE_<KEY>_MODEL / _MAX_TOKENS / _TEMPERATURE / _CONTEXT_TOKENS
+    e.g. STAGE_TOOLSMITH_MODEL=claude-sonnet-4-20250514, STAGE_DEFAULT_MAX_TOKENS=2000
+
+context_tokens is the stage's prompt ceiling (system + message, estimated);
+see context_budget.py for how prompts are cut to fit.
+
+Keys are stage keys (researcher, architect_v1, critical_eye, toolsmith,
+architect_v2, critical_final, digest, chunk_summary, chunk_reduce).
+Anything not set falls back to "default".
+"""
+
+import os
+import re
+import json
+from dataclasses import dataclass, replace, asdict
+
+SONNET = "claude-sonnet-4-20250514"
+HAIKU = "claude-3-5-haiku-20241022"
+
+CONFIG_PATH = os.getenv("STAGE_CONFIG", "stage_config.json")
+DEFAULT_CONTEXT_TOKENS = 80_000
+
+DEFAULTS = {
+    "default": {"model": SONNET, "max_tokens": 1500},
+    "stages": {
+        "toolsmith": {"model": HAIKU},
+    },
+}
+
+# USD per million tokens: (input, output). Cache writes bill at 1.25x input,
+# cache reads at 0.1x. Matched by longest model-name prefix.
+PRICING = {
+    "claude-opus-4": (15.00, 75.00),
+    "claude-sonnet-4": (3.00, 15.00),
+    "claude-3-7-sonnet": (3.00, 15.00),
+    "claude-3-5-sonnet": (3.00, 15.00),
+    "claude-3-5-haiku": (0.80, 4.00),
+    "claude-3-haiku": (0.25, 1.25),
+}
+CACHE_WRITE_MULTIPLIER = 1.25
+CACHE_READ_MULTIPLIER = 0.1
+
+
+@dataclass(frozen=True)
+class ModelConfig:
+    model: str
+    max_tokens: int
+    temperature: float | None = None
+    context_tokens: int = DEFAULT_CONTEXT_TOKENS
+
+    def request_kwargs(self) -> dict:
+        """The Messages API arguments this config decides."""
+        kwargs = {"model": self.model, "max_tokens": self.max_tokens}
+        if self.temperature is not None:
+            kwargs["temperature"] = self.temperature
+        return kwargs
+
+
+def _apply(config: ModelConfig, overrides: dict) -> ModelConfig:
+    known = {k: v for k, v in overrides.items() if k in ("model", "max_tokens", "temperature", "context_tokens")}
+    for name in ("max_tokens", "context_tokens"):
+        if name in known:
+            known[name] = int(known[name])
+    if known.get("temperature") is not None:
+        known["temperature"] = float(known["temperature"])
+    return replace(config, **known)
+
+
+def _env_overrides(environ) -> dict[str, dict]:
+    overrides: dict[str, dict] = {}
+    for name, value in environ.items():
+        match = re.fullmatch(r"STAGE_(\w+?)_(MODEL|MAX_TOKENS|TEMPERATURE|CONTEXT_TOKENS)", name)
+        if match:
+            overrides.setdefault(match.group(1).lower(), {})[match.group(2).lower()] = value
+    return overrides
+
+
+class StageConfigs:
+    """Resolved per-stage configs; for_stage() falls back to the default."""
+
+    def __init__(self, default: ModelConfig, stages: dict[str, ModelConfig]):
+        self.default = default
+        self.stages = stages
+
+    def for_stage(self, key: str) -> ModelConfig:
+        return self.stages.get(key, self.default)
+
+    def describe(self) -> dict:
+        return {"default": asdict(self.default), "stages": {k: asdict(v) for k, v in self.stages.items()}}
+
+
+def load_configs(path: str | None = CONFIG_PATH, environ=os.environ) -> StageConfigs:
+    """Built-in defaults, overridden by the JSON file at `path` (if present), then the environment."""
+    layers = [DEFAULTS]
+    if path and os.path.exists(path):
+        with open(path) as fh:
+            layers.append(json.load(fh))
+    env = _env_overrides(environ)
+    layers.append({"default": env.pop("default", {}), "stages": env})
+
+    default = ModelConfig(SONNET, 1500)
+    stage_overrides: dict[str, list[dict]] = {}
+    for layer in layers:
+        default = _apply(default, layer.get("default", {}))
+        for key, overrides in layer.get("stages", {}).items():
+            stage_overrides.setdefault(key, []).append(overrides)
+
+    stages = {}
+    for key, layers_for_key in stage_overrides.items():
+        config = default
+        for overrides in layers_for_key:
+            config = _apply(config, overrides)
+        stages[key] = config
+    return StageConfigs(default, stages)
+
+
+CONFIGS = load_configs()
+
+
+def config_for(key: str) -> ModelConfig:
+    return CONFIGS.for_stage(key)
+
+
+# ---------------------------------------------------------------------------
+# Pricing
+# ---------------------------------------------------------------------------
+def prices(model: str) -> tuple[float, float] | None:
+    prefix = max((p for p in PRICING if model.startswith(p)), key=len, default=None)
+    return PRICING[prefix] if prefix else None
+
+
+def cost(model: str, input_tokens: int, output_tokens: int, cache_read_tokens: int = 0, cache_creation_tokens: int = 0) -> float:
+    """USD for one call's usage; 0.0 for models missing from PRICING."""
+    rates = prices(model)
+    if rates is None:
+        return 0.0
+    per_input, per_output = rates
+    return (
+        input_tokens * per_input
+        + cache_creation_tokens * per_input * CACHE_WRITE_MULTIPLIER
+        + cache_read_tokens * per_input * CACHE_READ_MULTIPLIER
+        + output_tokens * per_output
+    ) / 1_000_000
+
+
+def short_name(model: str) -> str:
+    """claude-3-5-haiku-20241022 -> 3-5-haiku"""
+    return re.sub(r"-\d{8}$", "", model.removeprefix("claude-"))
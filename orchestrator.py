@@ -21,16 +21,61 @@ The agents run in a deliberation loop:
 """
 
 import os
+import sys
 import glob
+import json
 import time
-from dataclasses import dataclass, field
-from typing import Callable
-from dotenv import load_dotenv
-from anthropic import Anthropic
-
-load_dotenv()
-
-client = Anthropic(api_key=os.getenv("ANTHROPIC_API_KEY"))
+import queue
+import uuid
+import hashlib
+import asyncio
+import inspect
+import argparse
+import threading
+from dataclasses import dataclass, field, fields, replace, asdict
+from typing import AsyncIterator, Awaitable, Callable, Sequence
+import response_cache
+from rate_limit import (
+    LIMITER, LimitedClient, AsyncLimitedClient, limited, limited_async, call_with_retry, acall_with_retry, is_retryable,
+)
+from response_cache import ResponseCache, cache_key
+from clients import load_env, get_async_client, run_blocking, deferred
+from checkpoint import CheckpointStore, write_atomic
+from event_bus import EventBus, AsyncEvents, StreamEvent, STAGE_START, TOKEN, USAGE, STAGE_END
+from telemetry import RunLog, RUN_LOG_NAME, stage_record, format_summary_table
+from tokens import estimate_tokens, chunk_by_tokens
+from model_config import ModelConfig, CONFIGS, DEFAULT_CONTEXT_TOKENS, config_for, cost
+from context_budget import Section, Cut, fit
+from plan_parser import STEPS_FILE, PLAN_FORMAT, PlanFormatError, steps_document
+from run_store import RunStore, hash_json, get_store
+from preprocess import DEFAULT_STEPS, preprocess_file, format_report, steps_signature
+from transcript_index import TranscriptIndex, load_index
+from live_output import LiveWriter, COMBINED_NAME, COMBINED_HEADER, stage_document, combined_section
+
+load_env()
+
+# API clients are built on first use (clients.get_async_client), so importing
+# this module never imports the anthropic SDK.
+
+# Seconds one agent call may stream, and a whole deliberation may run (0 = no limit).
+STAGE_TIMEOUT = float(os.getenv("STAGE_TIMEOUT_SECONDS", "600"))
+RUN_TIMEOUT = float(os.getenv("RUN_TIMEOUT_SECONDS", "0"))
+
+CHECKPOINT_DIR = os.path.join("output", ".checkpoint")
+
+# Transcript sets estimated above this many tokens are map-reduced (summarized
+# in parallel chunks, then merged) before any agent sees them.
+CONTEXT_TOKEN_THRESHOLD = int(os.getenv("CONTEXT_TOKEN_THRESHOLD", "60000"))
+CHUNK_TOKENS = int(os.getenv("CHUNK_TOKENS", "20000"))
+REDUCED_CONTEXT_TOKENS = int(os.getenv("REDUCED_CONTEXT_TOKENS", "6000"))
+
+# Pseudo transcript name under which preprocessing steps enter stage input hashes.
+PREPROCESSED_KEY = "(preprocessed)"
+
+# Passages a retrieval stage reads when a run enables use_retrieval.
+RETRIEVAL_K = int(os.getenv("RETRIEVAL_K", "12"))
+
+RESPONSE_CACHE = ResponseCache()
 
 # ---------------------------------------------------------------------------
 # The Challenge (verbatim from the job posting)
@@ -47,28 +92,94 @@ about the tools, the workflow, and where human judgment still matters.
 # ---------------------------------------------------------------------------
 # Transcript loader
 # ---------------------------------------------------------------------------
-def load_transcripts(transcript_dir: str = "transcripts") -> str:
-    """Load all transcript files from the given directory."""
+def load_transcripts(transcript_dir: str = "transcripts", preprocess_steps: tuple[str, ...] | None = None) -> str:
+    """
+    Load all transcript files from the given directory. With
+    preprocess_steps, each file first goes through those preprocessing
+    steps (cached by file hash; see preprocess) and the reduction is printed.
+    """
     files = sorted(glob.glob(os.path.join(transcript_dir, "*.txt")))
     if not files:
         raise FileNotFoundError(f"No transcript files found in {transcript_dir}/")
 
     all_transcripts = []
+    reports = []
     for f in files:
-        with open(f, "r") as fh:
-            content = fh.read().strip()
-            filename = os.path.basename(f)
-            all_transcripts.append(f"=== {filename} ===\n{content}")
+        filename = os.path.basename(f)
+        if preprocess_steps:
+            content, report = preprocess_file(f, preprocess_steps)
+            reports.append(report)
+        else:
+            with open(f, "r") as fh:
+                content = fh.read().strip()
+        all_transcripts.append(f"=== {filename} ===\n{content}")
 
     combined = "\n\n".join(all_transcripts)
     print(f"Loaded {len(files)} transcripts ({len(combined)} chars total)")
+    if reports:
+        print(f"Preprocessed ({steps_signature(preprocess_steps)}):\n{format_report(reports)}")
     return combined
 
 
+def transcript_hashes(transcript_dir: str = "transcripts") -> dict[str, str]:
+    """SHA-256 of each transcript file, by filename."""
+    hashes = {}
+    for f in sorted(glob.glob(os.path.join(transcript_dir, "*.txt"))):
+        with open(f, "rb") as fh:
+            hashes[os.path.basename(f)] = hashlib.sha256(fh.read()).hexdigest()
+    return hashes
+
+
 # ---------------------------------------------------------------------------
 # Agent System Prompts
 # ---------------------------------------------------------------------------
 
+DIGEST_SYSTEM = """You are the Digest agent in a multi-agent workflow planning system.
+
+You will receive ACTUAL call transcripts between a transit consultant and a client agency.
+Other agents will read YOUR digest instead of the raw transcripts, so anything you leave out is lost to them.
+
+Produce a compact, structured digest with exactly these sections:
+
+## Stakeholders
+Name, role, organization, stance/priorities, and how they relate to each other.
+
+## Key Quotes
+The 10-15 most revealing verbatim quotes, attributed ("Speaker: quote"). Keep exact wording.
+
+## Budget & Procurement Signals
+Amounts, thresholds, funding sources, approval processes, deadlines.
+
+## Data Sources & Systems
+Every dataset, system, vendor and tool mentioned, with its known quality issues.
+
+## Sensitivities
+Political dynamics, tensions, past bad experiences, topics to frame carefully.
+
+## Explicit Asks & Unstated Needs
+What the client asked for, and what they clearly need but did not say.
+
+Bullets only. No commentary, no recommendations. Stay under 700 words."""
+
+CHUNK_SUMMARY_SYSTEM = """You are condensing ONE PART of a long set of call transcripts between a transit consultant and a client agency.
+Downstream agents will never see the original text, only your notes.
+
+Keep, in bullets:
+- Who spoke, their role, and what they care about
+- Exact quotes that reveal priorities, frustrations, or politics (verbatim, attributed)
+- Every number: budgets, thresholds, dates, fleet sizes, percentages
+- Data sources, systems and vendors mentioned, with their problems
+- Requests, commitments and open questions
+
+Drop greetings, small talk and repetition. Keep the call/file name each note comes from."""
+
+REDUCE_SYSTEM = """You are merging partial notes taken from a long set of call transcripts between a transit consultant and a client agency.
+Downstream agents will plan a proposal from YOUR merged notes alone.
+
+Combine the notes into one deduplicated briefing, grouped by: Stakeholders, Key Quotes (verbatim, attributed),
+Budget & Procurement, Data & Systems, Politics & Sensitivities, Asks & Commitments, Timeline.
+Preserve every number and quote that matters. Resolve contradictions by noting both versions and which call they came from."""
+
 RESEARCHER_SYSTEM = """You are the Researcher agent in a multi-agent workflow planning system.
 
 You will receive ACTUAL call transcripts between a transit consultant and a client agency.
@@ -181,191 +292,1158 @@ class AgentResult:
     output: str
     timestamp: float = field(default_factory=time.time)
     input_context: str = ""
+    stage: str = ""
+    duration: float = 0.0
+    queue_time: float = 0.0
+    ttft: float = 0.0
+    tokens_per_sec: float = 0.0
+    stop_reason: str = ""
+    model: str = ""
+    cost: float = 0.0
+    context_cuts: list = field(default_factory=list)
+    input_tokens: int = 0
+    output_tokens: int = 0
+    cache_read_tokens: int = 0
+    cache_creation_tokens: int = 0
+    cached: bool = False
+    reused: bool = False
+    input_hash: str = ""
+    input_parts: dict = field(default_factory=dict)
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "AgentResult":
+        known = {f.name for f in fields(cls)}
+        return cls(**{k: v for k, v in data.items() if k in known})
+
+
+class DeliberationResults(list):
+    """
+    A deliberation's stage results, in stage order. With use_digest, digest
+    is the transcript digest they read; it is not a stage of its own, but
+    save_results records it so a later run can reuse it.
+    """
 
+    digest: AgentResult | None = None
 
-def run_agent(
+
+def build_shared_context(transcripts: str, heading: str = "CALL TRANSCRIPTS") -> str:
+    """The challenge + transcripts prefix every stage shares verbatim."""
+    return f"CHALLENGE:\n{CHALLENGE}\n\n{heading}:\n{transcripts}"
+
+
+def build_system(system_prompt: str, shared_context: str | None = None) -> str | list[dict]:
+    """
+    Put the shared context ahead of the agent's own instructions and mark it
+    for prompt caching, so every stage after the first reads it from cache.
+    """
+    if not shared_context:
+        return system_prompt
+    return [
+        {"type": "text", "text": shared_context, "cache_control": {"type": "ephemeral"}},
+        {"type": "text", "text": system_prompt},
+    ]
+
+
+class StageTimeout(TimeoutError):
+    """An agent call did not finish within its timeout."""
+
+
+class DeliberationCancelled(Exception):
+    """run_deliberation's cancel event was set before the run finished."""
+
+
+def is_async_client(api_client) -> bool:
+    """
+    True for AsyncAnthropic-style clients: limited_async() wrappers, plain
+    AsyncAnthropic (whose messages.create hides its coroutine behind a
+    decorator), and stubs with a coroutine messages.create.
+    """
+    if isinstance(api_client, AsyncLimitedClient):
+        return True
+    anthropic = sys.modules.get("anthropic")  # never imported just to check
+    if anthropic is not None and isinstance(api_client, anthropic.AsyncAnthropic):
+        return True
+    create = getattr(getattr(api_client, "messages", None), "create", None)
+    return create is not None and inspect.iscoroutinefunction(inspect.unwrap(create))
+
+
+def rate_limited(api_client):
+    """
+    api_client behind a limiter and its retries (rate_limit.limited or
+    limited_async), unless it is already wrapped. It gets LIMITER, or its own
+    `limiter` attribute if it has one; mock_api.StubClient's is None, since a
+    stub has no budget to keep, and a client whose limiter is None is used as is.
+    """
+    if isinstance(api_client, (LimitedClient, AsyncLimitedClient)):
+        return api_client
+    limiter = getattr(api_client, "limiter", LIMITER)
+    if limiter is None:
+        return api_client
+    return limited_async(api_client, limiter) if is_async_client(api_client) else limited(api_client, limiter)
+
+
+def _stream_message(api_client, request: dict, on_stream: Callable[[str], None] | None):
+    """
+    Stream one request on a sync client. Returns (chunks, final message,
+    seconds waited, first-token time). A retryable error (overloaded, 5xx)
+    after the stream opened but before its first token starts the request
+    again; once text has reached on_stream the error is raised instead.
+    Opening the stream is retried by the limited() wrapper itself.
+    """
+    opened = first_token = None
+
+    def attempt():
+        nonlocal opened, first_token
+        chunks: list[str] = []
+        opened = False
+        manager = api_client.messages.stream(**request)
+        with manager as stream:
+            opened = True
+            # Seconds the rate limiter held the request back (0 for unwrapped clients).
+            waited = getattr(manager, "waited", 0.0)
+            for text in stream.text_stream:
+                if first_token is None:
+                    first_token = time.perf_counter()
+                chunks.append(text)
+                if on_stream:
+                    on_stream(text)
+            final = stream.get_final_message()
+        return chunks, final, waited, first_token
+
+    return call_with_retry(attempt, retry_if=lambda e: opened and first_token is None and is_retryable(e))
+
+
+def _detached(fn: Callable, *args) -> asyncio.Future:
+    """
+    fn(*args) on a daemon thread, as a future of the running loop. Unlike
+    asyncio.to_thread, nothing (not even asyncio.run's shutdown) waits for
+    the thread once the caller stops awaiting, e.g. after a timeout.
+    """
+    loop = asyncio.get_running_loop()
+    future = loop.create_future()
+
+    def settle(result=None, error: BaseException | None = None) -> None:
+        if not future.done():
+            future.set_exception(error) if error else future.set_result(result)
+
+    def work() -> None:
+        try:
+            result = fn(*args)
+        except BaseException as e:
+            outcome = (None, e)
+        else:
+            outcome = (result, None)
+        try:
+            loop.call_soon_threadsafe(settle, *outcome)
+        except RuntimeError:  # loop already closed: nobody is waiting
+            pass
+
+    threading.Thread(target=work, name="sync-stream", daemon=True).start()
+    return future
+
+
+async def _astream_message(api_client, request: dict, on_stream: Callable[[str], None] | None):
+    """_stream_message for async clients; cancelling the awaiting task closes the stream."""
+    opened = first_token = None
+
+    async def attempt():
+        nonlocal opened, first_token
+        chunks: list[str] = []
+        opened = False
+        manager = api_client.messages.stream(**request)
+        async with manager as stream:
+            opened = True
+            waited = getattr(manager, "waited", 0.0)
+            async for text in stream.text_stream:
+                if first_token is None:
+                    first_token = time.perf_counter()
+                chunks.append(text)
+                if on_stream:
+                    on_stream(text)
+            final = await stream.get_final_message()
+        return chunks, final, waited, first_token
+
+    return await acall_with_retry(attempt, retry_if=lambda e: opened and first_token is None and is_retryable(e))
+
+
+async def arun_agent(
     agent_name: str,
     system_prompt: str,
     user_message: str,
     on_stream: Callable[[str], None] | None = None,
+    shared_context: str | None = None,
+    use_cache: bool = True,
+    api_client=None,
+    config: ModelConfig | None = None,
+    timeout: float | None = None,
 ) -> AgentResult:
-    """Run a single agent and return its result."""
-
-    full_response = ""
-    with client.messages.stream(
-        model="claude-sonnet-4-20250514",
-        max_tokens=1500,
-        system=system_prompt,
-        messages=[{"role": "user", "content": user_message}],
-    ) as stream:
-        for text in stream.text_stream:
-            full_response += text
+    """
+    Run a single agent and return its result.
+
+    Identical requests are answered from RESPONSE_CACHE (and replayed through
+    on_stream) unless use_cache is False or RESPONSE_CACHE=off is set.
+    api_client replaces the event loop's AsyncAnthropic client and goes
+    through the same limiter and retries (see rate_limited); a sync client
+    (e.g. anthropic.Anthropic, mock_api.StubClient) streams on a daemon
+    thread instead.
+    config picks model, max_tokens and temperature (default: CONFIGS.default).
+    timeout (seconds) bounds the API call, rate-limit waits included, and
+    raises StageTimeout. An async stream is cancelled; a sync client's
+    thread is left to finish on its own, and nothing waits for it.
+    """
+
+    started = time.perf_counter()
+    system = build_system(system_prompt, shared_context)
+    input_context = user_message[:200] + "..." if len(user_message) > 200 else user_message
+    use_cache = use_cache and response_cache.ENABLED
+    config = config or CONFIGS.default
+    key = cache_key(config.model, config.max_tokens, system, user_message, config.temperature)
+
+    if use_cache:
+        hit = await asyncio.to_thread(RESPONSE_CACHE.get, key)
+        if hit is not None:
             if on_stream:
-                on_stream(text)
+                response_cache.replay(hit["output"], on_stream)
+            return AgentResult(
+                agent_name=agent_name,
+                output=hit["output"],
+                input_context=input_context,
+                duration=time.perf_counter() - started,
+                model=config.model,
+                cached=True,
+            )
+
+    api = rate_limited(api_client) if api_client else get_async_client()
+    request = {**config.request_kwargs(), "system": system, "messages": [{"role": "user", "content": user_message}]}
+    if is_async_client(api):
+        call = _astream_message(api, request, on_stream)
+    else:
+        call = _detached(_stream_message, api, request, on_stream)
+    try:
+        chunks, final, waited, first_token = await asyncio.wait_for(call, timeout or None)
+    except asyncio.TimeoutError:  # not the builtin TimeoutError before Python 3.11
+        if not timeout:
+            raise
+        raise StageTimeout(f"{agent_name} did not finish within {timeout:g}s") from None
+    ended = time.perf_counter()
+    usage = final.usage
+    full_response = "".join(chunks)
+    first_token = first_token or ended
+    generating = ended - first_token
+
+    if use_cache:
+        await asyncio.to_thread(RESPONSE_CACHE.put, key, {"model": config.model, "output": full_response})
 
     return AgentResult(
         agent_name=agent_name,
         output=full_response,
-        input_context=user_message[:200] + "..." if len(user_message) > 200 else user_message,
+        input_context=input_context,
+        duration=ended - started,
+        queue_time=waited,
+        ttft=first_token - started - waited,
+        tokens_per_sec=(usage.output_tokens or 0) / generating if generating > 0 else 0.0,
+        stop_reason=final.stop_reason or "",
+        model=config.model,
+        cost=cost(
+            config.model,
+            usage.input_tokens or 0,
+            usage.output_tokens or 0,
+            usage.cache_read_input_tokens or 0,
+            usage.cache_creation_input_tokens or 0,
+        ),
+        input_tokens=usage.input_tokens or 0,
+        output_tokens=usage.output_tokens or 0,
+        cache_read_tokens=usage.cache_read_input_tokens or 0,
+        cache_creation_tokens=usage.cache_creation_input_tokens or 0,
     )
 
 
+def run_agent(
+    agent_name: str,
+    system_prompt: str,
+    user_message: str,
+    on_stream: Callable[[str], None] | None = None,
+    shared_context: str | None = None,
+    use_cache: bool = True,
+    api_client=None,
+    config: ModelConfig | None = None,
+    timeout: float | None = None,
+) -> AgentResult:
+    """
+    Blocking arun_agent. It runs on the process's background event loop
+    (clients.run_blocking) with that loop's AsyncAnthropic client unless
+    api_client is given, so a timeout cancels the stream and returns on
+    time. on_stream is called on the calling thread.
+    """
+    calls = queue.SimpleQueue()
+    return run_blocking(arun_agent(
+        agent_name, system_prompt, user_message, deferred(on_stream, calls), shared_context, use_cache,
+        api_client, config, timeout,
+    ), calls)
+
+
 # ---------------------------------------------------------------------------
-# Orchestrator: runs the full multi-agent deliberation loop
+# Stage graph: the deliberation described as data
 # ---------------------------------------------------------------------------
-def run_deliberation(
-    transcript_dir: str = "transcripts",
-    on_stream: Callable[[str, str], None] | None = None,
-):
-    """
-    Run the full 6-step deliberation:
-      1. Researcher   (reads transcripts + proposal best practices)
-      2. Architect v1 (designs workflow plan tailored to these transcripts)
-      3. Critical Eye (identifies human judgment points specific to this client)
-      4. Toolsmith    (maps API-available tools to each step)
-      5. Architect v2 (revised plan incorporating all feedback)
-      6. Critical Eye final pass
+# Keys a stage may read that are not produced by another stage. The
+# challenge and transcripts normally reach agents through the shared,
+# cached system prefix (see build_shared_context) rather than a section.
+CONTEXT_KEYS = ("challenge", "transcripts")
 
-    on_stream(agent_name, text_chunk) is called for each streamed token.
-    Returns list of AgentResult objects.
+
+@dataclass(frozen=True)
+class Stage:
     """
-    # Load transcripts
-    transcripts = load_transcripts(transcript_dir)
-    results = []
+    One agent call in the deliberation.
+
+    `sections` is the prompt template: each (heading, key) pair renders as
+    "HEADING:\n<value>" where the value is either a CONTEXT_KEYS entry or
+    the output of the stage with that key. Every stage key referenced this
+    way is a dependency, as is anything in `requires`; `instruction` closes
+    the message.
 
-    def make_streamer(agent_name):
-        if on_stream:
-            return lambda text: on_stream(agent_name, text)
-        return None
+    `verbatim=False` lets the stage read the transcript digest instead of
+    the raw transcripts when the run enables it.
 
-    # --- Step 1: Researcher ---
-    print("\n[1/6] Researcher agent starting...")
-    researcher = run_agent(
+    `retrieval` holds search queries: when the run enables retrieval, the
+    stage reads only the top RETRIEVAL_K transcript passages they match
+    (see transcript_index) instead of every transcript in full.
+
+    `cut_order` lists section keys in the order the context budget shrinks
+    them when the prompt is over the stage's ceiling; unlisted upstream
+    sections follow in template order, and the challenge and transcripts go
+    last (see budget_prompt).
+    """
+    key: str
+    agent_name: str
+    system: str
+    sections: tuple[tuple[str, str], ...]
+    instruction: str
+    verbatim: bool = True
+    requires: tuple[str, ...] = ()
+    cut_order: tuple[str, ...] = ()
+    retrieval: tuple[str, ...] = ()
+
+    @property
+    def depends_on(self) -> tuple[str, ...]:
+        return tuple(src for _, src in self.sections if src not in CONTEXT_KEYS) + self.requires
+
+    def render(self, values: dict[str, str]) -> str:
+        parts = [f"{heading}:\n{values[src]}" for heading, src in self.sections]
+        parts.append(self.instruction)
+        return "\n\n".join(parts)
+
+
+CRITICAL_EYE_QUERIES = (
+    "board council politics public meeting equity seniors",
+    "budget cost afford funding grant staff capacity",
+    "concern risk worry trust credibility deadline stakeholder",
+)
+
+FINAL_PASS_SUFFIX = "\n\nThis is your FINAL pass. The workflow plan has been revised based on your earlier feedback. Confirm the human judgment checkpoints are well-placed for THIS CLIENT, flag anything still missing, and give a brief final assessment. Be concise."
+
+STAGES: tuple[Stage, ...] = (
+    Stage(
+        "researcher",
         "Researcher",
         RESEARCHER_SYSTEM,
-        (
-            f"CHALLENGE:\n{CHALLENGE}\n\n"
-            f"CALL TRANSCRIPTS:\n{transcripts}\n\n"
-            "Provide your research brief. Ground your advice in what you read in these specific transcripts."
-        ),
-        make_streamer("Researcher"),
-    )
-    results.append(researcher)
-    print(f"  -> Researcher done ({len(researcher.output)} chars)")
-
-    # --- Step 2: Architect v1 ---
-    print("\n[2/6] Architect agent starting (v1)...")
-    architect_v1 = run_agent(
+        (),
+        "Provide your research brief. Ground your advice in what you read in these specific transcripts.",
+        verbatim=False,
+    ),
+    Stage(
+        "architect_v1",
         "Architect",
         ARCHITECT_SYSTEM,
-        (
-            f"CHALLENGE:\n{CHALLENGE}\n\n"
-            f"CALL TRANSCRIPTS:\n{transcripts}\n\n"
-            f"RESEARCHER'S FINDINGS:\n{researcher.output}\n\n"
-            "Design a workflow plan tailored to these specific transcripts. "
-            "The plan should reflect this client's unique needs, politics, and context."
-        ),
-        make_streamer("Architect"),
-    )
-    results.append(architect_v1)
-    print(f"  -> Architect v1 done ({len(architect_v1.output)} chars)")
-
-    # --- Step 3: Critical Eye ---
-    print("\n[3/6] Critical Eye agent starting...")
-    critical_eye = run_agent(
+        (("RESEARCHER'S FINDINGS", "researcher"),),
+        "Design a workflow plan tailored to these specific transcripts. "
+        "The plan should reflect this client's unique needs, politics, and context.",
+        verbatim=False,
+    ),
+    Stage(
+        "critical_eye",
         "Critical Eye",
         CRITICAL_EYE_SYSTEM,
-        (
-            f"CHALLENGE:\n{CHALLENGE}\n\n"
-            f"CALL TRANSCRIPTS:\n{transcripts}\n\n"
-            f"PROPOSED WORKFLOW PLAN:\n{architect_v1.output}\n\n"
-            "Identify the critical human judgment checkpoints for THIS specific client and situation."
-        ),
-        make_streamer("Critical Eye"),
-    )
-    results.append(critical_eye)
-    print(f"  -> Critical Eye done ({len(critical_eye.output)} chars)")
-
-    # --- Step 4: Toolsmith ---
-    print("\n[4/6] Toolsmith agent starting...")
-    toolsmith = run_agent(
+        (("PROPOSED WORKFLOW PLAN", "architect_v1"),),
+        "Identify the critical human judgment checkpoints for THIS specific client and situation.",
+        retrieval=CRITICAL_EYE_QUERIES,
+    ),
+    Stage(
+        "toolsmith",
         "Toolsmith",
         TOOLSMITH_SYSTEM,
         (
-            f"CHALLENGE:\n{CHALLENGE}\n\n"
-            f"CALL TRANSCRIPTS:\n{transcripts}\n\n"
-            f"WORKFLOW PLAN:\n{architect_v1.output}\n\n"
-            f"HUMAN JUDGMENT CHECKPOINTS:\n{critical_eye.output}\n\n"
-            "Map tools with real APIs to each step. No GUI-only tools."
+            ("WORKFLOW PLAN", "architect_v1"),
+            ("HUMAN JUDGMENT CHECKPOINTS", "critical_eye"),
         ),
-        make_streamer("Toolsmith"),
-    )
-    results.append(toolsmith)
-    print(f"  -> Toolsmith done ({len(toolsmith.output)} chars)")
-
-    # --- Step 5: Architect v2 (revision) ---
-    print("\n[5/6] Architect agent starting (v2 - revision)...")
-    architect_v2 = run_agent(
+        "Map tools with real APIs to each step. No GUI-only tools.",
+        verbatim=False,
+        cut_order=("critical_eye", "architect_v1"),
+        retrieval=(
+            "data sources systems exports APC farebox scheduling GTFS spreadsheets CSV",
+            "tools software Python Excel GIS technical skills vendor",
+            "manual reporting compliance automation integration",
+        ),
+    ),
+    Stage(
+        "architect_v2",
         "Architect (Revised)",
         ARCHITECT_SYSTEM,
         (
-            f"CHALLENGE:\n{CHALLENGE}\n\n"
-            f"CALL TRANSCRIPTS:\n{transcripts}\n\n"
-            f"YOUR ORIGINAL WORKFLOW PLAN:\n{architect_v1.output}\n\n"
-            f"CRITICAL EYE FEEDBACK:\n{critical_eye.output}\n\n"
-            f"TOOLSMITH RECOMMENDATIONS:\n{toolsmith.output}\n\n"
-            "Revise your workflow plan incorporating this feedback. Show what changed and why. "
-            "This is the final plan - make it concrete, timed, and actionable for THIS specific client."
+            ("YOUR ORIGINAL WORKFLOW PLAN", "architect_v1"),
+            ("CRITICAL EYE FEEDBACK", "critical_eye"),
+            ("TOOLSMITH RECOMMENDATIONS", "toolsmith"),
         ),
-        make_streamer("Architect (Revised)"),
+        "Revise your workflow plan incorporating this feedback. Show what changed and why. "
+        "This is the final plan - make it concrete, timed, and actionable for THIS specific client.\n\n"
+        + PLAN_FORMAT,
+        verbatim=False,
+        cut_order=("toolsmith", "architect_v1", "critical_eye"),
+    ),
+    Stage(
+        "critical_final",
+        "Critical Eye (Final)",
+        CRITICAL_EYE_SYSTEM + FINAL_PASS_SUFFIX,
+        (("REVISED WORKFLOW PLAN", "architect_v2"),),
+        "Final review: Are the human judgment checkpoints sufficient for this specific client and situation?",
+        retrieval=CRITICAL_EYE_QUERIES,
+    ),
+)
+
+
+# Runs once per transcript set (repeat runs hit the response cache) when a
+# deliberation enables use_digest; non-verbatim stages then read its output.
+DIGEST_STAGE = Stage(
+    "digest",
+    "Transcript Digest",
+    DIGEST_SYSTEM,
+    (),
+    "Write the digest of these transcripts.",
+)
+
+
+def with_digest(stages: Sequence[Stage]) -> tuple[Stage, ...]:
+    """Prepend DIGEST_STAGE and make every non-verbatim stage wait for it."""
+    return (DIGEST_STAGE,) + tuple(
+        s if s.verbatim else replace(s, requires=s.requires + (DIGEST_STAGE.key,))
+        for s in stages
     )
-    results.append(architect_v2)
-    print(f"  -> Architect v2 done ({len(architect_v2.output)} chars)")
 
-    # --- Step 6: Critical Eye final pass ---
-    print("\n[6/6] Critical Eye final pass...")
-    critical_final = run_agent(
-        "Critical Eye (Final)",
-        CRITICAL_EYE_SYSTEM + "\n\nThis is your FINAL pass. The workflow plan has been revised based on your earlier feedback. Confirm the human judgment checkpoints are well-placed for THIS CLIENT, flag anything still missing, and give a brief final assessment. Be concise.",
-        (
-            f"CHALLENGE:\n{CHALLENGE}\n\n"
-            f"CALL TRANSCRIPTS:\n{transcripts}\n\n"
-            f"REVISED WORKFLOW PLAN:\n{architect_v2.output}\n\n"
-            "Final review: Are the human judgment checkpoints sufficient for this specific client and situation?"
-        ),
-        make_streamer("Critical Eye (Final)"),
+
+def _sha(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def stage_inputs(
+    stage: Stage, finished: dict[str, AgentResult], transcripts: dict[str, str], message: str, shared_context: str,
+) -> dict:
+    """
+    Everything a stage's answer depends on, as hashes: its prompt (model
+    config, system prompt), the fully rendered user message (challenge,
+    template, upstream outputs, after budget cuts) and shared context (the
+    transcripts as the stage reads them: raw, preprocessed, condensed,
+    digested or retrieved). Upstream outputs and transcript files are kept
+    separately so changed_inputs can say what moved. Two runs with equal
+    parts can share the stage's result.
+    """
+    config = config_for(stage.key)
+    settings = [config.model, config.max_tokens] + ([config.temperature] if config.temperature is not None else [])
+    if config.context_tokens != DEFAULT_CONTEXT_TOKENS:
+        settings.append(config.context_tokens)
+    return {
+        "prompt": _sha(json.dumps([*settings, stage.system])),
+        "message": _sha(message),
+        "context": _sha(shared_context),
+        "upstream": {dep: _sha(finished[dep].output) for dep in stage.depends_on},
+        "transcripts": dict(transcripts),
+    }
+
+
+# ---------------------------------------------------------------------------
+# Context budget
+# ---------------------------------------------------------------------------
+MIN_SECTION_TOKENS = 300
+MIN_SHARED_CONTEXT_TOKENS = 2000
+SHARED_CONTEXT = "shared context"
+
+
+def budget_prompt(
+    stage: Stage, values: dict[str, str], shared_context: str, ceiling: int,
+) -> tuple[str, str, list[Cut], int]:
+    """
+    Render the stage's message and fit it, with the shared context, under
+    `ceiling` estimated tokens. Upstream outputs are shrunk first (in
+    cut_order, then template order), the challenge/transcripts last; cutting
+    the shared context also gives up its prompt-cache prefix for this stage.
+    Returns (user message, shared context, cuts, estimated prompt tokens).
+    """
+    keys = [src for _, src in stage.sections]
+    order = [k for k in stage.cut_order if k in keys] + [k for k in keys if k not in stage.cut_order]
+    upstream = [k for k in order if k not in CONTEXT_KEYS]
+    sections = [Section(k, values[k], i, MIN_SECTION_TOKENS) for i, k in enumerate(upstream)]
+    sections += [
+        Section(k, values[k], len(upstream) + i, MIN_SHARED_CONTEXT_TOKENS, compactable=False)
+        for i, k in enumerate(k for k in order if k in CONTEXT_KEYS)
+    ]
+    sections.append(Section(SHARED_CONTEXT, shared_context, len(order), MIN_SHARED_CONTEXT_TOKENS, compactable=False))
+    fixed = estimate_tokens(stage.system) + estimate_tokens(stage.render({k: "" for k in keys}))
+    texts, cuts, total = fit(sections, ceiling, fixed)
+    return stage.render({**values, **texts}), texts[SHARED_CONTEXT], cuts, total
+
+
+def hash_inputs(parts: dict) -> str:
+    return _sha(json.dumps(parts, sort_keys=True))
+
+
+def changed_inputs(old: dict, new: dict) -> list[str]:
+    """Human-readable list of which stage inputs differ between two runs."""
+    changes = []
+    if old.get("prompt") != new["prompt"]:
+        changes.append("prompt")
+    for dep, h in new["upstream"].items():
+        if old.get("upstream", {}).get(dep) != h:
+            changes.append(f"upstream {dep}")
+    old_files, new_files = old.get("transcripts", {}), new["transcripts"]
+    touched = sorted(f for f in old_files.keys() | new_files.keys() if old_files.get(f) != new_files.get(f))
+    if touched:
+        changes.append("transcripts " + ", ".join(touched))
+    if old.get("message") != new["message"] and not changes:
+        changes.append("message (template or challenge)")
+    if old.get("context") != new["context"] and not touched:
+        changes.append("shared context (challenge, condensing, digest or retrieval)")
+    return changes or ["no previous result"]
+
+
+def validate_stages(stages: Sequence[Stage]) -> None:
+    """Raise ValueError on duplicate keys, unknown dependencies or cycles."""
+    keys = [s.key for s in stages]
+    if len(set(keys)) != len(keys):
+        raise ValueError(f"Duplicate stage keys in {keys}")
+    for s in stages:
+        unknown = [d for d in s.depends_on if d not in keys]
+        if unknown:
+            raise ValueError(f"Stage {s.key!r} depends on unknown stages {unknown}")
+    resolved: set[str] = set()
+    remaining = list(stages)
+    while remaining:
+        ready = [s for s in remaining if all(d in resolved for d in s.depends_on)]
+        if not ready:
+            raise ValueError(f"Dependency cycle among {[s.key for s in remaining]}")
+        resolved.update(s.key for s in ready)
+        remaining = [s for s in remaining if s.key not in resolved]
+
+
+def critical_path(stages: Sequence[Stage], results: dict[str, AgentResult]) -> tuple[list[str], float]:
+    """
+    Longest chain of dependent stages by measured duration.
+    Returns (stage keys along the path, summed seconds). This is the lower
+    bound on wall time no amount of concurrency can beat. Reused stages
+    count as zero.
+    """
+    finish: dict[str, float] = {}
+    via: dict[str, str | None] = {}
+    by_key = {s.key: s for s in stages}
+
+    def visit(key: str) -> float:
+        if key not in finish:
+            deps = by_key[key].depends_on
+            best = max(deps, key=visit, default=None)
+            via[key] = best
+            spent = 0.0 if results[key].reused else results[key].duration
+            finish[key] = spent + (finish[best] if best else 0.0)
+        return finish[key]
+
+    end = max(by_key, key=visit)
+    path = []
+    key: str | None = end
+    while key:
+        path.append(key)
+        key = via[key]
+    return path[::-1], finish[end]
+
+
+async def execute_stages(
+    stages: Sequence[Stage],
+    run_stage: Callable[[Stage, dict[str, AgentResult]], Awaitable[AgentResult]],
+) -> dict[str, AgentResult]:
+    """
+    Run every stage as soon as all of its dependencies have finished.
+    `run_stage(stage, finished)` receives the results completed so far.
+    Independent stages overlap; the first failure cancels the rest.
+    """
+    validate_stages(stages)
+    pending = list(stages)
+    finished: dict[str, AgentResult] = {}
+    running: dict[asyncio.Task, Stage] = {}
+    try:
+        while pending or running:
+            ready = [s for s in pending if all(d in finished for d in s.depends_on)]
+            for s in ready:
+                pending.remove(s)
+                running[asyncio.create_task(run_stage(s, finished))] = s
+            done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                stage = running.pop(task)
+                finished[stage.key] = task.result()
+    finally:
+        for task in running:
+            task.cancel()
+    return finished
+
+
+# ---------------------------------------------------------------------------
+# Oversized transcript sets: map-reduce into a bounded context
+# ---------------------------------------------------------------------------
+async def reduce_transcripts(
+    transcripts: str,
+    use_cache: bool = True,
+    api_client=None,
+    chunk_tokens: int = CHUNK_TOKENS,
+    budget_tokens: int = REDUCED_CONTEXT_TOKENS,
+    timeout: float | None = None,
+) -> str:
+    """
+    Summarize token-bounded chunks of `transcripts` concurrently, then merge
+    the summaries into at most ~budget_tokens of context. timeout bounds
+    each agent call.
+    """
+    chunks = chunk_by_tokens(transcripts, chunk_tokens)
+    print(f"  Map-reduce: {len(chunks)} chunks of <= ~{chunk_tokens:,} tokens")
+
+    summaries = await asyncio.gather(*(
+        arun_agent(
+            f"Chunk Summary {i + 1}/{len(chunks)}",
+            CHUNK_SUMMARY_SYSTEM,
+            chunk,
+            use_cache=use_cache,
+            api_client=api_client,
+            config=replace(config_for("chunk_summary"), max_tokens=max(500, budget_tokens // len(chunks))),
+            timeout=timeout,
+        )
+        for i, chunk in enumerate(chunks)
+    ))
+    notes = "\n\n".join(f"--- Notes {i + 1}/{len(chunks)} ---\n{r.output}" for i, r in enumerate(summaries))
+    if estimate_tokens(notes) <= budget_tokens:
+        return notes
+
+    merged = await arun_agent(
+        "Chunk Reduce", REDUCE_SYSTEM, notes, use_cache=use_cache, api_client=api_client,
+        config=replace(config_for("chunk_reduce"), max_tokens=budget_tokens), timeout=timeout,
     )
-    results.append(critical_final)
-    print(f"  -> Critical Eye final pass done ({len(critical_final.output)} chars)")
+    return merged.output
+
 
+# ---------------------------------------------------------------------------
+# Orchestrator: runs the full multi-agent deliberation loop
+# ---------------------------------------------------------------------------
+async def _deliberate(
+    transcript_dir: str,
+    on_stream: Callable[[str, str], None] | None,
+    stages: Sequence[Stage],
+    use_cache: bool,
+    api_client,
+    use_digest: bool,
+    use_retrieval: bool,
+    preprocess_steps: tuple[str, ...] | None,
+    context_threshold: int,
+    reuse_dir: str | None,
+    checkpoint_dir: str | None,
+    resume: bool,
+    bus: EventBus | AsyncEvents | None,
+    run_log: str | None,
+    run_store: RunStore | None,
+    client: str | None,
+    stage_timeout: float | None,
+) -> DeliberationResults:
+    transcripts = load_transcripts(transcript_dir, preprocess_steps)
+    file_hashes = transcript_hashes(transcript_dir)
+    # Stages over preprocessed text must not reuse results computed from the raw files.
+    input_files = {**file_hashes, PREPROCESSED_KEY: steps_signature(preprocess_steps)} if preprocess_steps else file_hashes
+    previous = load_manifest(reuse_dir) if reuse_dir else {}
+    checkpoints = CheckpointStore(checkpoint_dir) if checkpoint_dir else None
+    if checkpoints and resume:
+        saved = checkpoints.load()
+        previous.update({key: AgentResult.from_dict(data) for key, data in saved.items()})
+        print(f"Resuming: {len(saved)} checkpointed stage(s) found in {checkpoint_dir}")
+    elif checkpoints:
+        checkpoints.clear()
+    heading = "CALL TRANSCRIPTS"
+    raw_tokens = estimate_tokens(transcripts)
+    if raw_tokens > context_threshold:
+        print(f"Transcripts are ~{raw_tokens:,} tokens (threshold {context_threshold:,}); condensing first...")
+        transcripts = await reduce_transcripts(transcripts, use_cache, api_client, timeout=stage_timeout)
+        heading = "CALL TRANSCRIPTS (CONDENSED FROM LONGER CALLS)"
+        print(f"  Condensed to ~{estimate_tokens(transcripts):,} tokens")
+    context = {"challenge": CHALLENGE, "transcripts": transcripts}
+    shared_context = build_shared_context(transcripts, heading)
+    loop = asyncio.get_running_loop()
+    if not use_retrieval:
+        stages = tuple(replace(s, retrieval=()) for s in stages)
+    index = await asyncio.to_thread(transcript_index, transcript_dir) if any(s.retrieval for s in stages) else None
+    requested = stages
+    if use_digest:
+        stages = with_digest(stages)
+    total = len(stages)
+    position = {s.key: i + 1 for i, s in enumerate(stages)}
+
+    def publish(kind: str, stage: Stage, text: str = "", **data) -> None:
+        if bus:
+            bus.publish(StreamEvent(kind, stage.key, stage.agent_name, text, position[stage.key], data))
+
+    def make_streamer(stage: Stage):
+        # Sync clients stream from a worker thread. The bus is thread-safe;
+        # on_stream hops back onto the loop so callers (e.g. Streamlit)
+        # always see callbacks on their own thread.
+        if not (on_stream or bus):
+            return None
+
+        def streamer(text: str) -> None:
+            publish(TOKEN, stage, text)
+            if on_stream:
+                loop.call_soon_threadsafe(on_stream, stage.agent_name, text)
+        return streamer
+
+    def stage_context(stage: Stage, finished: dict[str, AgentResult]) -> tuple[str, str | None]:
+        """(shared context the stage reads, retrieval note to print if it runs)."""
+        if index and stage.retrieval:
+            passages = index.render(index.retrieve(stage.retrieval, RETRIEVAL_K, transcript_dir))
+            note = (
+                f"  [retrieval] {stage.agent_name}: ~{estimate_tokens(passages):,} of "
+                f"~{raw_tokens:,} transcript tokens ({len(stage.retrieval)} queries, top {RETRIEVAL_K})"
+            )
+            return build_shared_context(passages, heading="RELEVANT TRANSCRIPT PASSAGES"), note
+        if use_digest and not stage.verbatim:
+            digest = finished[DIGEST_STAGE.key].output
+            # A digest no shorter than the transcripts would only cost tokens.
+            if estimate_tokens(digest) < estimate_tokens(transcripts):
+                return build_shared_context(digest, heading="TRANSCRIPT DIGEST"), None
+        return shared_context, None
+
+    run_id = uuid.uuid4().hex[:12]
+    log = RunLog(run_log) if run_log else None
+
+    async def run_stage(stage: Stage, finished: dict[str, AgentResult]) -> AgentResult:
+        publish(STAGE_START, stage)
+        ready = time.perf_counter()
+        result = await compute_stage(stage, finished)
+        if not result.reused:
+            # Time between becoming ready and the agent call starting (budgeting, checkpoints).
+            result.queue_time += max(0.0, time.perf_counter() - ready - result.duration)
+        if log:
+            await asyncio.to_thread(log.append, stage_record(run_id, result))
+        publish(
+            USAGE, stage,
+            input_tokens=result.input_tokens,
+            output_tokens=result.output_tokens,
+            cache_read_tokens=result.cache_read_tokens,
+            cache_creation_tokens=result.cache_creation_tokens,
+        )
+        publish(
+            STAGE_END, stage,
+            chars=len(result.output),
+            duration=result.duration,
+            cached=result.cached,
+            reused=result.reused,
+        )
+        return result
+
+    async def compute_stage(stage: Stage, finished: dict[str, AgentResult]) -> AgentResult:
+        values = {**context, **{k: r.output for k, r in finished.items()}}
+        config = config_for(stage.key)
+        stage_text, note = stage_context(stage, finished)
+        message, context_text, cuts, prompt_tokens = budget_prompt(stage, values, stage_text, config.context_tokens)
+        parts = stage_inputs(stage, finished, input_files, message, context_text)
+        input_hash = hash_inputs(parts)
+        prior = previous.get(stage.key)
+        if prior and prior.input_hash == input_hash:
+            print(f"\n[{position[stage.key]}/{total}] {stage.agent_name}: inputs unchanged, reusing previous result")
+            streamer = make_streamer(stage)
+            if streamer:
+                response_cache.replay(prior.output, streamer)
+            result = replace(prior, reused=True, cached=False)
+            if checkpoints:
+                await asyncio.to_thread(checkpoints.save, stage.key, asdict(result))
+            return result
+        if previous:
+            reason = changed_inputs(prior.input_parts, parts) if prior else ["no previous result"]
+            print(f"\n[{position[stage.key]}/{total}] {stage.agent_name} recomputing ({'; '.join(reason)})")
+        else:
+            print(f"\n[{position[stage.key]}/{total}] {stage.agent_name} agent starting...")
+        if note:
+            print(note)
+        if cuts:
+            print(
+                f"  [budget] {stage.agent_name}: cut to ~{prompt_tokens:,} tokens "
+                f"(ceiling {config.context_tokens:,}): " + "; ".join(c.describe() for c in cuts)
+            )
+        if prompt_tokens > config.context_tokens:
+            print(f"  [budget] {stage.agent_name}: still ~{prompt_tokens:,} tokens, every section is at its floor")
+        result = await arun_agent(
+            stage.agent_name,
+            stage.system,
+            message,
+            make_streamer(stage),
+            context_text,
+            use_cache,
+            api_client,
+            config,
+            stage_timeout,
+        )
+        result.stage = stage.key
+        result.context_cuts = [asdict(c) for c in cuts]
+        result.input_hash = input_hash
+        result.input_parts = parts
+        if checkpoints:
+            await asyncio.to_thread(checkpoints.save, stage.key, asdict(result))
+        if result.cached:
+            print(f"  -> {stage.agent_name} served from response cache ({len(result.output)} chars)")
+        else:
+            print(
+                f"  -> {stage.agent_name} done ({len(result.output)} chars, {result.duration:.1f}s, "
+                f"{result.cache_read_tokens} cached / {result.cache_creation_tokens} cache-write tokens, "
+                f"{result.model}, ${result.cost:.4f})"
+            )
+        return result
+
+    started = time.perf_counter()
+    finished = await execute_stages(stages, run_stage)
+    wall = time.perf_counter() - started
+
+    path, path_time = critical_path(stages, finished)
+    names = " -> ".join(finished[k].agent_name for k in path)
+    print(f"\nCritical path: {names} ({path_time:.1f}s of {wall:.1f}s wall)")
+    if log:
+        log.append({"kind": "run", "run_id": run_id, "wall_time": wall, "stages": len(stages)})
+    if run_store:
+        await asyncio.to_thread(
+            run_store.record,
+            run_id,
+            [finished[s.key] for s in requested],
+            client or os.path.basename(os.path.normpath(transcript_dir)),
+            hash_json(file_hashes),
+            {"stages": CONFIGS.describe(), "digest": use_digest, "retrieval": use_retrieval,
+             "preprocess": steps_signature(preprocess_steps) if preprocess_steps else None},
+            wall,
+        )
+    if use_digest:
+        report_digest_savings(transcripts, finished[DIGEST_STAGE.key].output, requested)
+    if previous:
+        reused = [finished[s.key].agent_name for s in requested if finished[s.key].reused]
+        recomputed = [finished[s.key].agent_name for s in requested if not finished[s.key].reused]
+        print(f"Reused ({len(reused)}): {', '.join(reused) or '-'}")
+        print(f"Recomputed ({len(recomputed)}): {', '.join(recomputed) or '-'}")
+    results = DeliberationResults(finished[s.key] for s in requested)
+    results.digest = finished.get(DIGEST_STAGE.key)
     return results
 
 
+def report_digest_savings(transcripts: str, digest: str, stages: Sequence[Stage]) -> int:
+    """
+    Print (and return) the estimated input tokens the digest saved across
+    the stages that read it: not verbatim stages, and not stages that read
+    retrieved passages instead. A digest that came out no shorter than the
+    transcripts is not used (stages read the transcripts), and saved nothing.
+    """
+    raw, compact = estimate_tokens(transcripts), estimate_tokens(digest)
+    if compact >= raw:
+        print(
+            f"Digest: {raw:,} -> {compact:,} transcript tokens, no shorter; "
+            f"stages read the transcripts instead, nothing saved (digest call read ~{raw:,})"
+        )
+        return 0
+    switched = [s for s in stages if not s.verbatim and not s.retrieval]
+    saved = (raw - compact) * len(switched)
+    print(
+        f"Digest: {raw:,} -> {compact:,} transcript tokens for {len(switched)}/{len(stages)} stages, "
+        f"~{saved:,} input tokens saved (digest call itself reads ~{raw:,})"
+    )
+    return saved
+
+
+def transcript_index(transcript_dir: str) -> TranscriptIndex:
+    """The saved transcript index, brought up to date with transcript_dir (and saved if that changed it)."""
+    index = load_index()
+    indexed, removed = index.update([transcript_dir])
+    if indexed or removed:
+        index.save()
+        print(f"Transcript index: {len(indexed)} file(s) indexed, {len(removed)} removed")
+    return index
+
+
+async def arun_deliberation(
+    transcript_dir: str = "transcripts",
+    on_stream: Callable[[str, str], None] | None = None,
+    stages: Sequence[Stage] = STAGES,
+    use_cache: bool = True,
+    api_client=None,
+    use_digest: bool = False,
+    use_retrieval: bool = False,
+    preprocess_steps: tuple[str, ...] | None = None,
+    context_threshold: int = CONTEXT_TOKEN_THRESHOLD,
+    reuse_dir: str | None = None,
+    checkpoint_dir: str | None = None,
+    resume: bool = False,
+    bus: EventBus | AsyncEvents | None = None,
+    run_log: str | None = None,
+    run_store: RunStore | None = None,
+    client: str | None = None,
+    stage_timeout: float | None = STAGE_TIMEOUT,
+    timeout: float | None = RUN_TIMEOUT,
+) -> DeliberationResults:
+    """
+    Run the full 6-step deliberation:
+      1. Researcher   (reads transcripts + proposal best practices)
+      2. Architect v1 (designs workflow plan tailored to these transcripts)
+      3. Critical Eye (identifies human judgment points specific to this client)
+      4. Toolsmith    (maps API-available tools to each step)
+      5. Architect v2 (revised plan incorporating all feedback)
+      6. Critical Eye final pass
+
+    Stages come from the STAGES graph and each one starts as soon as the
+    stages it depends on have finished.
+
+    on_stream(agent_name, text_chunk) is called for each streamed token.
+    use_cache=False bypasses the on-disk response cache.
+    api_client overrides the event loop's AsyncAnthropic client (a sync
+    client such as mock_api.StubClient streams on worker threads).
+    use_digest=True first condenses the transcripts into a structured digest
+    (DIGEST_STAGE) and feeds that to every stage marked verbatim=False.
+    use_retrieval=True gives each stage that declares retrieval queries only
+    the transcript passages they match (see transcript_index); this takes
+    precedence over the digest for those stages.
+    preprocess_steps runs the transcripts through those preprocessing steps
+    first (e.g. preprocess.DEFAULT_STEPS; see preprocess).
+    Transcript sets estimated above context_threshold tokens are first
+    map-reduced (see reduce_transcripts) so they fit the model's window.
+    reuse_dir points at a previous save_results directory: stages whose
+    inputs (prompt, upstream outputs, transcript files) hash the same as in
+    its manifest are reused instead of re-run; so is its digest.
+    checkpoint_dir persists each stage's result atomically as soon as it
+    finishes; resume=True reuses those (when their inputs still match) so a
+    failed run picks up at its first incomplete stage. Without resume, old
+    checkpoints are cleared at the start.
+    bus receives stage_start / token / usage / stage_end events for every
+    stage (an EventBus or AsyncEvents; see event_bus and
+    stream_deliberation); the caller subscribes before and closes it after.
+    run_log is a JSONL path that gets one telemetry record per stage (queue
+    time, TTFT, duration, tokens/sec, token usage, stop reason) plus one for
+    the run; see telemetry.
+    run_store records the finished run (outputs, telemetry, transcript-set
+    and config hashes) under `client`, which defaults to the transcript
+    directory's name; see run_store.
+    stage_timeout bounds each agent call (StageTimeout) and timeout the
+    whole run (TimeoutError); 0 or None means no limit. Cancelling the
+    awaiting task cancels every running stage; finished stages stay
+    checkpointed.
+    Returns list of AgentResult objects in stage order (the digest is not
+    included).
+    """
+    run = _deliberate(
+        transcript_dir, on_stream, stages, use_cache, api_client, use_digest, use_retrieval, preprocess_steps,
+        context_threshold, reuse_dir, checkpoint_dir, resume, bus, run_log, run_store, client, stage_timeout,
+    )
+    try:
+        return await asyncio.wait_for(run, timeout or None)
+    except StageTimeout:
+        raise
+    except asyncio.TimeoutError:  # not the builtin TimeoutError before Python 3.11
+        if not timeout:
+            raise
+        raise TimeoutError(f"Deliberation did not finish within {timeout:g}s") from None
+
+
+class DeliberationStream:
+    """
+    Async iterator over a deliberation's StreamEvents as they happen:
+
+        stream = stream_deliberation(transcript_dir="transcripts")
+        async for event in stream:
+            ...
+        results = stream.results
+
+    The run's exception, if any, is raised from the loop; leaving the loop
+    early cancels the run.
+    """
+
+    def __init__(self, **kwargs):
+        self.kwargs = kwargs
+        self.results: DeliberationResults | None = None
+
+    async def __aiter__(self) -> AsyncIterator[StreamEvent]:
+        events = AsyncEvents()
+        task = asyncio.create_task(arun_deliberation(**self.kwargs, bus=events))
+        task.add_done_callback(lambda _: events.close())
+        try:
+            async for event in events:
+                yield event
+            self.results = await task
+        finally:
+            if not task.done():
+                task.cancel()
+                await asyncio.gather(task, return_exceptions=True)
+
+
+def stream_deliberation(**kwargs) -> DeliberationStream:
+    """arun_deliberation(**kwargs) as an async iterator of StreamEvents (kwargs must not include bus)."""
+    return DeliberationStream(**kwargs)
+
+
+async def _until_cancelled(run: Awaitable, cancel: threading.Event, poll: float = 0.2):
+    task = asyncio.ensure_future(run)
+    while not task.done():
+        if cancel.is_set():
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+            raise DeliberationCancelled("Deliberation cancelled")
+        await asyncio.wait({task}, timeout=poll)
+    return task.result()
+
+
+def run_deliberation(
+    transcript_dir: str = "transcripts",
+    on_stream: Callable[[str, str], None] | None = None,
+    stages: Sequence[Stage] = STAGES,
+    use_cache: bool = True,
+    api_client=None,
+    use_digest: bool = False,
+    use_retrieval: bool = False,
+    preprocess_steps: tuple[str, ...] | None = None,
+    context_threshold: int = CONTEXT_TOKEN_THRESHOLD,
+    reuse_dir: str | None = None,
+    checkpoint_dir: str | None = None,
+    resume: bool = False,
+    bus: EventBus | AsyncEvents | None = None,
+    run_log: str | None = None,
+    run_store: RunStore | None = None,
+    client: str | None = None,
+    stage_timeout: float | None = STAGE_TIMEOUT,
+    timeout: float | None = RUN_TIMEOUT,
+    cancel: threading.Event | None = None,
+) -> DeliberationResults:
+    """
+    Blocking arun_deliberation (see there for every argument). It runs on
+    the process's background event loop (clients.run_blocking), so runs
+    started from several threads at once share that loop and its client,
+    and timeouts cancel streams instead of waiting for them. on_stream is
+    called on the calling thread. Setting `cancel` from another thread
+    stops the run and raises DeliberationCancelled.
+    """
+    calls = queue.SimpleQueue()
+    run = arun_deliberation(
+        transcript_dir, deferred(on_stream, calls), stages, use_cache, api_client, use_digest, use_retrieval,
+        preprocess_steps, context_threshold, reuse_dir, checkpoint_dir, resume, bus, run_log, run_store, client,
+        stage_timeout, timeout,
+    )
+    return run_blocking(_until_cancelled(run, cancel) if cancel else run, calls)
+
+
 # ---------------------------------------------------------------------------
 # Save outputs
 # ---------------------------------------------------------------------------
-def save_results(results: list[AgentResult], output_dir: str = "output"):
-    """Save all agent outputs to files."""
+MANIFEST_NAME = "manifest.json"
+
+
+def result_filename(index: int, agent_name: str) -> str:
+    """Per-stage output file name, e.g. 5_architect_revised.md (index is 0-based)."""
+    safe_name = agent_name.lower().replace(" ", "_").replace("(", "").replace(")", "")
+    return f"{index + 1}_{safe_name}.md"
+
+
+def read_result_file(filepath: str) -> str:
+    """Agent output from a saved stage file, without its '# Agent' header."""
+    with open(filepath, "r") as f:
+        content = f.read()
+    lines = content.split("\n")
+    if lines and lines[0].startswith("# "):
+        content = "\n".join(lines[2:])
+    return content
+
+
+def load_manifest(output_dir: str) -> dict[str, AgentResult]:
+    """Stage results (and the digest) recorded by a previous save_results, keyed by stage. Empty if none."""
+    try:
+        with open(os.path.join(output_dir, MANIFEST_NAME), "r") as f:
+            manifest = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+    results = {}
+    for entry in manifest.get("stages", []):
+        filepath = os.path.join(output_dir, entry["file"])
+        if not entry.get("stage") or not os.path.exists(filepath):
+            continue
+        output = read_result_file(filepath)
+        # Stage files are replaced live during a run; one rewritten by a run
+        # that never saved its manifest no longer matches the recorded hash.
+        if entry.get("sha256") and entry["sha256"] != _sha(output):
+            continue
+        results[entry["stage"]] = AgentResult.from_dict({**entry["result"], "output": output})
+    if digest := manifest.get("digest"):
+        results[DIGEST_STAGE.key] = AgentResult.from_dict({**digest["result"], "output": digest["output"]})
+    return results
+
+
+def output_files(stages: Sequence[Stage] = STAGES) -> list[tuple[str, str, str]]:
+    """(stage key, agent name, file name) for each saved stage, in document order."""
+    return [(s.key, s.agent_name, result_filename(i, s.agent_name)) for i, s in enumerate(stages)]
+
+
+def live_writer(output_dir: str = "output", stages: Sequence[Stage] = STAGES) -> LiveWriter:
+    """A LiveWriter that streams these stages' files into output_dir; subscribe it to the run's bus."""
+    return LiveWriter(output_dir, output_files(stages))
+
+
+def save_results(results: list[AgentResult], output_dir: str = "output", outputs_written: bool = False):
+    """
+    Save all agent outputs to files, plus a manifest of each stage's input
+    hash (and the transcript digest, if results carry one) and the revised
+    plan's steps as steps.json (see plan_parser).
+    Every file is replaced atomically. Pass outputs_written=True when a
+    LiveWriter already produced the stage files and combined document.
+    """
     os.makedirs(output_dir, exist_ok=True)
-    
-    for i, r in enumerate(results):
-        safe_name = r.agent_name.lower().replace(" ", "_").replace("(", "").replace(")", "")
-        filepath = os.path.join(output_dir, f"{i+1}_{safe_name}.md")
-        with open(filepath, "w") as f:
-            f.write(f"# {r.agent_name}\n\n")
-            f.write(r.output)
-        print(f"  Saved: {filepath}")
-
-    # Save combined output
-    combined_path = os.path.join(output_dir, "full_deliberation.md")
-    with open(combined_path, "w") as f:
-        f.write("# Workflow Architect: Full Multi-Agent Deliberation\n\n")
-        f.write("---\n\n")
+    combined_path = os.path.join(output_dir, COMBINED_NAME)
+
+    if not outputs_written:
         for i, r in enumerate(results):
-            f.write(f"## Stage {i+1}: {r.agent_name}\n\n")
-            f.write(r.output)
-            f.write("\n\n---\n\n")
-    print(f"  Saved combined: {combined_path}")
+            filepath = os.path.join(output_dir, result_filename(i, r.agent_name))
+            write_atomic(filepath, stage_document(r.agent_name, r.output))
+            print(f"  Saved: {filepath}")
+
+        sections = [combined_section(i, r.agent_name, r.output) for i, r in enumerate(results)]
+        write_atomic(combined_path, COMBINED_HEADER + "".join(sections))
+        print(f"  Saved combined: {combined_path}")
+
+    manifest = {
+        "saved_at": time.time(),
+        "stages": [
+            {
+                "stage": r.stage,
+                "file": result_filename(i, r.agent_name),
+                "sha256": _sha(r.output),
+                "result": {k: v for k, v in asdict(r).items() if k != "output"},
+            }
+            for i, r in enumerate(results)
+        ],
+    }
+    digest = getattr(results, "digest", None)
+    if digest:
+        # No stage file of its own: the output is kept here.
+        manifest["digest"] = {"output": digest.output, "result": {k: v for k, v in asdict(digest).items() if k != "output"}}
+    write_atomic(os.path.join(output_dir, MANIFEST_NAME), json.dumps(manifest, indent=2))
+
+    steps_path = os.path.join(output_dir, STEPS_FILE)
+    for i, r in enumerate(results):
+        if r.stage != "architect_v2":
+            continue
+        try:
+            document = steps_document(r.output, source=result_filename(i, r.agent_name))
+        except PlanFormatError as e:
+            print(f"  !! No steps.json: revised plan did not parse ({e})")
+            if os.path.exists(steps_path):
+                os.remove(steps_path)
+        else:
+            write_atomic(steps_path, json.dumps(document, indent=2))
+            print(f"  Saved steps: {steps_path} ({len(document['steps'])} steps, {document['total_minutes']} min)")
 
     return combined_path
 
@@ -374,15 +1452,63 @@ def save_results(results: list[AgentResult], output_dir: str = "output"):
 # CLI entry point
 # ---------------------------------------------------------------------------
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the multi-agent deliberation.")
+    parser.add_argument("--no-cache", action="store_true", help="bypass the on-disk response cache")
+    parser.add_argument("--digest", action="store_true",
+                        help="condense transcripts once; non-verbatim agents read the digest")
+    parser.add_argument("--full", action="store_true",
+                        help="recompute every stage, even if its inputs match the last saved run")
+    parser.add_argument("--resume", action="store_true",
+                        help="continue an interrupted run from its checkpoints in output/.checkpoint")
+    parser.add_argument("--retrieval", action="store_true",
+                        help="stages with retrieval queries read only the matching transcript passages")
+    parser.add_argument("--preprocess", action="store_true",
+                        help="normalize transcripts, drop filler/stage directions, alias speakers, collapse repeats")
+    parser.add_argument("--stage-timeout", type=float, default=STAGE_TIMEOUT,
+                        help="seconds one agent call may take (0 = no limit)")
+    parser.add_argument("--timeout", type=float, default=RUN_TIMEOUT,
+                        help="seconds the whole deliberation may take (0 = no limit)")
+    parser.add_argument("--client", help="name this run is filed under in the run store (default: transcripts)")
+    args = parser.parse_args()
+
     print("=" * 60)
     print("WORKFLOW ARCHITECT - Multi-Agent Deliberation")
     print("=" * 60)
     
-    results = run_deliberation()
+    cli_started = time.perf_counter()
+    # Stage files stream to output/N_<agent>.md.part and are renamed into place as each stage ends.
+    writer = live_writer("output")
+    bus = EventBus()
+    bus.subscribe(writer.on_event, name="live-output")
+    try:
+        results = run_deliberation(
+            use_cache=not args.no_cache,
+            use_digest=args.digest,
+            use_retrieval=args.retrieval,
+            preprocess_steps=DEFAULT_STEPS if args.preprocess else None,
+            reuse_dir=None if args.full else "output",
+            checkpoint_dir=CHECKPOINT_DIR,
+            resume=args.resume,
+            bus=bus,
+            run_log=os.path.join("output", RUN_LOG_NAME),
+            run_store=get_store(),
+            client=args.client,
+            stage_timeout=args.stage_timeout,
+            timeout=args.timeout,
+        )
+    finally:
+        bus.close()
+    combined = writer.finalize()
     
     print("\n" + "=" * 60)
     print("SAVING RESULTS")
     print("=" * 60)
-    save_results(results)
+    save_results(results, outputs_written=combined is not None)
+    CheckpointStore(CHECKPOINT_DIR).clear()
+
+    print("\n" + "=" * 60)
+    print("STAGE TELEMETRY")
+    print("=" * 60)
+    print(format_summary_table([stage_record("", r) for r in results], time.perf_counter() - cli_started))
     
     print("\nDone! Check the output/ directory.")
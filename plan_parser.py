@@ -0,0 +1,273 @@
+"""
+Plan Parser
+===========
+Deterministic parser for the revised Architect's numbered workflow plan, so
+the PDF is built from a validated step list instead of a second model call.
+
+The revised Architect is asked for PLAN_FORMAT headings. Also recognized:
+  **Step 3: Technical Reality Check** (3 minutes, human calibration)
+  **Step 3: Intake (AI)** (3 minutes, automated)
+  3. **Technical Reality Check** (3 minutes, human)
+  1. **Intake** - 5 minutes (automated)
+  ### Step 3: Technical Reality Check (3 min, automated)
+  ### 5. Final check (3 min) - Human review
+  | 3 | Technical Reality Check | 3 min | human | Sheets | ... |   (table
+      with a header row naming step, time and type columns)
+A numbered line that is neither a heading nor bold ("1. Moved the pricing
+check earlier, saving 5 minutes") is prose, not a step.
+
+Steps keep the plan's own numbers, which must run 1, 2, 3, ... with no gap
+or repeat. A "Step N" line that matches no format, or a qualifier that says
+neither automated nor human, raises PlanFormatError: a flowchart drawn
+from a plan that lost a step, or that shows a human step as automated, is
+worse than none.
+
+Bullets under a step fill in the rest: "- **Tool**:" / "- **Tools**:" give
+the tools, "- **Process**:" (else "- **Output**:", else the first bullet)
+the description. "## Phase N: ..." headings set each step's phase.
+
+save_results() writes the parsed list to output/steps.json:
+  {"source": "5_architect_revised.md", "total_minutes": 60,
+   "steps": [{"number": 1, "name": ..., "minutes": 3, "type": "auto",
+              "qualifier": "automated", "tools": ..., "desc": ..., "phase": ...}]}
+"""
+
+import os
+import re
+import json
+from dataclasses import dataclass, asdict
+
+STEPS_FILE = "steps.json"
+PLAN_FILE = "5_architect_revised.md"
+STEP_TYPES = ("auto", "human", "hybrid")
+
+# Appended to the revised Architect's instruction, so its plan parses.
+PLAN_FORMAT = (
+    "Write each workflow step as a heading line of exactly this form, numbering the steps 1, 2, 3, ... "
+    "in order with no gaps:\n"
+    "**Step N: Step name** (M minutes, TYPE)\n"
+    "where TYPE is \"automated\", \"human\", or \"human with AI assist\". "
+    "Under each heading give \"- **Tools**:\" and \"- **Process**:\" bullets. "
+    "Group steps under \"## Phase N: Name\" headings."
+)
+
+# <prefix> <number> <name> <separator> <minutes> <rest of line>; the
+# qualifier is whatever follows the minutes, inside or after parentheses.
+# A bare "N." line only counts as a step when it is a heading or bold, so
+# numbered prose that mentions minutes ("1. Moved X earlier, saving 5
+# minutes") is left alone.
+STEP_HEADING = re.compile(
+    r"^(?P<indent>\s*)(?P<marked>#{1,6}\s*|\*\*\s*)?(?:\*\*\s*)?"
+    r"(?:Step\s+(?P<step>\d+)\s*[:.)-]?|(?P<num>\d+)[.)]\s*(?P<bold>\*\*)?)"
+    r"\s*(?P<name>[^*\n]+?)\s*(?:\*\*)?\s*[-\u2013\u2014:,]?\s*"
+    r"\(?(?P<minutes>\d+)\s*(?:minutes?|mins?)\b\.?\s*(?P<rest>.*)$",
+    re.I,
+)
+# A line that announces a step (heading, bold, or "Step N:") but matched no format above.
+STEP_LIKE = re.compile(
+    r"^\s*(?:#{1,6}\s*(?:\*\*\s*)?Step\s+\d+\b|\*\*\s*Step\s+\d+\b|Step\s+\d+\s*[:.)\-\u2013\u2014])", re.I
+)
+TABLE_ROW = re.compile(r"^\s*\|(.+)\|\s*$")
+TABLE_RULE = re.compile(r"^[\s|:-]+$")
+# Header cell patterns for plans written as a table, checked in this order.
+TABLE_COLUMNS = (
+    ("minutes", re.compile(r"time|min|duration", re.I)),
+    ("type", re.compile(r"type|owner|mode|who|human|automat", re.I)),
+    ("tools", re.compile(r"tool", re.I)),
+    ("desc", re.compile(r"desc|process|output|action|detail", re.I)),
+    ("number", re.compile(r"^(?:#|no\.?|num(?:ber)?|step)$", re.I)),
+    ("name", re.compile(r"name|task|activity|title|^step$", re.I)),
+)
+PHASE_HEADING = re.compile(r"^#{1,6}\s*(Phase\s+\d+\s*:?\s*[^(\n]*)", re.I)
+FIELD_BULLET = re.compile(r"^\s*[-*+]\s*\*\*(?P<label>[^*:]+):?\*\*:?\s*(?P<value>.*)$")
+BULLET = re.compile(r"^\s*[-*+]\s+(?P<value>.+)$")
+
+
+class PlanFormatError(ValueError):
+    """The plan (or a steps.json) does not match the step schema."""
+
+
+@dataclass
+class PlanStep:
+    number: int
+    name: str
+    minutes: int
+    type: str
+    qualifier: str = ""
+    tools: str = ""
+    desc: str = ""
+    phase: str = ""
+
+
+def classify(qualifier: str) -> str:
+    """
+    Map a heading qualifier like "human with AI assist" onto auto / human /
+    hybrid. One that names neither raises PlanFormatError rather than
+    defaulting to "auto".
+    """
+    q = qualifier.lower()
+    human = re.search(r"human|manual|judg|review|approv|calibrat|consultant|person", q)
+    auto = re.search(r"automat|\bai\b|\bllm\b|\bbot\b|script|machine", q)
+    if "hybrid" in q or "assist" in q or "spot-check" in q or (human and auto):
+        return "hybrid"
+    if human:
+        return "human"
+    if auto:
+        return "auto"
+    raise PlanFormatError(f"cannot tell whether {qualifier!r} is automated or human" if q.strip() else "no step type given")
+
+
+def _clean(text: str) -> str:
+    return re.sub(r"\s+", " ", text.replace("**", "")).strip()
+
+
+def _qualifier(rest: str) -> str:
+    """"automated) - note" / ", human)" / ") - Human review" -> the words, without brackets and separators."""
+    return _clean(re.sub(r"[()\[\]]", " ", rest)).strip(" -\u2013\u2014:,;|.")
+
+
+def _step(number: str, name: str, minutes: str, qualifier: str, phase: str, line: str) -> PlanStep:
+    try:
+        kind = classify(qualifier)
+    except PlanFormatError as e:
+        raise PlanFormatError(f"step {number}: {e}: {line.strip()!r}") from None
+    return PlanStep(int(number), _clean(name).rstrip(":"), int(minutes), kind, qualifier, phase=phase)
+
+
+def _table_columns(cells: list[str]) -> dict[str, int] | None:
+    """Column index per field for a plan table's header row, or None if it is not one."""
+    columns: dict[str, int] = {}
+    for i, cell in enumerate(cells):
+        for field_name, pattern in TABLE_COLUMNS:
+            if field_name not in columns and pattern.search(_clean(cell)):
+                columns[field_name] = i
+                break
+    if "minutes" in columns and "type" in columns and ("number" in columns or "name" in columns):
+        return columns
+    return None
+
+
+def _table_step(cells: list[str], columns: dict[str, int], phase: str, line: str) -> PlanStep | None:
+    def cell(field_name: str) -> str:
+        i = columns.get(field_name)
+        return _clean(cells[i]) if i is not None and i < len(cells) else ""
+
+    numbered = re.match(r"^(?:Step\s+)?(\d+)[:.)]?\s*(.*)$", cell("number") or cell("name"), re.I)
+    minutes = re.search(r"\d+", cell("minutes"))
+    if not numbered:
+        return None
+    if not minutes:
+        raise PlanFormatError(f"step {numbered.group(1)}: no minutes in table row {line.strip()!r}")
+    name = cell("name") if "name" in columns and "number" in columns else numbered.group(2)
+    step = _step(numbered.group(1), name, minutes.group(0), cell("type"), phase, line)
+    step.tools, step.desc = cell("tools"), cell("desc")
+    return step
+
+
+def check_numbering(steps: list[PlanStep]) -> None:
+    """Raise PlanFormatError unless the steps are numbered 1, 2, 3, ... in order."""
+    for i, step in enumerate(steps, start=1):
+        if step.number != i:
+            seen = [s.number for s in steps[:i - 1]]
+            problem = "repeats" if step.number in seen else f"follows step {i - 1}" if i > 1 else "comes first"
+            raise PlanFormatError(f"step {step.number} ({step.name}) {problem}; expected step {i}")
+
+
+def parse_plan(markdown: str) -> list[PlanStep]:
+    """
+    Steps of a plan, with the plan's own numbers. Raises PlanFormatError on
+    an unrecognized "Step N" line, an unknown step type, or numbering with a
+    gap or a repeat.
+    """
+    steps: list[PlanStep] = []
+    phase = ""
+    first_bullet: dict[int, str] = {}
+    fields: dict[int, dict[str, str]] = {}
+    columns: dict[str, int] | None = None
+    for line in markdown.splitlines():
+        row = TABLE_ROW.match(line)
+        if row:
+            cells = row.group(1).split("|")
+            if columns is None:
+                columns = _table_columns(cells)
+            elif not TABLE_RULE.match(line):
+                step = _table_step(cells, columns, phase, line)
+                if step:
+                    steps.append(step)
+            continue
+        columns = None
+        heading = STEP_HEADING.match(line)
+        if heading and heading.group("num") and (heading.group("indent") or not (heading.group("marked") or heading.group("bold"))):
+            heading = None  # a nested or plain numbered item, not a step
+        if heading:
+            rest = heading.group("rest")
+            steps.append(_step(
+                heading.group("step") or heading.group("num"), heading.group("name"),
+                heading.group("minutes"), _qualifier(rest), phase, line,
+            ))
+            continue
+        if STEP_LIKE.match(line):
+            raise PlanFormatError(f"unrecognized step heading {line.strip()!r} (expected e.g. {PLAN_FORMAT.splitlines()[1]!r})")
+        phase_match = PHASE_HEADING.match(line)
+        if phase_match:
+            phase = _clean(phase_match.group(1)).rstrip(":")
+            continue
+        if not steps:
+            continue
+        index = len(steps) - 1
+        field_match = FIELD_BULLET.match(line)
+        if field_match:
+            fields.setdefault(index, {}).setdefault(field_match.group("label").strip().lower(), _clean(field_match.group("value")))
+        bullet = BULLET.match(line)
+        if bullet:
+            first_bullet.setdefault(index, _clean(bullet.group("value")))
+    for index, step in enumerate(steps):
+        found = fields.get(index, {})
+        step.tools = found.get("tool") or found.get("tools") or step.tools
+        step.desc = found.get("process") or found.get("output") or step.desc or first_bullet.get(index, "")
+    check_numbering(steps)
+    return steps
+
+
+def validate_steps(steps: list[dict]) -> list[dict]:
+    """Check a step list against the schema; raises PlanFormatError on the first problem."""
+    if not isinstance(steps, list) or not steps:
+        raise PlanFormatError("no workflow steps")
+    required = {"number": int, "name": str, "minutes": int, "type": str, "tools": str, "desc": str}
+    for i, step in enumerate(steps, start=1):
+        if not isinstance(step, dict):
+            raise PlanFormatError(f"step {i}: not an object")
+        for key, kind in required.items():
+            if not isinstance(step.get(key), kind):
+                raise PlanFormatError(f"step {i}: '{key}' must be {kind.__name__}")
+        if step["number"] != i:
+            raise PlanFormatError(f"step {i}: numbered {step['number']}")
+        if not step["name"].strip():
+            raise PlanFormatError(f"step {i}: empty name")
+        if step["minutes"] <= 0:
+            raise PlanFormatError(f"step {i}: minutes must be positive")
+        if step["type"] not in STEP_TYPES:
+            raise PlanFormatError(f"step {i}: type must be one of {', '.join(STEP_TYPES)}")
+    return steps
+
+
+def steps_document(markdown: str, source: str = PLAN_FILE) -> dict:
+    """Parse and validate a plan into the steps.json document."""
+    steps = validate_steps([asdict(s) for s in parse_plan(markdown)])
+    return {"source": source, "total_minutes": sum(s["minutes"] for s in steps), "steps": steps}
+
+
+def load_steps(output_dir: str = "output") -> list[dict]:
+    """
+    Validated steps for a saved deliberation: steps.json if present, else
+    parsed from the revised plan (outputs saved before steps.json existed).
+    """
+    path = os.path.join(output_dir, STEPS_FILE)
+    if os.path.exists(path):
+        with open(path) as fh:
+            try:
+                return validate_steps(json.load(fh).get("steps"))
+            except (json.JSONDecodeError, AttributeError) as e:
+                raise PlanFormatError(f"{path}: {e}") from e
+    with open(os.path.join(output_dir, PLAN_FILE)) as fh:
+        return steps_document(fh.read())["steps"]
@@ -0,0 +1,246 @@
+"""
+Transcript Preprocessing
+========================
+Shrinks call transcripts before any agent reads them. Every stage gets the
+transcripts, so each character removed here is saved on every call.
+
+Steps, applied in this order (PREPROCESS_STEPS picks which run):
+  normalize   Unicode NFKC, straight quotes, "..." for ellipses, no
+              timestamps, single spaces, at most one blank line
+  directions  drop stage directions: [laughs], (crosstalk), [inaudible 00:12]
+  filler      drop um/uh/hmm, ", you know,", leading "I mean," / "Yeah,", "..."
+              before a repeated word ("I... I"), stutters ("I-I") and
+              restarts on short words ("I I think", "the the")
+  aliases     replace each speaker label with short initials, with a
+              "Speakers:" legend under the call header
+  dedupe      drop a turn that repeats an earlier one in the same call
+              (3-word-shingle Jaccard >= DEDUPE_THRESHOLD), or a short turn
+              identical to the same speaker's previous one
+
+Results are cached under PREPROCESS_CACHE_DIR by the SHA-256 of the file,
+the step list and RULES_VERSION, so a transcript is processed once. Each
+file's character and token reduction comes back as a FileReport.
+
+Settings (environment):
+  PREPROCESS_STEPS        comma list    (default normalize,directions,filler,aliases,dedupe)
+  PREPROCESS_CACHE_DIR    cache folder  (default .cache/preprocessed)
+"""
+
+import os
+import re
+import json
+import hashlib
+import unicodedata
+from dataclasses import dataclass, asdict
+
+from checkpoint import write_atomic
+from tokens import estimate_tokens
+from transcript_index import split_turns
+
+STEPS = ("normalize", "directions", "filler", "aliases", "dedupe")
+DEFAULT_STEPS = tuple(s.strip() for s in os.getenv("PREPROCESS_STEPS", ",".join(STEPS)).split(",") if s.strip())
+CACHE_DIR = os.getenv("PREPROCESS_CACHE_DIR", os.path.join(".cache", "preprocessed"))
+DEDUPE_THRESHOLD = 0.85
+SHORT_TURN_WORDS = 6
+# Bump when a step's rules change, so cached results from the old rules are not reused.
+RULES_VERSION = 2
+
+PUNCTUATION = {"‘": "'", "’": "'", "“": '"', "”": '"', "…": "...", " ": " "}
+# A time opening a line ("00:12:03 Stephen: ...") or bracketed anywhere ("[12:03]").
+TIMESTAMP = re.compile(r"(?m)^[\[(]?\d{1,2}:\d{2}(?::\d{2})?[\])]?[ \t]+|[ \t]*\[\d{1,2}:\d{2}(?::\d{2})?\]")
+DIRECTION = re.compile(
+    r"\s*(?:\[[^\]\n]{1,40}\]|\((?:laugh|crosstalk|inaudible|pause|silence|overlap|unintelligible|cough|sigh|"
+    r"background|audio|no audio|phone)[^)\n]{0,30}\)|\*(?:laughs?|pauses?|sighs?)\*)",
+    re.I,
+)
+# Short words a speaker restarts on ("I I think", "and the and the"). Other
+# repeats ("no no", "very very") are usually meant and are kept.
+RESTARTS = ("i", "i'm", "i've", "we", "we're", "you", "it", "it's", "they", "he", "she",
+            "the", "a", "an", "and", "but", "to", "of", "in", "my", "our", "this")
+FILLERS = (
+    (re.compile(r"\b(?:u+m+|u+h+|e+r+m+|h+m+|m{2,})\b[,.]?\s*", re.I), ""),
+    (re.compile(r",\s*you know\s*,", re.I), ","),
+    (re.compile(r"(^|[.!?]\s+)(?:you know|i mean|like|yeah|oh|well|okay),\s*", re.I), r"\1"),
+    (re.compile(r"\b([\w']+)\s*\.\.\.\s*(?=\1\b)", re.I), r"\1 "),
+    (re.compile(r"\b(\w{1,3})-\1\b", re.I), r"\1"),
+    (re.compile(rf"\b((?:{'|'.join(RESTARTS)})\b(?:\s+[\w']+){{0,2}})(?:\s+\1\b)+", re.I), r"\1"),
+)
+
+
+def normalize(text: str) -> str:
+    text = unicodedata.normalize("NFKC", text)
+    for old, new in PUNCTUATION.items():
+        text = text.replace(old, new)
+    text = TIMESTAMP.sub("", text)
+    text = re.sub(r"[ \t]+", " ", text)
+    text = re.sub(r" +\n", "\n", text)
+    return re.sub(r"\n{3,}", "\n\n", text).strip() + "\n"
+
+
+def _tidy(text: str) -> str:
+    text = re.sub(r"\s+([,.!?;:])", r"\1", text)
+    text = re.sub(r"([,;:])\1+", r"\1", text)
+    text = re.sub(r"^[,;:\s]+", "", text)
+    text = re.sub(r"[ \t]{2,}", " ", text).strip()
+    return text[:1].upper() + text[1:]
+
+
+def remove_directions(text: str) -> str:
+    return _tidy(DIRECTION.sub("", text))
+
+
+def remove_filler(text: str) -> str:
+    for pattern, replacement in FILLERS:
+        text = pattern.sub(replacement, text)
+    return _tidy(text)
+
+
+def speaker_aliases(speakers: list[str]) -> dict[str, str]:
+    """Shortest unique initials per speaker label ("David Chen" -> "DC"); labels no longer than that stay."""
+    aliases: dict[str, str] = {}
+    taken: set[str] = set()
+    for speaker in speakers:
+        if speaker in aliases or not speaker:
+            continue
+        words = [w for w in re.split(r"[\s.]+", speaker) if w]
+        alias = "".join(w[0] for w in words).upper()
+        length = 1
+        while alias in taken:
+            length += 1
+            alias = (words[0][:length] + "".join(w[0] for w in words[1:])).title()
+        aliases[speaker] = alias if len(alias) < len(speaker) else speaker
+        taken.add(aliases[speaker])
+    return aliases
+
+
+def _shingles(text: str) -> set[tuple[str, ...]]:
+    words = re.findall(r"\w+", text.lower())
+    return {tuple(words[i:i + 3]) for i in range(max(1, len(words) - 2))}
+
+
+def dedupe_turns(turns: list[tuple[str, str]], threshold: float = DEDUPE_THRESHOLD) -> list[tuple[str, str]]:
+    kept: list[tuple[str, str]] = []
+    seen: list[set] = []
+    last_by_speaker: dict[str, str] = {}
+    for speaker, said in turns:
+        words = len(re.findall(r"\w+", said))
+        if words < SHORT_TURN_WORDS:
+            if last_by_speaker.get(speaker, "").lower() == said.lower():
+                continue
+        else:
+            shingles = _shingles(said)
+            if any(len(shingles & other) / len(shingles | other) >= threshold for other in seen):
+                continue
+            seen.append(shingles)
+        kept.append((speaker, said))
+        last_by_speaker[speaker] = said
+    return kept
+
+
+def preprocess_text(text: str, steps: tuple[str, ...] = DEFAULT_STEPS) -> tuple[str, int]:
+    """Run the selected steps over one transcript; returns (text, turns dropped)."""
+    unknown = set(steps) - set(STEPS)
+    if unknown:
+        raise ValueError(f"Unknown preprocessing step(s): {', '.join(sorted(unknown))} (choose from {', '.join(STEPS)})")
+    if "normalize" in steps:
+        text = normalize(text)
+    header, turns = split_turns(text)
+    if "directions" in steps:
+        turns = [(speaker, remove_directions(said)) for speaker, said in turns]
+    if "filler" in steps:
+        turns = [(speaker, remove_filler(said)) for speaker, said in turns]
+    before = len(turns)
+    turns = [(speaker, said) for speaker, said in turns if said]
+    if "dedupe" in steps:
+        turns = dedupe_turns(turns)
+    dropped = before - len(turns)
+    if "aliases" in steps:
+        aliases = speaker_aliases([speaker for speaker, _ in turns])
+        shortened = {name: alias for name, alias in aliases.items() if alias != name}
+        if shortened:
+            legend = "Speakers: " + ", ".join(f"{alias} = {name}" for name, alias in shortened.items())
+            header = f"{header}\n{legend}" if header else legend
+        turns = [(aliases.get(speaker, speaker), said) for speaker, said in turns]
+    body = "\n\n".join(f"{speaker}: {said}" if speaker else said for speaker, said in turns)
+    return (f"{header}\n---\n\n{body}" if header else body), dropped
+
+
+@dataclass
+class FileReport:
+    file: str
+    chars_before: int
+    chars_after: int
+    tokens_before: int
+    tokens_after: int
+    turns_dropped: int = 0
+    cached: bool = False
+
+    @property
+    def saved_pct(self) -> float:
+        return 100 * (1 - self.chars_after / self.chars_before) if self.chars_before else 0.0
+
+
+def steps_signature(steps: tuple[str, ...] = DEFAULT_STEPS) -> str:
+    return ",".join(s for s in STEPS if s in steps)
+
+
+def preprocess_file(path: str, steps: tuple[str, ...] = DEFAULT_STEPS, cache_dir: str | None = CACHE_DIR) -> tuple[str, FileReport]:
+    """Preprocessed text of one transcript file, from the cache when this file and step list were seen before."""
+    with open(path, "rb") as fh:
+        raw = fh.read()
+    key = hashlib.sha256(raw + b"\0" + f"{steps_signature(steps)}\0{RULES_VERSION}".encode()).hexdigest()
+    cache_path = os.path.join(cache_dir, f"{key}.json") if cache_dir else None
+    if cache_path and os.path.exists(cache_path):
+        try:
+            with open(cache_path) as fh:
+                entry = json.load(fh)
+            return entry["text"], FileReport(**{**entry["report"], "file": os.path.basename(path), "cached": True})
+        except (json.JSONDecodeError, KeyError, TypeError):
+            pass
+    original = raw.decode("utf-8").strip()
+    text, dropped = preprocess_text(original, steps)
+    text = text.strip()
+    report = FileReport(
+        os.path.basename(path), len(original), len(text), estimate_tokens(original), estimate_tokens(text), dropped,
+    )
+    if cache_path:
+        write_atomic(cache_path, json.dumps({"text": text, "report": asdict(report)}))
+    return text, report
+
+
+def format_report(reports: list[FileReport]) -> str:
+    """Per-file character/token reduction, plus totals."""
+    lines = [f"{'FILE':<32} {'CHARS':>15} {'TOKENS':>13} {'SAVED':>6} {'DROPPED':>8}"]
+    for r in reports:
+        lines.append(
+            f"{r.file[:32]:<32} {r.chars_before:>7,}->{r.chars_after:<7,} {r.tokens_before:>6,}->{r.tokens_after:<6,} "
+            f"{r.saved_pct:>5.1f}% {r.turns_dropped:>8}" + ("  (cached)" if r.cached else "")
+        )
+    before, after = sum(r.chars_before for r in reports), sum(r.chars_after for r in reports)
+    tokens_before, tokens_after = sum(r.tokens_before for r in reports), sum(r.tokens_after for r in reports)
+    saved = 100 * (1 - after / before) if before else 0.0
+    lines.append(
+        f"{'TOTAL':<32} {before:>7,}->{after:<7,} {tokens_before:>6,}->{tokens_after:<6,} {saved:>5.1f}% "
+        f"{sum(r.turns_dropped for r in reports):>8}"
+    )
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    import glob
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Preprocess transcripts and report the reduction.")
+    parser.add_argument("transcript_dir", nargs="?", default="transcripts")
+    parser.add_argument("--steps", default=",".join(DEFAULT_STEPS), help=f"comma list from {','.join(STEPS)}")
+    parser.add_argument("--show", help="print this file's preprocessed text")
+    args = parser.parse_args()
+
+    steps = tuple(s.strip() for s in args.steps.split(",") if s.strip())
+    reports = []
+    for path in sorted(glob.glob(os.path.join(args.transcript_dir, "*.txt"))):
+        text, report = preprocess_file(path, steps)
+        reports.append(report)
+        if args.show and os.path.basename(path) == args.show:
+            print(text + "\n")
+    print(format_report(reports))
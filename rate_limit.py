@@ -0,0 +1,353 @@
+"""
+Rate Limiting & Retries
+=======================
+One process-wide limiter in front of every Messages API call, so concurrent
+deliberations slow down smoothly instead of failing on 429 / 529.
+
+  RateLimiter    token buckets for requests, input tokens and output tokens
+                 per minute; callers block until all three have room.
+  call_with_retry  jittered exponential backoff on retryable errors,
+                 honoring the server's retry-after header. An overloaded
+                 error that arrives as a stream event counts too; the
+                 orchestrator retries a stream that fails before its
+                 first token, but not one that has already sent text.
+  limited(client)  wraps an Anthropic client so messages.create and
+                 messages.stream go through both.
+  limited_async(client)  the same for an AsyncAnthropic client; waits and
+                 backoff sleep on the event loop instead of a thread.
+
+Budgets (environment, per minute): ANTHROPIC_RPM, ANTHROPIC_ITPM, ANTHROPIC_OTPM.
+"""
+
+import os
+import json
+import time
+import random
+import asyncio
+import threading
+from typing import Awaitable, Callable, TypeVar
+
+T = TypeVar("T")
+
+RETRYABLE_STATUS = {408, 409, 429, 500, 502, 503, 504, 529}
+RETRYABLE_ERRORS = {"APIConnectionError", "APITimeoutError"}
+# Error types sent as a stream event after a 200, where status_code says nothing.
+RETRYABLE_EVENTS = {"overloaded_error", "api_error", "rate_limit_error"}
+MAX_RETRIES = int(os.getenv("ANTHROPIC_MAX_RETRIES", "6"))
+BASE_DELAY = 1.0
+MAX_DELAY = 60.0
+
+
+class TokenBucket:
+    """Refills continuously at `per_minute / 60` units per second, up to `per_minute`."""
+
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.rate = self.capacity / 60.0
+        self.level = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        self._refill(now)
+        amount = min(amount, self.capacity)
+        return 0.0 if self.level >= amount else (amount - self.level) / self.rate
+
+    def take(self, amount: float) -> None:
+        self.level -= min(amount, self.capacity)
+
+    def give(self, amount: float) -> None:
+        self.level = min(self.capacity, self.level + amount)
+
+
+class RateLimiter:
+    def __init__(self, rpm: float, input_tpm: float, output_tpm: float):
+        self.requests = TokenBucket(rpm)
+        self.input_tokens = TokenBucket(input_tpm)
+        self.output_tokens = TokenBucket(output_tpm)
+        self._lock = threading.Lock()
+        self._paused_until = 0.0
+
+    def _try_take(self, input_tokens: int, output_tokens: int) -> float:
+        """Take one request of this size if every budget has room (returns 0), else the seconds to wait."""
+        with self._lock:
+            now = time.monotonic()
+            wait = max(
+                self._paused_until - now,
+                self.requests.wait_time(1, now),
+                self.input_tokens.wait_time(input_tokens, now),
+                self.output_tokens.wait_time(output_tokens, now),
+            )
+            if wait <= 0:
+                self.requests.take(1)
+                self.input_tokens.take(input_tokens)
+                self.output_tokens.take(output_tokens)
+                return 0.0
+            return wait
+
+    def acquire(self, input_tokens: int, output_tokens: int) -> float:
+        """Block until one request of this size fits every budget. Returns seconds waited."""
+        waited = 0.0
+        while (wait := self._try_take(input_tokens, output_tokens)) > 0:
+            time.sleep(wait)
+            waited += wait
+        return waited
+
+    async def aacquire(self, input_tokens: int, output_tokens: int) -> float:
+        """acquire() for coroutines: waits on the event loop. Returns seconds waited."""
+        waited = 0.0
+        while (wait := self._try_take(input_tokens, output_tokens)) > 0:
+            await asyncio.sleep(wait)
+            waited += wait
+        return waited
+
+    def refund_output(self, reserved: int, used: int) -> None:
+        """Return the unused part of an output-token reservation."""
+        if reserved > used:
+            with self._lock:
+                self.output_tokens.give(reserved - used)
+
+    def pause(self, seconds: float) -> None:
+        """Hold every caller back, e.g. after the server says to retry later."""
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+
+LIMITER = RateLimiter(
+    rpm=float(os.getenv("ANTHROPIC_RPM", "50")),
+    input_tpm=float(os.getenv("ANTHROPIC_ITPM", "30000")),
+    output_tpm=float(os.getenv("ANTHROPIC_OTPM", "8000")),
+)
+
+
+# ---------------------------------------------------------------------------
+# Retry / backoff
+# ---------------------------------------------------------------------------
+def is_retryable(exc: BaseException) -> bool:
+    status = getattr(exc, "status_code", None)
+    body = getattr(exc, "body", None)
+    error = body.get("error") if isinstance(body, dict) else None
+    event = error.get("type") if isinstance(error, dict) else None
+    return status in RETRYABLE_STATUS or type(exc).__name__ in RETRYABLE_ERRORS or event in RETRYABLE_EVENTS
+
+
+def retry_after(exc: BaseException) -> float | None:
+    """Seconds the server asked us to wait, if it said."""
+    response = getattr(exc, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    for name in ("retry-after-ms", "retry-after"):
+        value = headers.get(name)
+        if value is None:
+            continue
+        try:
+            seconds = float(value)
+        except ValueError:
+            continue
+        return seconds / 1000 if name.endswith("-ms") else seconds
+    return None
+
+
+def backoff_delay(attempt: int, exc: BaseException) -> float:
+    """Server's retry-after if given, else full-jitter exponential backoff."""
+    hinted = retry_after(exc)
+    if hinted is not None:
+        return min(hinted, MAX_DELAY)
+    return random.uniform(0, min(MAX_DELAY, BASE_DELAY * 2 ** attempt))
+
+
+def call_with_retry(
+    fn: Callable[[], T],
+    limiter: RateLimiter | None = None,
+    max_retries: int = MAX_RETRIES,
+    retry_if: Callable[[Exception], bool] = is_retryable,
+) -> T:
+    """
+    Call fn(), retrying errors that retry_if accepts (default: retryable API
+    errors). A 429 also pauses the shared limiter.
+    """
+    for attempt in range(max_retries + 1):
+        try:
+            return fn()
+        except Exception as e:
+            if attempt == max_retries or not retry_if(e):
+                raise
+            delay = backoff_delay(attempt, e)
+            if limiter and getattr(e, "status_code", None) == 429:
+                limiter.pause(delay)
+            print(f"  !! {type(e).__name__} ({getattr(e, 'status_code', '-')}), retry {attempt + 1}/{max_retries} in {delay:.1f}s")
+            time.sleep(delay)
+    raise AssertionError("unreachable")
+
+
+async def acall_with_retry(
+    fn: Callable[[], Awaitable[T]],
+    limiter: RateLimiter | None = None,
+    max_retries: int = MAX_RETRIES,
+    retry_if: Callable[[Exception], bool] = is_retryable,
+) -> T:
+    """call_with_retry() for coroutines; backoff sleeps on the event loop, so the call stays cancellable."""
+    for attempt in range(max_retries + 1):
+        try:
+            return await fn()
+        except Exception as e:
+            if attempt == max_retries or not retry_if(e):
+                raise
+            delay = backoff_delay(attempt, e)
+            if limiter and getattr(e, "status_code", None) == 429:
+                limiter.pause(delay)
+            print(f"  !! {type(e).__name__} ({getattr(e, 'status_code', '-')}), retry {attempt + 1}/{max_retries} in {delay:.1f}s")
+            await asyncio.sleep(delay)
+    raise AssertionError("unreachable")
+
+
+# ---------------------------------------------------------------------------
+# Client wrapper
+# ---------------------------------------------------------------------------
+def estimate_request_tokens(kwargs: dict) -> int:
+    """Rough input size (~4 chars per token) of a messages request."""
+    return len(json.dumps([kwargs.get("system"), kwargs.get("messages")], default=str)) // 4
+
+
+class _LimitedStream:
+    """
+    Context manager that opens the underlying stream under the limiter, with
+    retries. After entering, `waited` holds the seconds spent before the
+    successful request went out (budget waits, failed attempts, backoff).
+    """
+
+    def __init__(self, inner, limiter: RateLimiter, kwargs: dict):
+        self._inner = inner
+        self._limiter = limiter
+        self._kwargs = kwargs
+        self._manager = None
+        self._stream = None
+        self.waited = 0.0
+
+    def __enter__(self):
+        reserved = self._kwargs.get("max_tokens", 0)
+        entered = time.monotonic()
+
+        def open_stream():
+            self._limiter.acquire(estimate_request_tokens(self._kwargs), reserved)
+            self.waited = time.monotonic() - entered
+            manager = self._inner.messages.stream(**self._kwargs)
+            return manager, manager.__enter__()
+
+        self._manager, self._stream = call_with_retry(open_stream, self._limiter)
+        return self._stream
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            try:
+                used = self._stream.get_final_message().usage.output_tokens
+                self._limiter.refund_output(self._kwargs.get("max_tokens", 0), used)
+            except Exception:
+                pass
+        return self._manager.__exit__(exc_type, exc, tb)
+
+
+class _LimitedMessages:
+    def __init__(self, inner, limiter: RateLimiter):
+        self._inner = inner
+        self._limiter = limiter
+
+    def stream(self, **kwargs) -> _LimitedStream:
+        return _LimitedStream(self._inner, self._limiter, kwargs)
+
+    def create(self, **kwargs):
+        reserved = kwargs.get("max_tokens", 0)
+
+        def call():
+            self._limiter.acquire(estimate_request_tokens(kwargs), reserved)
+            return self._inner.messages.create(**kwargs)
+
+        response = call_with_retry(call, self._limiter)
+        self._limiter.refund_output(reserved, response.usage.output_tokens)
+        return response
+
+
+class LimitedClient:
+    """An Anthropic client whose messages calls share the process-wide limiter."""
+
+    def __init__(self, inner, limiter: RateLimiter = LIMITER):
+        self._inner = inner
+        self.messages = _LimitedMessages(inner, limiter)
+
+    def __getattr__(self, name):
+        return getattr(self._inner, name)
+
+
+def limited(client, limiter: RateLimiter = LIMITER) -> LimitedClient:
+    return LimitedClient(client, limiter)
+
+
+class _AsyncLimitedStream:
+    """Async context manager counterpart of _LimitedStream."""
+
+    def __init__(self, inner, limiter: RateLimiter, kwargs: dict):
+        self._inner = inner
+        self._limiter = limiter
+        self._kwargs = kwargs
+        self._manager = None
+        self._stream = None
+        self.waited = 0.0
+
+    async def __aenter__(self):
+        reserved = self._kwargs.get("max_tokens", 0)
+        entered = time.monotonic()
+
+        async def open_stream():
+            await self._limiter.aacquire(estimate_request_tokens(self._kwargs), reserved)
+            self.waited = time.monotonic() - entered
+            manager = self._inner.messages.stream(**self._kwargs)
+            return manager, await manager.__aenter__()
+
+        self._manager, self._stream = await acall_with_retry(open_stream, self._limiter)
+        return self._stream
+
+    async def __aexit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            try:
+                used = (await self._stream.get_final_message()).usage.output_tokens
+                self._limiter.refund_output(self._kwargs.get("max_tokens", 0), used)
+            except Exception:
+                pass
+        return await self._manager.__aexit__(exc_type, exc, tb)
+
+
+class _AsyncLimitedMessages:
+    def __init__(self, inner, limiter: RateLimiter):
+        self._inner = inner
+        self._limiter = limiter
+
+    def stream(self, **kwargs) -> _AsyncLimitedStream:
+        return _AsyncLimitedStream(self._inner, self._limiter, kwargs)
+
+    async def create(self, **kwargs):
+        reserved = kwargs.get("max_tokens", 0)
+
+        async def call():
+            await self._limiter.aacquire(estimate_request_tokens(kwargs), reserved)
+            return await self._inner.messages.create(**kwargs)
+
+        response = await acall_with_retry(call, self._limiter)
+        self._limiter.refund_output(reserved, response.usage.output_tokens)
+        return response
+
+
+class AsyncLimitedClient:
+    """An AsyncAnthropic client whose messages calls share the process-wide limiter."""
+
+    def __init__(self, inner, limiter: RateLimiter = LIMITER):
+        self._inner = inner
+        self.messages = _AsyncLimitedMessages(inner, limiter)
+
+    def __getattr__(self, name):
+        return getattr(self._inner, name)
+
+
+def limited_async(client, limiter: RateLimiter = LIMITER) -> AsyncLimitedClient:
+    return AsyncLimitedClient(client, limiter)
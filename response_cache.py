@@ -0,0 +1,124 @@
+"""
+Response Cache
+==============
+Content-addressed on-disk cache for agent responses.
+
+Each entry is keyed by a SHA-256 of everything that determines the model's
+answer (model, max_tokens, system prompt, user message) and stored as one
+JSON file. Reads refresh the file's mtime, so eviction is least-recently-used:
+entries older than `max_age` seconds since their last use go first, then the oldest entries until
+the directory fits in `max_bytes`.
+
+Settings (environment):
+  RESPONSE_CACHE_DIR            where entries live      (default .cache/responses)
+  RESPONSE_CACHE_MAX_MB         size ceiling            (default 200)
+  RESPONSE_CACHE_MAX_AGE_DAYS   age ceiling             (default 30)
+  RESPONSE_CACHE=off            bypass the cache entirely
+"""
+
+import os
+import json
+import time
+import hashlib
+import tempfile
+
+CACHE_DIR = os.getenv("RESPONSE_CACHE_DIR", os.path.join(".cache", "responses"))
+MAX_BYTES = int(float(os.getenv("RESPONSE_CACHE_MAX_MB", "200")) * 1024 * 1024)
+MAX_AGE = float(os.getenv("RESPONSE_CACHE_MAX_AGE_DAYS", "30")) * 86400
+ENABLED = os.getenv("RESPONSE_CACHE", "on").lower() not in ("off", "0", "false", "no")
+
+
+def cache_key(model: str, max_tokens: int, system, user_message: str, temperature: float | None = None) -> str:
+    """Hash the request fields that decide the response. `system` may be a str or block list."""
+    fields = [model, max_tokens, system, user_message] + ([temperature] if temperature is not None else [])
+    payload = json.dumps(fields, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    def __init__(self, directory: str = CACHE_DIR, max_bytes: int = MAX_BYTES, max_age: float = MAX_AGE):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.json")
+
+    def get(self, key: str) -> dict | None:
+        """Return the stored entry for `key`, or None. A hit counts as a use for LRU."""
+        path = self._path(key)
+        try:
+            with open(path, "r") as fh:
+                entry = json.load(fh)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            pass
+        return entry
+
+    def put(self, key: str, entry: dict) -> None:
+        """Store `entry` atomically, then evict down to the configured limits."""
+        os.makedirs(self.directory, exist_ok=True)
+        entry = {**entry, "created": time.time()}
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as fh:
+                json.dump(entry, fh)
+            os.replace(tmp, self._path(key))
+        except BaseException:
+            self._remove(tmp)
+            raise
+        self.evict()
+
+    def evict(self) -> int:
+        """Drop expired entries, then least-recently-used ones over the size limit. Returns count removed."""
+        try:
+            names = [n for n in os.listdir(self.directory) if n.endswith(".json")]
+        except FileNotFoundError:
+            return 0
+
+        now = time.time()
+        entries = []
+        for name in names:
+            path = os.path.join(self.directory, name)
+            try:
+                st = os.stat(path)
+            except FileNotFoundError:
+                continue
+            entries.append((st.st_mtime, st.st_size, path))
+
+        removed = 0
+        kept = []
+        for mtime, size, path in entries:
+            if now - mtime > self.max_age:
+                removed += self._remove(path)
+            else:
+                kept.append((mtime, size, path))
+
+        total = sum(size for _, size, _ in kept)
+        for mtime, size, path in sorted(kept):
+            if total <= self.max_bytes:
+                break
+            removed += self._remove(path)
+            total -= size
+        return removed
+
+    def clear(self) -> None:
+        for name in os.listdir(self.directory) if os.path.isdir(self.directory) else []:
+            self._remove(os.path.join(self.directory, name))
+
+    @staticmethod
+    def _remove(path: str) -> int:
+        try:
+            os.remove(path)
+            return 1
+        except FileNotFoundError:
+            return 0
+
+
+def replay(text: str, on_stream, chunk_size: int = 48) -> None:
+    """Feed cached text to a stream callback in small chunks, like a live response."""
+    for i in range(0, len(text), chunk_size):
+        on_stream(text[i:i + chunk_size])
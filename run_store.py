@@ -0,0 +1,267 @@
+"""
+Run Store
+=========
+Local history of every deliberation in one SQLite file (stdlib only), so
+past runs can be listed, filtered and reopened after output/ has been
+overwritten.
+
+  runs    one row per run: client, transcript-set hash, config hash, start
+          time, wall time, token and cost totals. Indexed on
+          (client, created), (transcript_hash, created), (config_hash, created)
+          and created, so listings stay fast with thousands of runs.
+  stages  one row per stage: zlib-compressed output plus its telemetry
+          record (see telemetry.stage_record). Only read when a run is opened.
+
+  store = get_store()
+  store.list_runs(client="lakeview", limit=20)   # -> [RunSummary], newest first
+  store.get_run(run_id)                          # -> StoredRun with outputs
+
+Settings (environment):
+  RUN_STORE_PATH   database file        (default runs.db)
+  RUN_STORE=off    record nothing (get_store() returns None)
+
+Usage:
+    python run_store.py                   # newest runs
+    python run_store.py --client lakeview
+    python run_store.py <run_id>          # one run's telemetry table
+"""
+
+import os
+import json
+import time
+import zlib
+import sqlite3
+import hashlib
+import argparse
+import threading
+from dataclasses import dataclass, field
+
+from telemetry import stage_record, format_summary_table
+
+RUN_STORE_PATH = os.getenv("RUN_STORE_PATH", "runs.db")
+ENABLED = os.getenv("RUN_STORE", "on").lower() not in ("off", "0", "false", "no")
+SCHEMA_VERSION = 1
+COMPRESS_LEVEL = 6
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id          TEXT PRIMARY KEY,
+    client          TEXT NOT NULL,
+    transcript_hash TEXT NOT NULL,
+    config_hash     TEXT NOT NULL,
+    config          TEXT NOT NULL,
+    created         REAL NOT NULL,
+    wall_time       REAL NOT NULL,
+    stages          INTEGER NOT NULL,
+    input_tokens    INTEGER NOT NULL,
+    output_tokens   INTEGER NOT NULL,
+    cost            REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS runs_client ON runs (client, created);
+CREATE INDEX IF NOT EXISTS runs_transcripts ON runs (transcript_hash, created);
+CREATE INDEX IF NOT EXISTS runs_config ON runs (config_hash, created);
+CREATE INDEX IF NOT EXISTS runs_created ON runs (created);
+CREATE TABLE IF NOT EXISTS stages (
+    run_id      TEXT NOT NULL REFERENCES runs (run_id) ON DELETE CASCADE,
+    position    INTEGER NOT NULL,
+    stage       TEXT NOT NULL,
+    agent_name  TEXT NOT NULL,
+    output      BLOB NOT NULL,
+    telemetry   TEXT NOT NULL,
+    PRIMARY KEY (run_id, position)
+);
+"""
+
+SUMMARY_COLUMNS = (
+    "run_id", "client", "transcript_hash", "config_hash", "created",
+    "wall_time", "stages", "input_tokens", "output_tokens", "cost",
+)
+
+
+@dataclass
+class RunSummary:
+    run_id: str
+    client: str
+    transcript_hash: str
+    config_hash: str
+    created: float
+    wall_time: float
+    stages: int
+    input_tokens: int
+    output_tokens: int
+    cost: float
+
+    def label(self) -> str:
+        when = time.strftime("%Y-%m-%d %H:%M", time.localtime(self.created))
+        return f"{when} · {self.client} · {self.wall_time:.0f}s · ${self.cost:.3f} · {self.run_id}"
+
+
+@dataclass
+class StoredRun:
+    summary: RunSummary
+    config: dict
+    outputs: dict[str, str] = field(default_factory=dict)
+    records: list[dict] = field(default_factory=list)
+
+
+def hash_json(value) -> str:
+    return hashlib.sha256(json.dumps(value, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def compress(text: str) -> bytes:
+    return zlib.compress(text.encode("utf-8"), COMPRESS_LEVEL)
+
+
+def decompress(blob: bytes) -> str:
+    return zlib.decompress(blob).decode("utf-8")
+
+
+class RunStore:
+    """
+    One connection shared by every thread (jobs, batch workers, the app),
+    serialized by a lock; WAL mode lets other processes read while one writes.
+    """
+
+    def __init__(self, path: str = RUN_STORE_PATH):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA foreign_keys=ON")
+        with self._db:
+            self._db.executescript(SCHEMA)
+            self._db.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+    def record(
+        self,
+        run_id: str,
+        results: list,
+        client: str,
+        transcript_hash: str,
+        config: dict,
+        wall_time: float,
+        created: float | None = None,
+    ) -> None:
+        """Store one finished run: its AgentResults (outputs + telemetry) and totals."""
+        records = [stage_record(run_id, r) for r in results]
+        billed = [rec for rec in records if not (rec["cached"] or rec["reused"])]
+        row = (
+            run_id, client, transcript_hash, hash_json(config), json.dumps(config, sort_keys=True),
+            created or time.time(), wall_time, len(results),
+            sum(rec["input_tokens"] for rec in records), sum(rec["output_tokens"] for rec in records),
+            sum(rec["cost"] for rec in billed),
+        )
+        stage_rows = [
+            (run_id, i, r.stage, r.agent_name, compress(r.output), json.dumps(rec))
+            for i, (r, rec) in enumerate(zip(results, records))
+        ]
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT OR REPLACE INTO runs (run_id, client, transcript_hash, config_hash, config, created,"
+                " wall_time, stages, input_tokens, output_tokens, cost) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                row,
+            )
+            self._db.execute("DELETE FROM stages WHERE run_id = ?", (run_id,))
+            self._db.executemany(
+                "INSERT INTO stages (run_id, position, stage, agent_name, output, telemetry) VALUES (?, ?, ?, ?, ?, ?)",
+                stage_rows,
+            )
+
+    def list_runs(
+        self,
+        client: str | None = None,
+        transcript_hash: str | None = None,
+        config_hash: str | None = None,
+        since: float | None = None,
+        limit: int = 50,
+        offset: int = 0,
+    ) -> list[RunSummary]:
+        """Run summaries, newest first; never reads stage outputs."""
+        where, params = [], []
+        for column, value in (("client", client), ("transcript_hash", transcript_hash), ("config_hash", config_hash)):
+            if value is not None:
+                where.append(f"{column} = ?")
+                params.append(value)
+        if since is not None:
+            where.append("created >= ?")
+            params.append(since)
+        sql = f"SELECT {', '.join(SUMMARY_COLUMNS)} FROM runs"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY created DESC LIMIT ? OFFSET ?"
+        with self._lock:
+            rows = self._db.execute(sql, (*params, limit, offset)).fetchall()
+        return [RunSummary(*row) for row in rows]
+
+    def clients(self) -> list[str]:
+        with self._lock:
+            return [row[0] for row in self._db.execute("SELECT DISTINCT client FROM runs ORDER BY client")]
+
+    def count(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM runs").fetchone()[0]
+
+    def get_run(self, run_id: str) -> StoredRun | None:
+        """One run with its decompressed outputs (by agent name) and telemetry records, in stage order."""
+        with self._lock:
+            row = self._db.execute(
+                f"SELECT {', '.join(SUMMARY_COLUMNS)}, config FROM runs WHERE run_id = ?", (run_id,)
+            ).fetchone()
+            if row is None:
+                return None
+            stage_rows = self._db.execute(
+                "SELECT agent_name, output, telemetry FROM stages WHERE run_id = ? ORDER BY position", (run_id,)
+            ).fetchall()
+        run = StoredRun(RunSummary(*row[:-1]), json.loads(row[-1]))
+        for agent_name, blob, telemetry in stage_rows:
+            run.outputs[agent_name] = decompress(blob)
+            run.records.append(json.loads(telemetry))
+        return run
+
+    def delete(self, run_id: str) -> None:
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM runs WHERE run_id = ?", (run_id,))
+
+
+_stores: dict[str, RunStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_store(path: str = RUN_STORE_PATH) -> RunStore | None:
+    """The process-wide RunStore for `path`, opened on first use; None when RUN_STORE=off."""
+    if not ENABLED:
+        return None
+    key = os.path.abspath(path)
+    with _stores_lock:
+        if key not in _stores:
+            _stores[key] = RunStore(path)
+        return _stores[key]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="List or show deliberations in the run store.")
+    parser.add_argument("run_id", nargs="?", help="show this run's telemetry")
+    parser.add_argument("--client", help="only runs for this client")
+    parser.add_argument("--transcripts", help="only runs over this transcript-set hash")
+    parser.add_argument("-n", "--limit", type=int, default=20)
+    parser.add_argument("--db", default=RUN_STORE_PATH)
+    args = parser.parse_args()
+
+    store = RunStore(args.db)
+    if args.run_id:
+        run = store.get_run(args.run_id)
+        if run is None:
+            raise SystemExit(f"No run {args.run_id} in {args.db}")
+        print(run.summary.label())
+        print(f"transcripts {run.summary.transcript_hash[:12]}  config {run.summary.config_hash[:12]}\n")
+        print(format_summary_table(run.records, run.summary.wall_time))
+    else:
+        runs = store.list_runs(client=args.client, transcript_hash=args.transcripts, limit=args.limit)
+        print(f"{len(runs)} of {store.count()} runs in {args.db}")
+        for summary in runs:
+            print(f"  {summary.label()}")
@@ -0,0 +1,61 @@
+"""
+Stream Coalescer
+================
+Batches streamed tokens before they reach a UI element.
+
+Re-rendering a placeholder on every token redraws the whole growing buffer
+each time (quadratic in output length) and sends one websocket message per
+token. StreamCoalescer keeps the chunks in a list and pushes the full text
+to its sink only when `interval` seconds have passed since the last flush or
+`max_chars` new characters have arrived, plus once more on flush().
+
+    coalescer = StreamCoalescer(placeholder.markdown, interval=0.15)
+    coalescer.write(chunk)   # per token
+    coalescer.flush()        # at end of stage
+"""
+
+import os
+import time
+from typing import Callable
+
+FLUSH_INTERVAL = float(os.getenv("UI_FLUSH_INTERVAL", "0.15"))
+FLUSH_CHARS = int(os.getenv("UI_FLUSH_CHARS", "2000"))
+
+
+class StreamCoalescer:
+    def __init__(
+        self,
+        sink: Callable[[str], None],
+        interval: float = FLUSH_INTERVAL,
+        max_chars: int = FLUSH_CHARS,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.sink = sink
+        self.interval = interval
+        self.max_chars = max_chars
+        self.clock = clock
+        self.renders = 0
+        self._chunks: list[str] = []
+        self._pending = 0
+        self._last_flush = clock()
+
+    @property
+    def text(self) -> str:
+        return "".join(self._chunks)
+
+    def write(self, chunk: str) -> None:
+        self._chunks.append(chunk)
+        self._pending += len(chunk)
+        if self._pending >= self.max_chars or self.clock() - self._last_flush >= self.interval:
+            self.flush()
+
+    def flush(self) -> None:
+        """Push the full text to the sink if anything arrived since the last flush."""
+        if not self._pending:
+            return
+        text = "".join(self._chunks)
+        self._chunks = [text]
+        self._pending = 0
+        self._last_flush = self.clock()
+        self.renders += 1
+        self.sink(text)
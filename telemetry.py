@@ -0,0 +1,107 @@
+"""
+Telemetry
+=========
+Per-stage latency and token figures for each deliberation, appended to a
+JSONL run log and summarized as a table.
+
+Each line of the run log is one JSON object:
+  {"kind": "stage", "run_id": ..., "stage": ..., "agent_name": ..., "queue_time": ...,
+   "ttft": ..., "duration": ..., "tokens_per_sec": ..., "input_tokens": ...,
+   "output_tokens": ..., "cache_read_tokens": ..., "cache_creation_tokens": ...,
+   "stop_reason": ..., "model": ..., "cost": ..., "context_cuts": [...], "cached": ...,
+   "reused": ..., "timestamp": ...}
+  {"kind": "run", "run_id": ..., "wall_time": ..., "stages": ..., "timestamp": ...}
+
+Times are seconds. queue_time covers everything between the stage becoming
+ready and its request going out (scheduling, rate-limit waits, retries);
+ttft is from the request going out to the first streamed token. cost is USD
+from model_config's pricing table; totals count only API-served stages.
+"""
+
+import os
+import json
+import time
+import threading
+
+from model_config import short_name
+
+RUN_LOG_NAME = "run_log.jsonl"
+
+STAGE_FIELDS = (
+    "stage", "agent_name", "queue_time", "ttft", "duration", "tokens_per_sec",
+    "input_tokens", "output_tokens", "cache_read_tokens", "cache_creation_tokens",
+    "stop_reason", "model", "cost", "context_cuts", "cached", "reused",
+)
+
+
+class RunLog:
+    """Thread-safe JSONL appender; one instance per log file."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def append(self, record: dict) -> None:
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        line = json.dumps({**record, "timestamp": record.get("timestamp", time.time())})
+        with self._lock, open(self.path, "a") as fh:
+            fh.write(line + "\n")
+
+
+def stage_record(run_id: str, result) -> dict:
+    """The run-log record for one AgentResult."""
+    return {"kind": "stage", "run_id": run_id, **{f: getattr(result, f) for f in STAGE_FIELDS}}
+
+
+def parse_run_log(text: str) -> list[dict]:
+    records = []
+    for line in text.splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            records.append(json.loads(line))
+        except json.JSONDecodeError:
+            continue
+    return records
+
+
+def last_run(records: list[dict]) -> tuple[list[dict], dict | None]:
+    """Stage records and run record of the most recent run in a parsed log."""
+    stage_records = [r for r in records if r.get("kind") == "stage"]
+    if not stage_records:
+        return [], None
+    run_id = stage_records[-1]["run_id"]
+    run = next((r for r in reversed(records) if r.get("kind") == "run" and r.get("run_id") == run_id), None)
+    return [r for r in stage_records if r["run_id"] == run_id], run
+
+
+def format_summary_table(records: list[dict], wall_time: float | None = None) -> str:
+    """Fixed-width per-stage table (one row per stage record) with a totals row."""
+    header = (f"{'STAGE':<22} {'MODEL':<14} {'QUEUE':>6} {'TTFT':>6} {'TOTAL':>7} {'TOK/S':>6} "
+              f"{'IN':>7} {'OUT':>6} {'CACHED':>7} {'COST $':>8} {'STOP':<11} SOURCE")
+    lines = [header, "-" * len(header)]
+    for r in records:
+        source = "reused" if r.get("reused") else "cache" if r.get("cached") else "api"
+        spent = f"{r.get('cost', 0.0):>8.4f}" if source == "api" else f"{'-':>8}"
+        lines.append(
+            f"{r['agent_name'][:22]:<22} {short_name(r.get('model') or '-')[:14]:<14} "
+            f"{r['queue_time']:>6.1f} {r['ttft']:>6.1f} {r['duration']:>7.1f} "
+            f"{r['tokens_per_sec']:>6.0f} {r['input_tokens']:>7,} {r['output_tokens']:>6,} "
+            f"{r['cache_read_tokens']:>7,} {spent} {(r.get('stop_reason') or '-'):<11} {source}"
+        )
+    lines.append("-" * len(header))
+    total_in = sum(r["input_tokens"] for r in records)
+    total_out = sum(r["output_tokens"] for r in records)
+    total_cached = sum(r["cache_read_tokens"] for r in records)
+    total_cost = sum(r.get("cost", 0.0) for r in records if not (r.get("cached") or r.get("reused")))
+    busy = sum(r["duration"] for r in records)
+    wall = f"{wall_time:.1f}s wall, " if wall_time is not None else ""
+    lines.append(
+        f"{'TOTAL':<22} {'':<14} {'':>6} {'':>6} {busy:>7.1f} {'':>6} {total_in:>7,} {total_out:>6,} "
+        f"{total_cached:>7,} {total_cost:>8.4f}"
+    )
+    if records:
+        slowest = max(records, key=lambda r: r["duration"])
+        lines.append(f"{wall}slowest stage: {slowest['agent_name']} ({slowest['duration']:.1f}s)")
+    return "\n".join(lines)
@@ -0,0 +1,128 @@
+import json
+import asyncio
+
+import pytest
+
+anthropic = pytest.importorskip("anthropic")
+try:  # the HTTP library this anthropic release is built on
+    import httpx2 as httpx
+except ImportError:
+    import httpx
+
+import orchestrator
+import rate_limit
+from model_config import ModelConfig
+
+EVENTS = [
+    ("message_start", {"type": "message_start", "message": {
+        "id": "msg_1", "type": "message", "role": "assistant", "model": "claude-test", "content": [],
+        "stop_reason": None, "stop_sequence": None, "usage": {"input_tokens": 12, "output_tokens": 1},
+    }}),
+    ("content_block_start", {"type": "content_block_start", "index": 0, "content_block": {"type": "text", "text": ""}}),
+    ("content_block_delta", {"type": "content_block_delta", "index": 0, "delta": {"type": "text_delta", "text": "Hello "}}),
+    ("content_block_delta", {"type": "content_block_delta", "index": 0, "delta": {"type": "text_delta", "text": "there"}}),
+    ("content_block_stop", {"type": "content_block_stop", "index": 0}),
+    ("message_delta", {"type": "message_delta", "delta": {"stop_reason": "end_turn", "stop_sequence": None},
+                       "usage": {"output_tokens": 2}}),
+    ("message_stop", {"type": "message_stop"}),
+]
+
+
+def streamed_reply(request: httpx.Request) -> httpx.Response:
+    assert request.url.path == "/v1/messages"
+    assert json.loads(request.content)["stream"] is True
+    body = "".join(f"event: {name}\ndata: {json.dumps(data)}\n\n" for name, data in EVENTS)
+    return httpx.Response(200, headers={"content-type": "text/event-stream"}, content=body.encode())
+
+
+def test_plain_async_anthropic_is_detected():
+    api = anthropic.AsyncAnthropic(api_key="test")
+    assert orchestrator.is_async_client(api)
+    assert not orchestrator.is_async_client(anthropic.Anthropic(api_key="test"))
+
+
+def test_arun_agent_streams_from_plain_async_anthropic():
+    async def main():
+        api = anthropic.AsyncAnthropic(
+            api_key="test", max_retries=0,
+            http_client=httpx.AsyncClient(transport=httpx.MockTransport(streamed_reply)),
+        )
+        chunks = []
+        try:
+            return await orchestrator.arun_agent(
+                "Tester", "system", "hello", chunks.append, use_cache=False, api_client=api,
+                config=ModelConfig("claude-test", 64), timeout=10,
+            ), chunks
+        finally:
+            await api.close()
+
+    result, chunks = asyncio.run(main())
+    assert result.output == "Hello there"
+    assert chunks == ["Hello ", "there"]
+    assert (result.input_tokens, result.output_tokens, result.stop_reason) == (12, 2, "end_turn")
+
+
+
+def error_after(events: list) -> bytes:
+    error = {"type": "error", "error": {"type": "overloaded_error", "message": "Overloaded"}}
+    return "".join(f"event: {name}\ndata: {json.dumps(data)}\n\n" for name, data in [*events, ("error", error)]).encode()
+
+
+def run_replies(replies: list[bytes]):
+    sent = []
+
+    def reply(request: httpx.Request) -> httpx.Response:
+        sent.append(request)
+        return httpx.Response(200, headers={"content-type": "text/event-stream"}, content=replies[len(sent) - 1])
+
+    async def main():
+        api = anthropic.AsyncAnthropic(
+            api_key="test", max_retries=0, http_client=httpx.AsyncClient(transport=httpx.MockTransport(reply)),
+        )
+        chunks = []
+        try:
+            result = await orchestrator.arun_agent(
+                "Tester", "system", "hello", chunks.append, use_cache=False, api_client=api,
+                config=ModelConfig("claude-test", 64), timeout=10,
+            )
+            return result, chunks
+        finally:
+            await api.close()
+
+    return asyncio.run(main()), len(sent)
+
+
+@pytest.fixture
+def no_backoff(monkeypatch):
+    monkeypatch.setattr(rate_limit, "BASE_DELAY", 0.0)
+
+
+def test_stream_failing_before_its_first_token_is_retried(no_backoff):
+    complete = "".join(f"event: {name}\ndata: {json.dumps(data)}\n\n" for name, data in EVENTS).encode()
+    (result, chunks), sent = run_replies([error_after(EVENTS[:2]), complete])
+    assert sent == 2
+    assert result.output == "Hello there"
+    assert chunks == ["Hello ", "there"]
+
+
+def test_stream_failing_after_text_is_not_retried(no_backoff):
+    with pytest.raises(anthropic.APIStatusError, match="Overloaded"):
+        run_replies([error_after(EVENTS[:3])] * 2)
+
+
+def test_injected_sync_client_is_retried(no_backoff):
+    complete = "".join(f"event: {name}\ndata: {json.dumps(data)}\n\n" for name, data in EVENTS).encode()
+    sent = []
+
+    def reply(request: httpx.Request) -> httpx.Response:
+        sent.append(request)
+        if len(sent) == 1:
+            return httpx.Response(529, json={"type": "error", "error": {"type": "overloaded_error", "message": "Overloaded"}})
+        return httpx.Response(200, headers={"content-type": "text/event-stream"}, content=complete)
+
+    api = anthropic.Anthropic(api_key="test", max_retries=0, http_client=httpx.Client(transport=httpx.MockTransport(reply)))
+    result = orchestrator.run_agent(
+        "Tester", "system", "hello", use_cache=False, api_client=api, config=ModelConfig("claude-test", 64), timeout=10,
+    )
+    assert len(sent) == 2
+    assert result.output == "Hello there"
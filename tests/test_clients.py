@@ -0,0 +1,51 @@
+import os
+import sys
+import time
+import subprocess
+
+import pytest
+
+pytest.importorskip("anthropic")
+
+import clients
+import orchestrator
+from mock_api import StubClient
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+async def current_client():
+    return clients.get_async_client()
+
+
+def test_blocking_runs_share_one_open_client():
+    first = clients.run_blocking(current_client())
+    orchestrator.run_deliberation(
+        os.path.join(ROOT, "transcripts"), api_client=StubClient(), use_cache=False, run_store=None,
+    )
+    second = clients.run_blocking(current_client())
+    assert second is first
+    assert not first.is_closed()
+
+
+def test_run_agent_timeout_does_not_wait_for_the_stream():
+    started = time.perf_counter()
+    with pytest.raises(orchestrator.StageTimeout):
+        orchestrator.run_agent("Slow", "system", "hello", use_cache=False, api_client=StubClient(ttft=3), timeout=0.3)
+    assert time.perf_counter() - started < 1.5
+
+
+def test_run_agent_cache_hit_does_not_import_anthropic(tmp_path):
+    env = {**os.environ, "RESPONSE_CACHE_DIR": str(tmp_path), "ANTHROPIC_API_KEY": "test"}
+    seed = (
+        "from response_cache import ResponseCache, cache_key; from model_config import CONFIGS; c = CONFIGS.default; "
+        "ResponseCache().put(cache_key(c.model, c.max_tokens, 'system', 'hello', c.temperature), "
+        "{'model': c.model, 'output': 'cached'})"
+    )
+    check = (
+        "import sys, orchestrator; r = orchestrator.run_agent('Probe', 'system', 'hello'); "
+        "print(r.cached, r.output, 'anthropic' in sys.modules)"
+    )
+    subprocess.run([sys.executable, "-c", seed], cwd=ROOT, env=env, check=True)
+    out = subprocess.run([sys.executable, "-c", check], cwd=ROOT, env=env, check=True, capture_output=True, text=True)
+    assert out.stdout.split() == ["True", "cached", "False"]
@@ -0,0 +1,26 @@
+import os
+
+from mock_api import StubClient
+from orchestrator import STAGES, report_digest_savings, run_deliberation, save_results
+
+ROOT_TRANSCRIPTS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "transcripts")
+
+
+def test_longer_digest_saves_nothing():
+    assert report_digest_savings("short transcript", "a digest longer than the transcript", STAGES) == 0
+
+
+def test_shorter_digest_saves_tokens():
+    assert report_digest_savings("transcript " * 100, "digest", STAGES) > 0
+
+
+def test_digest_run_reuses_every_stage(tmp_path):
+    first = run_deliberation(ROOT_TRANSCRIPTS, api_client=StubClient(), use_cache=False, use_digest=True)
+    assert first.digest is not None
+    save_results(first, str(tmp_path))
+
+    again = run_deliberation(
+        ROOT_TRANSCRIPTS, api_client=StubClient(), use_cache=False, use_digest=True, reuse_dir=str(tmp_path),
+    )
+    assert again.digest.reused
+    assert all(r.reused for r in again)
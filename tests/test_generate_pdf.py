@@ -0,0 +1,23 @@
+import pytest
+
+from generate_pdf import build_pdf
+
+
+def plan(count: int) -> list[dict]:
+    return [
+        {
+            "name": f"Step {i} with a fairly long name",
+            "desc": "Pull the figures the client mentioned and check them against the source " * 2,
+            "tools": "Google Sheets, Claude",
+            "type": ("auto", "human", "hybrid")[i % 3],
+            "time": "3 min",
+        }
+        for i in range(1, count + 1)
+    ]
+
+
+@pytest.mark.parametrize("count", range(1, 41))
+def test_footer_stays_on_the_page(count):
+    pdf = build_pdf(plan(count), "https://github.com/elliotnou/kts")
+    assert pdf.get_y() <= pdf.h - pdf.b_margin
+
@@ -0,0 +1,106 @@
+import os
+
+import pytest
+
+from plan_parser import PLAN_FORMAT, PlanFormatError, classify, parse_plan, steps_document
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def summary(markdown: str) -> list[tuple]:
+    return [(s.number, s.name, s.minutes, s.type) for s in parse_plan(markdown)]
+
+
+def test_saved_plan_parses_with_its_own_numbers():
+    with open(os.path.join(ROOT, "output", "5_architect_revised.md")) as fh:
+        document = steps_document(fh.read())
+    numbers = [s["number"] for s in document["steps"]]
+    assert numbers == list(range(1, len(numbers) + 1))
+    assert document["steps"][1]["type"] == "human"
+
+
+def test_requested_format_parses():
+    example = PLAN_FORMAT.splitlines()[1].replace("N", "1").replace("M", "5").replace("TYPE", "automated")
+    assert summary(example) == [(1, "Step name", 5, "auto")]
+
+
+@pytest.mark.parametrize("markdown, expected", [
+    (
+        "**Step 1: Intake** (5 minutes, automated)\n2. **Check** (3 minutes, human)",
+        [(1, "Intake", 5, "auto"), (2, "Check", 3, "human")],
+    ),
+    (
+        "1. **Intake** - 5 minutes (automated)\n2. **Check** - 3 minutes (human review)",
+        [(1, "Intake", 5, "auto"), (2, "Check", 3, "human")],
+    ),
+    (
+        "**Step 1: Intake (AI)** (5 minutes, automated)",
+        [(1, "Intake (AI)", 5, "auto")],
+    ),
+    (
+        "### Step 1: Intake (5 min, automated)\n### 2. Final check (3 min) - Human review",
+        [(1, "Intake", 5, "auto"), (2, "Final check", 3, "human")],
+    ),
+    (
+        "| Step | Name | Time | Type |\n|---|---|---|---|\n| 1 | Intake | 5 min | automated |\n"
+        "| 2 | Check | 3 min | human with AI assist |",
+        [(1, "Intake", 5, "auto"), (2, "Check", 3, "hybrid")],
+    ),
+    (
+        "| # | Step | Minutes | Owner |\n|--|--|--|--|\n| 1 | Intake | 5 | AI |\n| 2 | Review | 3 | Human |",
+        [(1, "Intake", 5, "auto"), (2, "Review", 3, "human")],
+    ),
+])
+def test_heading_formats(markdown, expected):
+    assert summary(markdown) == expected
+
+
+def test_indented_numbered_items_are_not_steps():
+    markdown = "**Step 1: Intake** (5 minutes, automated)\n- **Process**: read\n  1. Skim (2 minutes, automated)"
+    assert summary(markdown) == [(1, "Intake", 5, "auto")]
+
+
+def test_numbered_prose_after_the_steps_is_not_a_step():
+    markdown = (
+        "**Step 1: Intake** (5 minutes, automated)\n**Step 2: Pricing** (10 minutes, human)\n\n"
+        "## What changed\n"
+        "1. Moved the pricing check earlier, which saves 5 minutes of human rework.\n"
+        "2. Automated intake, down from 20 minutes (was manual)."
+    )
+    assert summary(markdown) == [(1, "Intake", 5, "auto"), (2, "Pricing", 10, "human")]
+
+
+@pytest.mark.parametrize("markdown, message", [
+    (
+        "**Step 1: A** (5 minutes, automated)\n**Step 3 - Pricing** (Minutes 10-15, human judgment)\n"
+        "**Step 4: B** (5 minutes, automated)",
+        "unrecognized step heading",
+    ),
+    ("### Step 1: Intake\n- **Tool**: GPT", "unrecognized step heading"),
+    ("**Step 1: A** (5 minutes, automated)\n**Step 3: B** (5 minutes, automated)", "expected step 2"),
+    ("**Step 1: A** (5 minutes, automated)\n**Step 1: B** (5 minutes, automated)", "repeats"),
+    ("### 5. Final check (3 min) - Human review", "expected step 1"),
+    ("**Step 1: A** (5 minutes)", "no step type"),
+    ("**Step 1: A** (5 minutes, drafting)", "automated or human"),
+])
+def test_unrecognized_plans_raise(markdown, message):
+    with pytest.raises(PlanFormatError, match=message):
+        parse_plan(markdown)
+
+
+@pytest.mark.parametrize("qualifier, kind", [
+    ("automated", "auto"),
+    ("AI", "auto"),
+    ("human judgment - NEW CHECKPOINT", "human"),
+    ("Human review", "human"),
+    ("human with AI assist", "hybrid"),
+    ("automated with human spot-checks", "hybrid"),
+])
+def test_classify(qualifier, kind):
+    assert classify(qualifier) == kind
+
+
+@pytest.mark.parametrize("qualifier", ["", "drafting", "10-15"])
+def test_classify_never_defaults_to_auto(qualifier):
+    with pytest.raises(PlanFormatError):
+        classify(qualifier)
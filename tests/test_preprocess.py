@@ -0,0 +1,23 @@
+import pytest
+
+from preprocess import remove_filler
+
+
+@pytest.mark.parametrize("said, kept", [
+    ("Um, we were uh reporting it.", "We were reporting it."),
+    ("I... I think the the form is late.", "I think the form is late."),
+    ("I I mean and the and the backlog grew.", "I mean and the backlog grew."),
+    ("I-I think so.", "I think so."),
+])
+def test_filler_is_removed(said, kept):
+    assert remove_filler(said) == kept
+
+
+@pytest.mark.parametrize("said", [
+    "We were reporting to the state... there's a backlog.",
+    "No, no, that is very very important.",
+    "No no no, the pricing comes first.",
+    "It had had three owners by then.",
+])
+def test_meaningful_text_is_kept(said):
+    assert remove_filler(said) == said
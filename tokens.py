@@ -0,0 +1,49 @@
+"""
+Token estimates
+===============
+Cheap local token counts for budgeting and reporting. Claude's tokenizer
+averages roughly four characters of English per token; these figures are
+estimates, not billing numbers (use the API's usage fields for those).
+"""
+
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text: str) -> int:
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def chunk_by_tokens(text: str, max_tokens: int) -> list[str]:
+    """
+    Split `text` into pieces of at most ~max_tokens each, preferring to cut
+    between transcript files, then between paragraphs, then between lines.
+    A single line longer than the limit is cut mid-line as a last resort.
+    """
+    limit = max_tokens * CHARS_PER_TOKEN
+    if len(text) <= limit:
+        return [text]
+
+    for sep in ("\n\n=== ", "\n\n", "\n"):
+        parts = text.split(sep)
+        if len(parts) > 1:
+            break
+    else:
+        return [text[i:i + limit] for i in range(0, len(text), limit)]
+
+    pieces = [parts[0]] + [sep.lstrip("\n") + p if sep.startswith("\n\n=== ") else p for p in parts[1:]]
+    joiner = "\n\n" if sep.startswith("\n\n") else "\n"
+    chunks, current = [], ""
+    for piece in pieces:
+        if len(piece) > limit:
+            if current:
+                chunks.append(current)
+                current = ""
+            chunks.extend(chunk_by_tokens(piece, max_tokens))
+        elif current and len(current) + len(joiner) + len(piece) > limit:
+            chunks.append(current)
+            current = piece
+        else:
+            current = f"{current}{joiner}{piece}" if current else piece
+    if current:
+        chunks.append(current)
+    return chunks
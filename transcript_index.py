@@ -0,0 +1,256 @@
+"""
+Transcript Index
+================
+Local BM25 index over call transcripts, so a stage can read only the
+passages relevant to its job instead of every transcript in full.
+
+A passage is one speaker turn ("Name: text" separated by blank lines),
+carried with the turn before it as context. Each file's header (call title,
+date, participants) is kept so retrieved passages can say who is speaking.
+
+The index covers any number of transcript directories (one per client) and
+is saved to INDEX_PATH as JSON. update() re-reads only files whose SHA-256
+changed and drops deleted ones. Document frequencies come from the live
+postings at query time, so an update never needs a full rebuild.
+
+  index = load_index()
+  index.update(["transcripts"])                                # incremental
+  index.search("data sources APC farebox exports", k=8, directory="transcripts")
+  index.save()
+
+Settings (environment):
+  TRANSCRIPT_INDEX_PATH   index file   (default .cache/transcript_index.json)
+"""
+
+import os
+import re
+import glob
+import json
+import math
+import hashlib
+from collections import Counter
+from dataclasses import dataclass, asdict
+
+from checkpoint import write_atomic
+
+INDEX_PATH = os.getenv("TRANSCRIPT_INDEX_PATH", os.path.join(".cache", "transcript_index.json"))
+INDEX_VERSION = 1
+K1 = 1.5
+B = 0.75
+
+TURN = re.compile(r"^(?P<speaker>[A-Z][\w .'-]{0,40}):\s+(?P<text>.+)$", re.S)
+WORD = re.compile(r"[a-z0-9][a-z0-9'$%-]*")
+STOPWORDS = frozenset("""
+a about after all also am an and any are as at be because been but by can could did do does doing
+don't for from get got had has have he her here him his how i i'm if in into is it it's its just
+know like me more my no not now of on one or our out really right say so some that that's the their
+them then there they this to up us was we we're were what when where which who why will with would
+yeah you your
+""".split())
+
+
+@dataclass
+class Passage:
+    file: str
+    client: str
+    turn: int
+    speaker: str
+    text: str
+    context: str = ""
+
+    @property
+    def id(self) -> str:
+        return f"{self.file}#{self.turn}"
+
+
+def tokenize(text: str) -> list[str]:
+    return [w.strip("'-") for w in WORD.findall(text.lower()) if w not in STOPWORDS and len(w) > 1]
+
+
+def split_turns(text: str) -> tuple[str, list[tuple[str, str]]]:
+    """(file header, [(speaker, text)]). Paragraphs without a speaker label join the previous turn."""
+    header, _, body = text.partition("\n---\n") if "\n---\n" in text else ("", "", text)
+    turns: list[tuple[str, str]] = []
+    for paragraph in re.split(r"\n\s*\n", body.strip()):
+        paragraph = paragraph.strip()
+        if not paragraph:
+            continue
+        match = TURN.match(paragraph)
+        if match:
+            turns.append((match.group("speaker").strip(), match.group("text").strip()))
+        elif turns:
+            turns[-1] = (turns[-1][0], f"{turns[-1][1]}\n\n{paragraph}")
+        else:
+            turns.append(("", paragraph))
+    return header.strip(), turns
+
+
+def file_passages(path: str, text: str) -> tuple[str, list[Passage]]:
+    header, turns = split_turns(text)
+    client = os.path.basename(os.path.dirname(path))
+    passages = []
+    for i, (speaker, said) in enumerate(turns):
+        previous = f"{turns[i - 1][0]}: {turns[i - 1][1]}" if i and turns[i - 1][0] else (turns[i - 1][1] if i else "")
+        passages.append(Passage(path, client, i, speaker, said, previous))
+    return header, passages
+
+
+def _sha_file(path: str) -> str:
+    with open(path, "rb") as fh:
+        return hashlib.sha256(fh.read()).hexdigest()
+
+
+class TranscriptIndex:
+    def __init__(self, path: str = INDEX_PATH):
+        self.path = path
+        # file -> {"sha", "header", "passages": [Passage dicts], "terms": [{term: tf}]}
+        self.files: dict[str, dict] = {}
+        self.passages: dict[str, Passage] = {}
+        self.lengths: dict[str, int] = {}
+        self.postings: dict[str, dict[str, int]] = {}
+        self.total_length = 0
+
+    # -- maintenance ---------------------------------------------------------
+    def _add(self, path: str, entry: dict) -> None:
+        self.files[path] = entry
+        for data, terms in zip(entry["passages"], entry["terms"]):
+            passage = Passage(**data)
+            self.passages[passage.id] = passage
+            self.lengths[passage.id] = sum(terms.values())
+            self.total_length += self.lengths[passage.id]
+            for term, tf in terms.items():
+                self.postings.setdefault(term, {})[passage.id] = tf
+
+    def _remove(self, path: str) -> None:
+        entry = self.files.pop(path)
+        for data, terms in zip(entry["passages"], entry["terms"]):
+            pid = Passage(**data).id
+            del self.passages[pid]
+            self.total_length -= self.lengths.pop(pid)
+            for term in terms:
+                docs = self.postings[term]
+                del docs[pid]
+                if not docs:
+                    del self.postings[term]
+
+    def update(self, directories: list[str]) -> tuple[list[str], list[str]]:
+        """
+        Sync the index with the *.txt files in `directories`: (re)index new
+        and changed files, drop files that disappeared from those
+        directories. Returns (indexed, removed) file paths.
+        """
+        roots = [os.path.abspath(d) for d in directories]
+        present = {os.path.abspath(f) for d in roots for f in glob.glob(os.path.join(d, "*.txt"))}
+        removed = [f for f in self.files if os.path.dirname(f) in roots and f not in present]
+        for f in removed:
+            self._remove(f)
+        indexed = []
+        for f in sorted(present):
+            sha = _sha_file(f)
+            if self.files.get(f, {}).get("sha") == sha:
+                continue
+            if f in self.files:
+                self._remove(f)
+            with open(f, "r") as fh:
+                header, passages = file_passages(f, fh.read())
+            self._add(f, {
+                "sha": sha,
+                "header": header,
+                "passages": [asdict(p) for p in passages],
+                "terms": [dict(Counter(tokenize(f"{p.speaker} {p.text}"))) for p in passages],
+            })
+            indexed.append(f)
+        return indexed, removed
+
+    def save(self) -> None:
+        write_atomic(self.path, json.dumps({"version": INDEX_VERSION, "files": self.files}))
+
+    # -- queries -------------------------------------------------------------
+    def search(self, query: str, k: int = 8, directory: str | None = None, client: str | None = None) -> list[tuple[float, Passage]]:
+        """Top-k (score, passage) by BM25, optionally limited to one transcript directory or client name."""
+        root = os.path.abspath(directory) if directory else None
+        n = len(self.passages)
+        if not n:
+            return []
+        average = self.total_length / n
+        scores: dict[str, float] = {}
+        for term in set(tokenize(query)):
+            docs = self.postings.get(term)
+            if not docs:
+                continue
+            idf = math.log(1 + (n - len(docs) + 0.5) / (len(docs) + 0.5))
+            for pid, tf in docs.items():
+                norm = tf + K1 * (1 - B + B * self.lengths[pid] / average)
+                scores[pid] = scores.get(pid, 0.0) + idf * tf * (K1 + 1) / norm
+        ranked = []
+        for pid, score in sorted(scores.items(), key=lambda item: (-item[1], item[0])):
+            passage = self.passages[pid]
+            if root and os.path.dirname(passage.file) != root:
+                continue
+            if client and passage.client != client:
+                continue
+            ranked.append((score, passage))
+            if len(ranked) == k:
+                break
+        return ranked
+
+    def retrieve(self, queries: tuple[str, ...], k: int, directory: str | None = None) -> list[Passage]:
+        """Up to k distinct passages, taking each query's next-best hit in turn, in document order."""
+        rankings = [[p for _, p in self.search(q, k, directory)] for q in queries]
+        chosen: dict[str, Passage] = {}
+        for rank in range(k):
+            for ranking in rankings:
+                if rank < len(ranking) and len(chosen) < k:
+                    chosen.setdefault(ranking[rank].id, ranking[rank])
+        return sorted(chosen.values(), key=lambda p: (p.file, p.turn))
+
+    def render(self, passages: list[Passage]) -> str:
+        """Passages grouped by file under its header, each after the turn that prompted it."""
+        blocks, current, last_turn = [], None, None
+        for p in passages:
+            if p.file != current:
+                current, last_turn = p.file, None
+                header = self.files[p.file]["header"]
+                blocks.append(f"=== {os.path.basename(p.file)} ===" + (f"\n{header}" if header else ""))
+            lines = []
+            if p.context and last_turn != p.turn - 1:
+                lines.append(f"[...]\n{p.context}")
+            lines.append(f"{p.speaker}: {p.text}" if p.speaker else p.text)
+            blocks.append("\n\n".join(lines))
+            last_turn = p.turn
+        return "\n\n".join(blocks)
+
+
+def load_index(path: str = INDEX_PATH) -> TranscriptIndex:
+    """The saved index at `path`, or an empty one (also when the file is unreadable or from another version)."""
+    index = TranscriptIndex(path)
+    try:
+        with open(path, "r") as fh:
+            saved = json.load(fh)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return index
+    if saved.get("version") == INDEX_VERSION:
+        for f, entry in saved.get("files", {}).items():
+            index._add(f, entry)
+    return index
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Update the transcript index and search it.")
+    parser.add_argument("query", nargs="?", help="search terms (omit to only update the index)")
+    parser.add_argument("directories", nargs="*", default=["transcripts"], help="transcript folders to index")
+    parser.add_argument("-k", type=int, default=8, help="passages to show")
+    parser.add_argument("--client", help="only search this client's folder name")
+    args = parser.parse_args()
+
+    index = load_index()
+    indexed, removed = index.update(args.directories)
+    if indexed or removed:
+        index.save()
+    print(f"{len(index.files)} files, {len(index.passages)} passages ({len(indexed)} indexed, {len(removed)} removed)")
+    if args.query:
+        for score, passage in index.search(args.query, args.k, client=args.client):
+            print(f"\n{score:5.2f}  {passage.client}/{os.path.basename(passage.file)} #{passage.turn}  {passage.speaker}")
+            print(f"       {passage.text[:200]}")